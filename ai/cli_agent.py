@@ -1,100 +1,162 @@
-import sys
+import argparse
 import os
-sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-
-import re
+import sys
+from typing import Optional
+from ai.intent import Command
+from ai.llm_backend import KeywordBackend, LLMError, get_backend
+from ai.profiling import Profiler
 from files.list_files import FileLister
 from files.duplicate_files import DuplicateFinder
+from files.daemon_client import DaemonClient, DaemonError
+from files.dedupe import Deduplicator
+from files.hash_algos import check_env_algorithm
+from files.hash_cache import HashCache
+from files.hash_engine import HashEngine
+from files.journal import OperationJournal
 from files.utils import get_user_root_dirs
 from files.copy_files import CopyManager
 from files.delete_files import DeleteManager
 from files.move_files import MoveManager
+from files.progress import Progress, cancel_on_interrupt, make_progress
 from files.recursive_list import RecursiveLister
 from files.validate import validate_directory
+from files.watcher import FolderWatcher
 import os
 
 ALLOWED_ACTIONS = {
-    "list_files", "list_folders", "list_duplicates", "delete_duplicates",
-    "move_file", "copy_file", "delete_file", "list_files_recursive", "list_folders_recursive"
+    "list_files", "list_folders", "list_duplicates", "delete_duplicates", "dedupe_duplicates",
+    "move_file", "copy_file", "delete_file", "list_files_recursive", "list_folders_recursive", "undo"
 }
 
-# --- Intent Parsing ---
-def parse_prompt(prompt: str):
-    prompt = prompt.lower()
-    if "list" in prompt and "duplicate" in prompt:
-        return "list_duplicates"
-    elif "delete" in prompt and "duplicate" in prompt:
-        return "delete_duplicates"
-    elif "move" in prompt:
-        return "move_file"
-    elif "copy" in prompt:
-        return "copy_file"
-    elif "delete" in prompt:
-        return "delete_file"
-    elif "list" in prompt and "folder" in prompt:
-        if "recursive" in prompt or "all" in prompt:
-            return "list_folders_recursive"
-        return "list_folders"
-    elif "list" in prompt and ("recursive" in prompt or "all" in prompt):
-        return "list_files_recursive"
-    elif "list" in prompt:
-        return "list_files"
-    return "unknown"
-
-def extract_path(prompt: str, keyword: str = None):
-    # Extract quoted path or after keyword
-    if '"' in prompt:
-        matches = re.findall(r'"([^"]+)"', prompt)
-        if matches:
-            return matches[0]
-    if keyword:
-        match = re.search(rf'{keyword} ([^ ]+)', prompt)
-        if match:
-            return match.group(1)
-    return None
+_hash_cache = None
+_hash_engine = None
+_watcher = None
+_journal = None
+_daemon = None
+_profiler = None
+_intent_backend = None
+# In batch mode nothing can be confirmed at a prompt: deletes need --yes
+_batch_mode = False
+_assume_yes = False
+
+def get_hash_cache():
+    # Shared across prompts so repeated duplicate scans reuse cached digests
+    global _hash_cache
+    if _hash_cache is None:
+        _hash_cache = HashCache()
+    return _hash_cache
 
-def extract_folder(prompt: str):
-    roots = get_user_root_dirs()
-    for name in roots:
-        if name.lower() in prompt:
-            return str(roots[name])
-    match = re.search(r"in ([\w\- ]+)", prompt)
-    if match:
-        return os.path.expanduser(match.group(1))
+def get_hash_engine():
+    # Backend and worker count come from FOLDERLY_HASH_BACKEND / FOLDERLY_HASH_WORKERS
+    global _hash_engine
+    if _hash_engine is None:
+        try:
+            _hash_engine = HashEngine.from_env()
+        except ValueError as e:
+            print(f"FOLDERLY_HASH_BACKEND/FOLDERLY_HASH_WORKERS: {e} Using the default.")
+            _hash_engine = HashEngine()
+    return _hash_engine
+
+def get_journal():
+    # Moves, copies and deletes are journaled so "undo" can revert the last one
+    global _journal
+    if _journal is None:
+        _journal = OperationJournal()
+    return _journal
+
+def daemon_call(method: str, **params):
+    # Ask the Folderly daemon if one is running; None means "do it locally"
+    global _daemon
+    if _daemon is None:
+        _daemon = DaemonClient.connect_if_running()
+        if _daemon is None:
+            return None
+    try:
+        return _daemon.call(method, **params)
+    except (DaemonError, OSError, ValueError):
+        _daemon = None
+        return None
+
+def get_profiler():
+    # Disabled unless FOLDERLY_PROFILE or --profile asks for it
+    global _profiler
+    if _profiler is None:
+        _profiler = Profiler.from_env()
+    return _profiler
+
+def get_intent_backend():
+    # Keyword rules unless FOLDERLY_LLM names a model backend (see ai/llm_backend.py)
+    global _intent_backend
+    if _intent_backend is None:
+        _intent_backend = get_backend()
+    return _intent_backend
+
+def parse_prompts(prompts):
+    # A model backend that can't be reached falls back to the keyword rules
+    try:
+        return get_intent_backend().parse_many(prompts)
+    except LLMError as e:
+        print(f"(Model unavailable, using keyword matching: {e})")
+        return KeywordBackend().parse_many(prompts)
+
+def start_watcher():
+    # Keep an in-memory view of the user's root folders live for the REPL session,
+    # unless a daemon is already doing that for us
+    global _watcher
+    if os.environ.get("FOLDERLY_WATCH", "1") != "0" and daemon_call('ping') is None:
+        _watcher = FolderWatcher(get_user_root_dirs().values())
+        _watcher.start()
+
+def get_live_index(folder: str):
+    # Answer from the watcher's live view once it has loaded the folder, else read the disk
+    if _watcher is not None and _watcher.tree.covers(folder):
+        return _watcher.tree
     return None
 
+# --- Intent Parsing (see ai/intent.py) ---
 def folder_exists(folder: str):
     return os.path.isdir(folder)
 
-def extract_dest(prompt: str):
-    # Try to extract quoted destination after 'to'
-    matches = re.findall(r'to\s+"([^"]+)"', prompt, re.IGNORECASE)
-    if matches:
-        return matches[0]
-    # Try to extract after 'to ' (not quoted)
-    match = re.search(r'to\s+([\w\- ]+)', prompt, re.IGNORECASE)
-    if match:
-        return match.group(1).strip()
-    return None
+def print_paths(paths, empty_message: str):
+    # Print as results stream in, so large trees show output immediately
+    count = 0
+    for p in paths:
+        print(p)
+        count += 1
+    if count == 0:
+        print(empty_message)
+
+def run_cancellable(progress: Progress, func, *args):
+    # Ctrl-C during func cancels progress's token, so func returns what it has instead of aborting
+    with cancel_on_interrupt(progress.token):
+        result = func(*args)
+    progress.finish()
+    if progress.cancelled:
+        print("(Cancelled: results are partial.)")
+    return result
+
+def find_duplicates(folder: str, index, confirm: bool = False):
+    # confirm re-checks groups with sha256 when the hash in use isn't collision-resistant
+    finder = DuplicateFinder(folder, cache=get_hash_cache(), engine=get_hash_engine(), index=index,
+                             progress=make_progress("Finding duplicates"))
+    dups = run_cancellable(finder.progress, lambda: finder.find_by_hash_staged(confirm=confirm))
+    return dups, finder.progress.cancelled
 
 # --- Middle Layer ---
-def handle_prompt(prompt: str):
-    intent = parse_prompt(prompt)
-    folder = extract_folder(prompt)
-    src = extract_path(prompt, "from") or extract_path(prompt, "move") or extract_path(prompt, "copy")
-    dest = extract_dest(prompt)
-
-    # Resolve destination if it's a known folder name (case-insensitive)
-    roots = get_user_root_dirs()
-    if dest:
-        for key in roots:
-            if dest.lower() == key.lower():
-                dest_folder = roots[key]
-                if src:
-                    dest = os.path.join(dest_folder, os.path.basename(src))
-                else:
-                    dest = str(dest_folder)
-                break
+def handle_prompt(prompt: str, command: Optional[Command] = None):
+    """Carry out a prompt. A command already parsed from it (e.g. by a batch parse) skips parsing."""
+    profiler = get_profiler()
+    profiler.start(prompt)
+    try:
+        _handle_prompt(prompt, profiler, command)
+    finally:
+        profiler.stop()
+
+def _handle_prompt(prompt: str, profiler: Profiler, command: Optional[Command] = None):
+    if command is None:
+        command = parse_prompts([prompt])[0]
+    intent, folder, src, dest = command.intent, command.folder, command.src, command.dest
+    profiler.mark("parse")
 
     # Prevent moving/copying to the same path
     if src and dest and os.path.abspath(src) == os.path.abspath(dest):
@@ -102,53 +164,58 @@ def handle_prompt(prompt: str):
         return
 
     if intent not in ALLOWED_ACTIONS:
-        print("Sorry, I can list files/folders, find/delete duplicates, move, copy, or delete files/folders.")
+        print("Sorry, I can list files/folders, find/delete/link duplicates, move, copy, delete files/folders, or undo.")
         return
 
-    if intent in ("list_files", "list_folders", "list_duplicates", "delete_duplicates") and not folder:
+    if intent in ("list_files", "list_folders", "list_duplicates", "delete_duplicates", "dedupe_duplicates") and not folder:
         print("Please specify a folder (e.g., Desktop, Downloads, Documents, etc.).")
         return
     if folder and not folder_exists(folder):
         print(f"Sorry, the folder '{folder}' does not exist. Please specify a valid folder.")
         return
 
+    profiler.mark("resolve")
+    index = get_live_index(folder) if folder else None
+    profiler.mark("index")
+
     try:
         if intent == "list_files":
             print(f"Listing files in {folder}:")
-            lister = FileLister(folder)
-            files = lister.list_files()
-            for f in files:
-                print(f)
-            if not files:
-                print("(No files found)")
+            files = daemon_call('list_files', folder=folder)
+            if files is None:
+                files = FileLister(folder, index=index).iter_files(entries=True)
+            print_paths(files, "(No files found)")
         elif intent == "list_folders":
             print(f"Listing folders in {folder}:")
-            lister = FileLister(folder)
-            folders = lister.list_folders()
-            for f in folders:
-                print(f)
-            if not folders:
-                print("(No folders found)")
+            folders = daemon_call('list_folders', folder=folder)
+            if folders is None:
+                folders = FileLister(folder, index=index).iter_folders(entries=True)
+            print_paths(folders, "(No folders found)")
         elif intent == "list_files_recursive":
             print(f"Recursively listing all files in {folder}:")
-            lister = RecursiveLister(folder)
-            files = lister.list_files_recursive()
-            for f in files:
-                print(f)
-            if not files:
-                print("(No files found)")
+            files = daemon_call('list_files', folder=folder, recursive=True)
+            if files is None:
+                progress = Progress("Listing files")
+                files = RecursiveLister(folder, index=index).iter_files_recursive(entries=True, progress=progress)
+                run_cancellable(progress, print_paths, files, "(No files found)")
+            else:
+                print_paths(files, "(No files found)")
         elif intent == "list_folders_recursive":
             print(f"Recursively listing all folders in {folder}:")
-            lister = RecursiveLister(folder)
-            folders = lister.list_folders_recursive()
-            for f in folders:
-                print(f)
-            if not folders:
-                print("(No folders found)")
+            folders = daemon_call('list_folders', folder=folder, recursive=True)
+            if folders is None:
+                progress = Progress("Listing folders")
+                folders = RecursiveLister(folder, index=index).iter_folders_recursive(entries=True, progress=progress)
+                run_cancellable(progress, print_paths, folders, "(No folders found)")
+            else:
+                print_paths(folders, "(No folders found)")
         elif intent == "list_duplicates":
             print(f"Finding duplicates in {folder}:")
-            finder = DuplicateFinder(folder)
-            dups = finder.find_by_hash()
+            result = daemon_call('find_duplicates', folder=folder)
+            if result is not None:
+                dups = result['groups']
+            else:
+                dups, _ = find_duplicates(folder, index)
             if not dups:
                 print("No duplicate files found.")
             else:
@@ -157,25 +224,45 @@ def handle_prompt(prompt: str):
                     for p in paths:
                         print(f"  - {p}")
         elif intent == "delete_duplicates":
+            if _batch_mode and not _assume_yes:
+                print(f"Not deleting duplicates in {folder}: deletes in batch mode need --yes.")
+                return
             print(f"Deleting duplicates in {folder}:")
-            finder = DuplicateFinder(folder)
-            dups = finder.find_by_hash()
-            deleted = 0
-            for paths in dups.values():
-                for p in paths[1:]:
-                    os.remove(p)
-                    print(f"Deleted: {p}")
-                    deleted += 1
-            if deleted == 0:
+            dups, cancelled = find_duplicates(folder, index, confirm=True)
+            if cancelled:
+                print("Nothing was deleted.")
+                return
+            targets = [p for paths in dups.values() for p in paths[1:]]
+            if not targets:
                 print("No duplicate files to delete.")
             else:
-                print(f"Deleted {deleted} duplicate files.")
+                deleter = DeleteManager(get_journal())
+                results = deleter.delete_bulk(targets, confirm=False)
+                for p, ok in zip(targets, results):
+                    if ok:
+                        print(f"Deleted: {p}")
+                print(f"Deleted {sum(results)} duplicate files. Say 'undo' to restore them.")
+        elif intent == "undo":
+            for message in get_journal().undo():
+                print(message)
+        elif intent == "dedupe_duplicates":
+            print(f"Linking duplicates in {folder}:")
+            dups, cancelled = find_duplicates(folder, index)
+            if cancelled:
+                print("Nothing was linked.")
+                return
+            report = Deduplicator().dedupe(dups)
+            for dup, keep, method in report.linked:
+                print(f"Linked: {dup} -> {keep} ({method})")
+            for path, reason in report.skipped:
+                print(f"Skipped: {path} ({reason})")
+            print(report.summary())
         elif intent == "move_file":
             if not src or not dest:
                 print("Please specify both the source file and the destination folder (e.g., move \"file\" to Desktop).")
                 return
             print(f"Moving {src} to {dest}...")
-            mover = MoveManager()
+            mover = MoveManager(get_journal())
             success = mover.move_single(src, dest, overwrite=True)
             if success:
                 print(f"Moved {src} to {dest}.")
@@ -186,7 +273,7 @@ def handle_prompt(prompt: str):
                 print("Please specify both the source file and the destination folder (e.g., copy \"file\" to Desktop).")
                 return
             print(f"Copying {src} to {dest}...")
-            copier = CopyManager()
+            copier = CopyManager(get_journal())
             success = copier.copy_single(src, dest, overwrite=True)
             if success:
                 print(f"Copied {src} to {dest}.")
@@ -196,9 +283,12 @@ def handle_prompt(prompt: str):
             if not src:
                 print("Please specify the file or folder to delete (e.g., delete \"file\").")
                 return
+            if _batch_mode and not _assume_yes:
+                print(f"Not deleting {src}: deletes in batch mode need --yes.")
+                return
             print(f"Deleting {src}...")
-            deleter = DeleteManager()
-            success = deleter.delete_single(src, confirm=True)
+            deleter = DeleteManager(get_journal())
+            success = deleter.delete_single(src, confirm=not _batch_mode)
             if success:
                 print(f"Deleted {src}.")
             else:
@@ -206,8 +296,50 @@ def handle_prompt(prompt: str):
     except Exception as e:
         print(f"An error occurred while processing your request: {e}")
 
+def run_batch(path: str, yes: bool = False):
+    """Run one command per line of a file, or of stdin when path is "-". Deletes are refused unless yes is set."""
+    global _batch_mode, _assume_yes
+    _batch_mode, _assume_yes = True, yes
+    stream = sys.stdin if path == "-" else open(path)
+    try:
+        prompts = [line.strip() for line in stream]
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    prompts = [p for p in prompts if p and not p.startswith("#")]
+    # Parse everything up front, so a model backend gets all the prompts in one request
+    for prompt, command in zip(prompts, parse_prompts(prompts)):
+        print(f"> {prompt}")
+        handle_prompt(prompt, command)
+
+def profile_modes(value: str) -> str:
+    # argparse type for --profile: reject unknown modes before anything runs
+    try:
+        Profiler.from_env(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+    return value
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Folderly natural-language file assistant.")
+    parser.add_argument('--profile', nargs='?', const='time', metavar='MODES', type=profile_modes,
+                        help="time each command; MODES is a comma list of time, pstats, collapsed "
+                             "(overrides FOLDERLY_PROFILE)")
+    parser.add_argument('--batch', metavar='FILE', help="run the commands in FILE ('-' for stdin) and exit")
+    parser.add_argument('--yes', action='store_true', help="in --batch mode, delete without asking")
+    args = parser.parse_args()
+    try:
+        check_env_algorithm()
+    except ValueError as e:
+        print(f"FOLDERLY_HASH_ALGO: {e} Using auto.")
+        os.environ["FOLDERLY_HASH_ALGO"] = "auto"
+    if args.profile:
+        _profiler = Profiler.from_env(args.profile)
+    if args.batch:
+        run_batch(args.batch, yes=args.yes)
+        sys.exit(0)
     print("Welcome to Folderly CLI! Type 'exit' or 'quit' to leave.")
+    start_watcher()
     while True:
         try:
             user_input = input("You: ")
@@ -0,0 +1,134 @@
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+import os
+import re
+
+from files.utils import get_user_root_dirs
+
+INTENTS = (
+    "list_files", "list_folders", "list_files_recursive", "list_folders_recursive", "list_duplicates",
+    "delete_duplicates", "dedupe_duplicates", "move_file", "copy_file", "delete_file", "undo",
+)
+
+# All patterns are compiled once at import
+# Keywords start at a word boundary ("link" isn't found in "unlink"), so plurals and -ed/-ing forms still count;
+# "all" must be a whole word ("small", "install" and "allow" don't count)
+_KEYWORDS = re.compile(r'\b(?:undo|list|duplicate|delete|dedupe|link|move|copy|folder|recursive)|\ball\b')
+_QUOTED = re.compile(r'"([^"]+)"')
+_AFTER = {keyword: re.compile(rf'{keyword} ([^ ]+)') for keyword in ("from", "move", "copy")}
+_IN_FOLDER = re.compile(r"in ([\w\- ]+)")
+_TO_QUOTED = re.compile(r'to\s+"([^"]+)"', re.IGNORECASE)
+_TO = re.compile(r'to\s+([\w\- ]+)', re.IGNORECASE)
+
+class Command:
+    """A parsed prompt: what to do, and the folder / source / destination it applies to (None if not given)."""
+    __slots__ = ('intent', 'folder', 'src', 'dest', 'prompt')
+
+    def __init__(self, intent: str, folder: Optional[str] = None, src: Optional[str] = None,
+                 dest: Optional[str] = None, prompt: str = ""):
+        self.intent = intent
+        self.folder = folder
+        self.src = src
+        self.dest = dest
+        self.prompt = prompt
+
+    def __repr__(self) -> str:
+        return f"Command({self.intent!r}, folder={self.folder!r}, src={self.src!r}, dest={self.dest!r})"
+
+def classify(prompt: str) -> str:
+    """Map a prompt to an intent name from the keywords it contains ("unknown" if none apply)."""
+    lowered = prompt.lower()
+    if lowered.strip().startswith("undo"):
+        return "undo"
+    # One scan collects every keyword present; the rules below only test set membership
+    found = set(_KEYWORDS.findall(lowered))
+    if "list" in found and "duplicate" in found:
+        return "list_duplicates"
+    elif "delete" in found and "duplicate" in found:
+        return "delete_duplicates"
+    elif ("dedupe" in found or "link" in found) and "duplicate" in found:
+        return "dedupe_duplicates"
+    elif "move" in found:
+        return "move_file"
+    elif "copy" in found:
+        return "copy_file"
+    elif "delete" in found:
+        return "delete_file"
+    elif "list" in found and "folder" in found:
+        if "recursive" in found or "all" in found:
+            return "list_folders_recursive"
+        return "list_folders"
+    elif "list" in found and ("recursive" in found or "all" in found):
+        return "list_files_recursive"
+    elif "list" in found:
+        return "list_files"
+    return "unknown"
+
+def is_ambiguous(prompt: str) -> bool:
+    """True when the keyword rules matched no intent, or more than one."""
+    lowered = prompt.lower()
+    if lowered.strip().startswith("undo"):
+        return False
+    found = set(_KEYWORDS.findall(lowered))
+    verbs = found & {"list", "move", "copy", "delete"}
+    if "duplicate" in found and ("dedupe" in found or "link" in found):
+        verbs.add("dedupe")
+    return len(verbs) != 1
+
+def extract_path(prompt: str, keyword: Optional[str] = None) -> Optional[str]:
+    """The first quoted string in the prompt, else the word after keyword ("from", "move" or "copy")."""
+    match = _QUOTED.search(prompt)
+    if match:
+        return match.group(1)
+    if keyword:
+        pattern = _AFTER.get(keyword) or re.compile(rf'{re.escape(keyword)} ([^ ]+)')
+        match = pattern.search(prompt)
+        if match:
+            return match.group(1)
+    return None
+
+def extract_dest(prompt: str) -> Optional[str]:
+    """The destination after 'to', quoted or not."""
+    match = _TO_QUOTED.search(prompt)
+    if match:
+        return match.group(1)
+    match = _TO.search(prompt)
+    if match:
+        return match.group(1).strip()
+    return None
+
+@lru_cache(maxsize=1024)
+def _parse_text(prompt: str) -> Tuple[str, Optional[str], Optional[str], Optional[str]]:
+    # Everything that depends only on the prompt's text, so repeated prompts are parsed once
+    src = extract_path(prompt, "from") or extract_path(prompt, "move") or extract_path(prompt, "copy")
+    match = _IN_FOLDER.search(prompt)
+    return classify(prompt), match.group(1) if match else None, src, extract_dest(prompt)
+
+def resolve_folder(prompt: str, folder_hint: Optional[str], roots: Dict[str, object]) -> Optional[str]:
+    lowered = prompt.lower()
+    for name in roots:
+        if name.lower() in lowered or (folder_hint and name.lower() == folder_hint.lower()):
+            return str(roots[name])
+    if folder_hint:
+        return os.path.expanduser(folder_hint)
+    return None
+
+def parse_command(prompt: str) -> Command:
+    """Parse a prompt into a Command with the keyword rules."""
+    intent, folder_hint, src, dest = _parse_text(prompt)
+    return build_command(intent, folder_hint, src, dest, prompt)
+
+def build_command(intent: str, folder_hint: Optional[str], src: Optional[str], dest: Optional[str],
+                  prompt: str = "") -> Command:
+    """Make a Command from extracted parts, resolving root folder names (Desktop, Downloads, ...) to their paths."""
+    roots = get_user_root_dirs()
+    if dest:
+        for key in roots:
+            if dest.lower() == key.lower():
+                dest_folder = roots[key]
+                if src:
+                    dest = os.path.join(dest_folder, os.path.basename(src))
+                else:
+                    dest = str(dest_folder)
+                break
+    return Command(intent, resolve_folder(prompt, folder_hint, roots), src, dest, prompt)
\ No newline at end of file
@@ -0,0 +1,204 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+import http.client
+import json
+import os
+import queue
+import re
+import threading
+
+from ai.intent import INTENTS, Command, build_command, is_ambiguous, parse_command
+
+SYSTEM_PROMPT = (
+    "You turn file-management requests into JSON. The user message is a JSON array of requests. "
+    'Reply with {"commands": [...]} holding one object per request, in order, each with keys '
+    '"intent", "folder", "src" and "dest" (null when not given). '
+    "intent is one of: " + ", ".join(INTENTS) + ', or "unknown". '
+    "folder is the folder to list or search, src the file or folder to move/copy/delete, "
+    "dest the destination. Keep paths exactly as written."
+)
+
+_QUOTED_OR_TEXT = re.compile(r'("[^"]*")|([^"]+)')
+_SPACES = re.compile(r'\s+')
+
+def normalize_prompt(prompt: str) -> str:
+    """Cache key for a prompt: whitespace collapsed outside quotes. Case is kept, since paths are case-sensitive."""
+    parts = []
+    for quoted, text in _QUOTED_OR_TEXT.findall(prompt.strip()):
+        parts.append(quoted or _SPACES.sub(' ', text))
+    return "".join(parts)
+
+class LLMError(Exception):
+    """The model server couldn't be reached or gave an unusable answer."""
+
+class KeywordBackend:
+    """Intent parsing with the keyword rules only."""
+
+    def parse(self, prompt: str) -> Command:
+        return parse_command(prompt)
+
+    def parse_many(self, prompts: List[str]) -> List[Command]:
+        return [parse_command(p) for p in prompts]
+
+class OllamaBackend:
+    """Turns prompts into commands with an Ollama-compatible server, caching answers per prompt."""
+
+    def __init__(self, url: str = "http://127.0.0.1:11434", model: str = "llama3", timeout: float = 30.0,
+                 pool_size: int = 4, cache_size: int = 1024, keep_alive: str = "30m"):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "127.0.0.1"
+        self.port = parts.port or 11434
+        self.model = model
+        self.timeout = timeout
+        self.keep_alive = keep_alive
+        self.cache_size = cache_size
+        self.requests = 0
+        self._pool: queue.LifoQueue = queue.LifoQueue(maxsize=pool_size)
+        self._cache: "OrderedDict[str, Dict]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> 'OllamaBackend':
+        """Build a backend from FOLDERLY_LLM_URL and FOLDERLY_LLM_MODEL."""
+        return cls(url=os.environ.get("FOLDERLY_LLM_URL", "http://127.0.0.1:11434"),
+                   model=os.environ.get("FOLDERLY_LLM_MODEL", "llama3"))
+
+    def _connection(self) -> http.client.HTTPConnection:
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _release(self, conn: http.client.HTTPConnection):
+        try:
+            self._pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def _post(self, path: str, payload: Dict) -> Dict:
+        body = json.dumps(payload).encode()
+        # A pooled connection may have been closed by the server; retry once on a fresh one
+        for attempt in range(2):
+            conn = self._connection() if attempt == 0 else \
+                http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                conn.request("POST", path, body, {"Content-Type": "application/json"})
+                response = conn.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException) as e:
+                conn.close()
+                if attempt == 1:
+                    raise LLMError(f"Model server unavailable: {e}")
+                continue
+            self.requests += 1
+            if response.status != 200:
+                conn.close()
+                raise LLMError(f"Model server returned HTTP {response.status}")
+            self._release(conn)
+            try:
+                return json.loads(data)
+            except ValueError:
+                raise LLMError("Model server returned invalid JSON")
+
+    def _generate(self, prompts: List[str]) -> List[Dict]:
+        result = self._post("/api/generate", {
+            'model': self.model,
+            'system': SYSTEM_PROMPT,
+            'prompt': json.dumps(prompts),
+            'format': 'json',
+            'stream': False,
+            'keep_alive': self.keep_alive,
+            'options': {'temperature': 0},
+        })
+        try:
+            commands = json.loads(result['response'])['commands']
+        except (KeyError, TypeError, ValueError):
+            raise LLMError("Model answer is not in the expected format")
+        if not isinstance(commands, list) or len(commands) != len(prompts):
+            raise LLMError("Model answered a different number of requests")
+        return [c if isinstance(c, dict) else {} for c in commands]
+
+    def _cached(self, key: str) -> Optional[Dict]:
+        with self._cache_lock:
+            fields = self._cache.get(key)
+            if fields is not None:
+                self._cache.move_to_end(key)
+            return fields
+
+    def _store(self, key: str, fields: Dict):
+        with self._cache_lock:
+            self._cache[key] = fields
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def parse_many(self, prompts: List[str]) -> List[Command]:
+        keys = [normalize_prompt(p) for p in prompts]
+        fields = {key: self._cached(key) for key in keys}
+        # Each distinct uncached prompt is sent once, all in a single request
+        missing = list(dict.fromkeys(key for key in keys if fields[key] is None))
+        if missing:
+            first = {key: p for p, key in zip(reversed(prompts), reversed(keys))}
+            for key, answer in zip(missing, self._generate([first[key] for key in missing])):
+                fields[key] = answer
+                self._store(key, answer)
+        return [self._to_command(fields[key], p) for p, key in zip(prompts, keys)]
+
+    def parse(self, prompt: str) -> Command:
+        return self.parse_many([prompt])[0]
+
+    def _to_command(self, fields: Dict, prompt: str) -> Command:
+        intent = fields.get('intent')
+        if intent not in INTENTS:
+            intent = "unknown"
+
+        def text(key: str) -> Optional[str]:
+            value = fields.get(key)
+            return value if isinstance(value, str) and value else None
+        return build_command(intent, text('folder'), text('src'), text('dest'), prompt)
+
+    def close(self):
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+class HybridBackend:
+    """Keyword rules first; the model is only asked about prompts the rules find ambiguous."""
+
+    def __init__(self, model: OllamaBackend):
+        self.model = model
+        self.keywords = KeywordBackend()
+
+    def parse(self, prompt: str) -> Command:
+        return self.parse_many([prompt])[0]
+
+    def parse_many(self, prompts: List[str]) -> List[Command]:
+        commands = self.keywords.parse_many(prompts)
+        unclear = [i for i, p in enumerate(prompts) if is_ambiguous(p)]
+        if unclear:
+            try:
+                answers = self.model.parse_many([prompts[i] for i in unclear])
+            except LLMError as e:
+                print(f"(Model unavailable, using keyword matching: {e})")
+                return commands
+            for i, command in zip(unclear, answers):
+                if command.intent != "unknown":
+                    commands[i] = command
+        return commands
+
+    def close(self):
+        self.model.close()
+
+def get_backend(name: Optional[str] = None):
+    """Build the backend named by name or FOLDERLY_LLM: "off" (default), "ollama" or "ollama-only"."""
+    name = (name or os.environ.get("FOLDERLY_LLM", "off")).lower()
+    if name == "off":
+        return KeywordBackend()
+    if name == "ollama":
+        return HybridBackend(OllamaBackend.from_env())
+    if name == "ollama-only":
+        return OllamaBackend.from_env()
+    raise ValueError(f"Unknown intent backend '{name}'. Choose from off, ollama, ollama-only.")
\ No newline at end of file
@@ -0,0 +1,82 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+import json
+import sys
+import threading
+
+from ai.intent import parse_command
+
+class StubModelServer:
+    """Minimal stand-in for an Ollama server that answers with the keyword parser, for offline testing."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, model: str = "stub"):
+        self.model = model
+        self.requests = 0
+        self.prompts = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # keep-alive, like Ollama
+
+            def _reply(self, status: int, payload: Dict):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                if self.path == "/api/tags":
+                    self._reply(200, {'models': [{'name': stub.model}]})
+                else:
+                    self._reply(404, {'error': "not found"})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                try:
+                    request = json.loads(self.rfile.read(length))
+                    prompts = json.loads(request['prompt'])
+                except (KeyError, TypeError, ValueError):
+                    self._reply(400, {'error': "bad request"})
+                    return
+                if self.path != "/api/generate":
+                    self._reply(404, {'error': "not found"})
+                    return
+                stub.requests += 1
+                stub.prompts += len(prompts)
+                self._reply(200, {'model': stub.model, 'done': True,
+                                  'response': json.dumps({'commands': stub.answer(prompts)})})
+
+            def log_message(self, format, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.url = f"http://{host}:{self.server.server_address[1]}"
+        self._thread = None
+
+    def answer(self, prompts: List[str]) -> List[Dict]:
+        answers = []
+        for prompt in prompts:
+            command = parse_command(prompt)
+            answers.append({'intent': command.intent, 'folder': command.folder, 'src': command.src,
+                            'dest': command.dest})
+        return answers
+
+    def start(self) -> 'StubModelServer':
+        self._thread = threading.Thread(target=self.server.serve_forever, name="folderly-llm-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+if __name__ == "__main__":
+    # Usage: python -m ai.llm_stub [port]   then: FOLDERLY_LLM=ollama FOLDERLY_LLM_URL=<url> python -m ai.cli_agent
+    stub = StubModelServer(port=int(sys.argv[1]) if len(sys.argv) > 1 else 11434)
+    print(f"Stub model server listening on {stub.url}")
+    try:
+        stub.server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStub stopped.")
\ No newline at end of file
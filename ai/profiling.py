@@ -0,0 +1,220 @@
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+import cProfile
+import os
+import re
+import sys
+import threading
+import time
+
+from files.utils import get_folderly_dir, read_io_counters
+
+PROFILE_MODES = ('time', 'pstats', 'collapsed')
+
+# Audit events (see sys.addaudithook) counted while a command runs, and the name each is reported under.
+# builtins.open, io.open and os.open all raise "open". os.stat has no audit event, so os.stat and os.lstat are
+# wrapped below and DirEntry.stat goes through files.utils.stat_entry, which raises "folderly.stat"
+_COUNTED = {
+    'open': 'open',
+    'folderly.stat': 'stat',
+    'os.scandir': 'scandir',
+    'os.listdir': 'listdir',
+    'os.rename': 'rename',
+    'os.remove': 'remove',
+    'os.mkdir': 'mkdir',
+    'os.rmdir': 'rmdir',
+}
+
+_active: Optional['CallCounter'] = None
+_in_hook = threading.local()
+_hook_installed = False
+
+def _audit(event: str, args: tuple):
+    counter = _active
+    if counter is None or event not in _COUNTED or getattr(_in_hook, 'busy', False):
+        return
+    _in_hook.busy = True
+    try:
+        with counter._lock:
+            counter.counts[_COUNTED[event]] += 1
+    finally:
+        _in_hook.busy = False
+
+def _counting(func):
+    def wrapper(*args, **kwargs):
+        _audit('folderly.stat', args)
+        return func(*args, **kwargs)
+    wrapper.__wrapped__ = func
+    # shutil checks these sets before passing follow_symlinks or dir_fd
+    for supported in (os.supports_dir_fd, os.supports_fd, os.supports_follow_symlinks):
+        if func in supported:
+            supported.add(wrapper)
+    return wrapper
+
+class CallCounter:
+    """Counts filesystem calls from every thread while active, through an audit hook."""
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def start(self):
+        # Audit hooks can't be removed, so one hook is installed per process and only counts while a counter is active
+        global _active, _hook_installed
+        self.counts.clear()
+        if not _hook_installed:
+            sys.addaudithook(_audit)
+            os.stat, os.lstat = _counting(os.stat), _counting(os.lstat)
+            _hook_installed = True
+        _active = self
+
+    def stop(self):
+        global _active
+        if _active is self:
+            _active = None
+
+class StackSampler:
+    """Samples every thread's stack at a fixed interval into collapsed-stack lines."""
+
+    def __init__(self, interval: float = 0.001):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _sample(self):
+        me = threading.get_ident()
+        names = {t.ident: t.name for t in threading.enumerate()}
+        for ident, frame in sys._current_frames().items():
+            if ident == me:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            self.stacks[";".join(reversed(stack))] += 1
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def start(self):
+        self.stacks.clear()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="folderly-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def write(self, path: Path):
+        with open(path, 'w') as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+
+def check_modes(modes: Set[str]):
+    """Raise ValueError naming any mode that isn't one of PROFILE_MODES."""
+    unknown = set(modes) - set(PROFILE_MODES)
+    if unknown:
+        raise ValueError(f"Unknown profile mode '{', '.join(sorted(unknown))}'. "
+                         f"Choose from {', '.join(PROFILE_MODES)}.")
+
+def parse_modes(value: str) -> Set[str]:
+    """The modes in a comma list such as "pstats,collapsed" ("1" means "time"), always including 'time'."""
+    modes = {'time' if m == '1' else m for m in value.lower().split(',') if m}
+    check_modes(modes)
+    return modes | {'time'}
+
+class Profiler:
+    """Opt-in per-command timing, call counts and profile dumps for the CLI agent; a no-op when disabled."""
+
+    def __init__(self, modes: Optional[Set[str]] = None, output_dir: Optional[Path] = None):
+        modes = set(modes or ())
+        check_modes(modes)
+        self.modes = modes
+        self.enabled = bool(modes)
+        self.output_dir = output_dir
+        self.label = ""
+        self.phases: List[tuple] = []
+        self.counter = CallCounter()
+        self._cprofile: Optional[cProfile.Profile] = None
+        self._sampler: Optional[StackSampler] = None
+        self._start = 0.0
+        self._last = 0.0
+        self._io_before: Dict[str, int] = {}
+
+    @classmethod
+    def from_env(cls, value: Optional[str] = None) -> 'Profiler':
+        """Build a profiler from a mode list such as "time" or "pstats,collapsed" (default: FOLDERLY_PROFILE)."""
+        value = os.environ.get("FOLDERLY_PROFILE", "") if value is None else value
+        if value in ("", "0"):
+            return cls()
+        return cls(parse_modes(value))
+
+    def start(self, label: str):
+        if not self.enabled:
+            return
+        self.label = label
+        self.phases = []
+        self._io_before = read_io_counters()
+        self.counter.start()
+        if 'pstats' in self.modes:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        if 'collapsed' in self.modes:
+            self._sampler = StackSampler()
+            self._sampler.start()
+        self._start = self._last = time.perf_counter()
+
+    def mark(self, phase: str):
+        if not self.enabled or not self._start:
+            return
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def stop(self, phase: str = "execute"):
+        if not self.enabled or not self._start:
+            return
+        self.mark(phase)
+        total = time.perf_counter() - self._start
+        self._start = 0.0
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._sampler is not None:
+            self._sampler.stop()
+        self.counter.stop()
+        io_after = read_io_counters()
+        self._report(total, {k: io_after[k] - self._io_before.get(k, 0) for k in ('syscr', 'syscw') if k in io_after})
+
+    def _output_path(self, suffix: str) -> Path:
+        folder = self.output_dir or get_folderly_dir() / "profiles"
+        folder.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r'[^\w]+', '_', self.label).strip('_')[:40] or "command"
+        return folder / f"{time.strftime('%Y%m%d-%H%M%S')}-{slug}{suffix}"
+
+    def _report(self, total: float, syscalls: Dict[str, int]):
+        phases = ", ".join(f"{name} {seconds * 1000:.2f} ms" for name, seconds in self.phases)
+        calls = ", ".join(f"{name} {self.counter.counts[name]}" for name in _COUNTED.values())
+        lines = [f"[profile] {self.label}: {total * 1000:.2f} ms ({phases})",
+                 f"[profile] fs calls: {calls}"]
+        if syscalls:
+            lines.append(f"[profile] syscalls: {syscalls.get('syscr', 0)} read, {syscalls.get('syscw', 0)} write")
+        if self._cprofile is not None:
+            path = self._output_path(".pstats")
+            self._cprofile.dump_stats(path)
+            self._cprofile = None
+            lines.append(f"[profile] cProfile stats: {path} (view with: python -m pstats {path})")
+        if self._sampler is not None:
+            path = self._output_path(".collapsed")
+            self._sampler.write(path)
+            self._sampler = None
+            lines.append(f"[profile] collapsed stacks: {path} (render with flamegraph.pl or speedscope)")
+        for line in lines:
+            print(line, file=sys.stderr)
\ No newline at end of file
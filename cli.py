@@ -0,0 +1,307 @@
+"""Non-interactive Folderly command line, mirroring the menu in main.py."""
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+import argparse
+import sys
+
+from files.bench import add_arguments as add_bench_arguments, run_from_args as run_bench
+from files.bulk_delete import BulkDeleter
+from files.copy_files import CopyManager
+from files.dedupe import Deduplicator
+from files.delete_files import DeleteManager
+from files.duplicate_files import DuplicateFinder
+from files.hash_algos import available_algorithms
+from files.hash_cache import HashCache
+from files.hash_engine import HashEngine
+from files.index import FileIndex
+from files.journal import OperationJournal
+from files.list_files import FileLister
+from files.move_files import MoveManager
+from files.output import FORMATS, RecordWriter
+from files.progress import cancel_on_interrupt, make_progress
+from files.recursive_list import RecursiveLister
+from files.validate import validate_directory
+
+def cmd_list(args, out: RecordWriter) -> int:
+    folder = str(validate_directory(args.folder))
+    index = None
+    if args.index:
+        index = FileIndex()
+        index.refresh(folder)
+    try:
+        return _list(args, out, folder, index)
+    finally:
+        if index is not None:
+            index.close()
+
+def _list(args, out: RecordWriter, folder: str, index: Optional[FileIndex]) -> int:
+    if args.after or args.before:
+        if args.recursive or args.type != 'files':
+            raise ValueError("--after/--before list the folder's own files only")
+        entries = FileLister(folder, index=index).list_by_date(args.after, args.before, entries=True)
+    elif args.recursive:
+        lister = RecursiveLister(folder, index=index)
+        if args.type == 'folders':
+            entries = lister.iter_folders_recursive(entries=True)
+        elif args.type == 'files':
+            entries = lister.iter_files_recursive(args.ext, entries=True)
+        else:
+            entries = (e for it in (lister.iter_folders_recursive(entries=True),
+                                    lister.iter_files_recursive(args.ext, entries=True)) for e in it)
+    else:
+        lister = FileLister(folder, index=index)
+        if args.ext:
+            entries = lister.list_by_extension(args.ext, entries=True)
+        elif args.type == 'folders':
+            entries = lister.iter_folders(entries=True)
+        elif args.type == 'files':
+            entries = lister.iter_files(entries=True)
+        else:
+            entries = lister.list_all(entries=True)
+    out.write_entries(entries)
+    return 0
+
+def _finder(args, **kwargs) -> DuplicateFinder:
+    return DuplicateFinder(validate_directory(args.folder), recursive=args.recursive, extension=args.ext,
+                           quiet=True, progress=make_progress("Finding duplicates"), **kwargs)
+
+def _scan(finder: DuplicateFinder, method, *method_args, **method_kwargs):
+    with cancel_on_interrupt(finder.token):
+        groups = method(*method_args, **method_kwargs)
+    finder.progress.finish()
+    for path, message in finder.errors:
+        print(message, file=sys.stderr)
+    if finder.progress.cancelled:
+        print("Scan cancelled, results are partial.", file=sys.stderr)
+    return groups
+
+def cmd_duplicates(args, out: RecordWriter) -> int:
+    if args.by in ('name', 'size'):
+        finder = _finder(args)
+        groups = _scan(finder, finder.find_by_name if args.by == 'name' else finder.find_by_size)
+    else:
+        cache, engine = HashCache(), HashEngine.from_env()
+        try:
+            finder = _finder(args, cache=cache, engine=engine)
+            if args.by == 'hash':
+                groups = _scan(finder, finder.find_by_hash_staged, hash_algo=args.hash_algo, confirm=args.confirm)
+            else:
+                groups = _scan(finder, finder.find_similar, args.threshold)
+        finally:
+            cache.close()
+            engine.close()
+    out.write_groups(groups)
+    return 0
+
+def cmd_shared(args, out: RecordWriter) -> int:
+    engine = HashEngine.from_env()
+    try:
+        finder = _finder(args, engine=engine)
+        report = _scan(finder, finder.find_shared_chunks, args.min_size * 1024 * 1024, args.min_shared * 1024 * 1024)
+    finally:
+        engine.close()
+    for a, b, shared in report.pairs:
+        out.write_record({'a': str(a), 'b': str(b), 'shared_bytes': shared,
+                          'a_size': report.sizes[a], 'b_size': report.sizes[b]})
+    print(report.summary(), file=sys.stderr)
+    return 0
+
+def cmd_dedupe(args, out: RecordWriter) -> int:
+    cache, engine = HashCache(), HashEngine.from_env()
+    try:
+        finder = _finder(args, cache=cache, engine=engine)
+        # Deleting on a non-cryptographic digest alone could lose a file to a collision
+        groups = _scan(finder, finder.find_by_hash_staged, hash_algo=args.hash_algo,
+                       confirm=args.confirm or args.delete)
+    finally:
+        cache.close()
+        engine.close()
+    if finder.progress.cancelled:
+        return 1
+    if args.delete:
+        targets = [p for paths in groups.values() for p in paths[1:]]
+        if not args.yes:
+            for target in targets:
+                out.write_record({'action': 'would_delete', 'path': str(target)}, str(target))
+            print(f"{len(targets)} duplicates would be deleted (kept one per group). Rerun with --yes.",
+                  file=sys.stderr)
+            return 0
+        journal = OperationJournal()
+        results = DeleteManager(journal).delete_bulk(targets, confirm=False)
+        journal.flush()
+        for target, ok in zip(targets, results):
+            out.write_record({'action': 'delete', 'path': str(target), 'ok': ok})
+        return 0 if all(results) else 1
+    report = Deduplicator(mode=args.link).dedupe(groups)
+    for dup, keep, method in report.linked:
+        out.write_record({'action': 'link', 'path': str(dup), 'target': str(keep), 'method': method})
+    for path, reason in report.skipped:
+        out.write_record({'action': 'skip', 'path': str(path), 'reason': reason})
+    print(report.summary(), file=sys.stderr)
+    return 0
+
+def cmd_move(args, out: RecordWriter) -> int:
+    dest = validate_directory(args.to)
+    mover = MoveManager(None if args.dry_run else OperationJournal())
+    if args.dry_run:
+        plan = mover.plan_multiple(args.sources, dest, overwrite=args.overwrite)
+        for step in plan.steps:
+            out.write_record({'src': str(step.src), 'dest': str(step.dest), 'method': step.method})
+        print(plan.describe(), file=sys.stderr)
+        return 0
+    results = mover.move_multiple(args.sources, dest, overwrite=args.overwrite)
+    mover.journal.flush()
+    for src, ok in zip(args.sources, results):
+        out.write_record({'src': src, 'dest': str(dest / Path(src).name), 'ok': ok})
+    return 0 if all(results) else 1
+
+def cmd_copy(args, out: RecordWriter) -> int:
+    dest = validate_directory(args.to)
+    journal = OperationJournal()
+    copier = CopyManager(journal)
+    progress = make_progress("Copying")
+    with cancel_on_interrupt(progress.token):
+        results = copier.copy_bulk(args.sources, dest, overwrite=args.overwrite, progress=progress)
+    progress.finish()
+    journal.flush()
+    for src, ok in zip(args.sources, results):
+        out.write_record({'src': src, 'dest': str(dest / Path(src).name), 'ok': ok})
+    print(copier.last_report.summary(), file=sys.stderr)
+    return 0 if all(results) else 1
+
+def cmd_delete(args, out: RecordWriter) -> int:
+    journal = None if args.permanent else OperationJournal()
+    deleter = DeleteManager(journal)
+    if not args.yes:
+        print(f"Would delete {BulkDeleter().plan(args.targets, args.recursive).describe()}. Rerun with --yes.",
+              file=sys.stderr)
+        return 0
+    progress = make_progress("Deleting")
+    results = deleter.delete_bulk(args.targets, recursive=args.recursive, confirm=False, progress=progress)
+    progress.finish()
+    if journal is not None:
+        journal.flush()
+    for target, ok in zip(args.targets, results):
+        out.write_record({'path': target, 'ok': ok})
+    return 0 if all(results) else 1
+
+def cmd_undo(args, out: RecordWriter) -> int:
+    journal = OperationJournal()
+    for message in journal.undo():
+        out.write_record({'message': message}, message)
+    journal.flush()
+    return 0
+
+def cmd_empty_trash(args, out: RecordWriter) -> int:
+    if not args.yes:
+        print("This permanently removes everything in the trash. Rerun with --yes.", file=sys.stderr)
+        return 0
+    out.write_record({'removed': OperationJournal().empty_trash()})
+    return 0
+
+def _date(text: str) -> datetime:
+    return datetime.fromisoformat(text)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="folderly", description="Folderly file management, non-interactive.")
+    parser.add_argument('--format', '-f', choices=FORMATS, default='text', help="output format (default text)")
+    parser.add_argument('-0', dest='format', action='store_const', const='null',
+                        help="NUL-terminated paths, same as --format null")
+    parser.add_argument('--stat', action='store_true', help="include size and mtime in ndjson/json listings")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    def scan_options(p, extension: bool = True):
+        p.add_argument('folder')
+        p.add_argument('-r', '--recursive', action='store_true')
+        if extension:
+            p.add_argument('--ext', help="only files with this extension, e.g. .pdf")
+
+    def hash_options(p):
+        p.add_argument('--hash', dest='hash_algo', choices=['auto'] + available_algorithms(),
+                       help="hash algorithm (default FOLDERLY_HASH_ALGO or auto, the fastest available)")
+        p.add_argument('--confirm', action='store_true', help="re-check groups with sha256")
+
+    p = sub.add_parser('list', help="list items (menu 1-7)")
+    scan_options(p)
+    p.add_argument('--type', choices=('all', 'files', 'folders'), default='files')
+    p.add_argument('--after', type=_date, help="modified after (ISO date)")
+    p.add_argument('--before', type=_date, help="modified before (ISO date)")
+    p.add_argument('--index', action='store_true',
+                   help="answer from the file index (~/.folderly/index.db), refreshing changed folders first")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser('duplicates', help="find duplicates (menu 14-16, 21)")
+    scan_options(p)
+    p.add_argument('--by', choices=('name', 'size', 'hash', 'similar'), default='hash')
+    p.add_argument('--threshold', type=int, default=6, help="max differing bits for --by similar")
+    hash_options(p)
+    p.set_defaults(func=cmd_duplicates)
+
+    p = sub.add_parser('shared', help="find files sharing content, by content-defined chunks (menu 22)")
+    scan_options(p)
+    p.add_argument('--min-size', type=int, default=1, help="only files of at least this many MB (default 1)")
+    p.add_argument('--min-shared', type=int, default=1, help="report pairs sharing at least this many MB (default 1)")
+    p.set_defaults(func=cmd_shared)
+
+    p = sub.add_parser('dedupe', help="delete or link duplicates by content hash (menu 17-18)")
+    scan_options(p)
+    action = p.add_mutually_exclusive_group(required=True)
+    action.add_argument('--delete', action='store_true', help="delete all but one file per group (undoable)")
+    action.add_argument('--link', choices=('auto', 'reflink', 'hardlink'), help="replace duplicates with links")
+    p.add_argument('--yes', action='store_true', help="actually delete (without it, only list what would go)")
+    hash_options(p)
+    p.set_defaults(func=cmd_dedupe)
+
+    for name, func, help_text in (('move', cmd_move, "move files/folders (menu 8-9)"),
+                                  ('copy', cmd_copy, "copy files/folders (menu 12-13)")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument('sources', nargs='+')
+        p.add_argument('--to', required=True, help="destination folder")
+        p.add_argument('--overwrite', action='store_true')
+        if name == 'move':
+            p.add_argument('--dry-run', action='store_true', help="only show the plan")
+        p.set_defaults(func=func)
+
+    p = sub.add_parser('delete', help="delete files/folders (menu 10-11)")
+    p.add_argument('targets', nargs='+')
+    p.add_argument('-r', '--recursive', action='store_true')
+    p.add_argument('--permanent', action='store_true', help="skip the trash (cannot be undone)")
+    p.add_argument('--yes', action='store_true', help="actually delete (without it, only show the plan)")
+    p.set_defaults(func=cmd_delete)
+
+    sub.add_parser('undo', help="undo the last move/copy/delete (menu 19)").set_defaults(func=cmd_undo)
+    p = sub.add_parser('empty-trash', help="permanently remove trashed files (menu 20)")
+    p.add_argument('--yes', action='store_true')
+    p.set_defaults(func=cmd_empty_trash)
+
+    p = sub.add_parser('bench', help="benchmark operations on a synthetic tree")
+    add_bench_arguments(p)
+    p.set_defaults(func=None)
+    return parser
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    if args.command == 'bench':
+        return run_bench(args)
+    out = RecordWriter(args.format, stat=args.stat)
+    try:
+        # Anything the managers print is a message, not a result: keep stdout machine-readable
+        with redirect_stdout(sys.stderr):
+            return args.func(args, out)
+    except (FileNotFoundError, NotADirectoryError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        out.close()
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        sys.exit(130)
+    except BrokenPipeError:
+        # The reader (e.g. head) went away; don't print a traceback or try to flush again
+        sys.stdout = None
+        sys.exit(0)
\ No newline at end of file
@@ -0,0 +1,194 @@
+from concurrent.futures import Executor, ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Union
+import asyncio
+import concurrent.futures
+import os
+import threading
+
+from files.bulk_copy import BulkCopier, BulkCopyReport
+from files.bulk_delete import BulkDeleter
+from files.duplicate_files import DuplicateFinder
+from files.entry import FileEntry
+from files.hash_cache import HashCache
+from files.hash_engine import HashEngine
+from files.list_files import FileLister
+from files.move_planner import MovePlan, MovePlanner
+from files.progress import CancelToken, Progress
+from files.recursive_list import RecursiveLister
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+def get_executor() -> ThreadPoolExecutor:
+    """Shared thread pool that all async facades offload blocking filesystem work to."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) + 4),
+                                           thread_name_prefix="folderly-async")
+        return _executor
+
+def shutdown_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+_DONE = object()
+
+async def stream(make_iterator: Callable[[], Iterator], executor: Optional[Executor] = None,
+                 max_pending: int = 64, batch_size: int = 256) -> AsyncIterator:
+    """Run a blocking iterator on the executor and yield its items asynchronously, with backpressure."""
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+    stop = threading.Event()
+
+    def put(item) -> bool:
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while True:
+            try:
+                future.result(timeout=0.1)
+                return True
+            except concurrent.futures.TimeoutError:
+                if stop.is_set():
+                    future.cancel()
+                    return False
+
+    def produce():
+        batch = []
+        try:
+            for item in make_iterator():
+                if stop.is_set():
+                    return
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    if not put(batch):
+                        return
+                    batch = []
+            if batch and not put(batch):
+                return
+            put(_DONE)
+        except BaseException as e:
+            put(e)
+
+    producer = loop.run_in_executor(executor or get_executor(), produce)
+    try:
+        while True:
+            batch = await queue.get()
+            if batch is _DONE:
+                break
+            if isinstance(batch, BaseException):
+                raise batch
+            for item in batch:
+                yield item
+        await producer
+    finally:
+        stop.set()
+
+async def _run(func: Callable, *args, executor: Optional[Executor] = None, token: Optional[CancelToken] = None):
+    # Cancelling the awaiting task can't interrupt the worker thread; the token tells the job to stop
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor or get_executor(), func, *args)
+    except asyncio.CancelledError:
+        if token is not None:
+            token.cancel()
+        raise
+
+class AsyncFileLister:
+    """Async counterpart of FileLister and RecursiveLister; listings stream as FileEntry records."""
+
+    def __init__(self, directory: Union[str, Path], index=None, executor: Optional[Executor] = None):
+        self.lister = FileLister(str(directory), index=index)
+        self.rec_lister = RecursiveLister(str(directory), index=index)
+        self.executor = executor
+
+    def iter_files(self) -> AsyncIterator[FileEntry]:
+        return stream(lambda: self.lister.iter_files(entries=True), self.executor)
+
+    def iter_folders(self) -> AsyncIterator[FileEntry]:
+        return stream(lambda: self.lister.iter_folders(entries=True), self.executor)
+
+    def iter_files_recursive(self, extension: Optional[str] = None) -> AsyncIterator[FileEntry]:
+        return stream(lambda: self.rec_lister.iter_files_recursive(extension, entries=True), self.executor)
+
+    def iter_folders_recursive(self) -> AsyncIterator[FileEntry]:
+        return stream(lambda: self.rec_lister.iter_folders_recursive(entries=True), self.executor)
+
+    async def list_by_extension(self, extension: str) -> List[FileEntry]:
+        return await _run(lambda: self.lister.list_by_extension(extension, entries=True), executor=self.executor)
+
+    async def list_by_date(self, after: Optional[datetime] = None, before: Optional[datetime] = None) -> List[FileEntry]:
+        return await _run(lambda: self.lister.list_by_date(after, before, entries=True), executor=self.executor)
+
+class AsyncDuplicateFinder:
+    """Async counterpart of DuplicateFinder. Nothing is printed; unreadable files are returned in the result."""
+
+    def __init__(self, directory: Union[str, Path], recursive: bool = False, extension: Optional[str] = None,
+                 cache: Optional[HashCache] = None, engine: Optional[HashEngine] = None, index=None,
+                 executor: Optional[Executor] = None):
+        self.directory = directory
+        self.recursive = recursive
+        self.extension = extension
+        self.cache = cache
+        self.engine = engine
+        self.index = index
+        self.executor = executor
+
+    async def _find(self, method: Callable[[DuplicateFinder], Dict]) -> Dict:
+        # A finder per call, so concurrent calls don't share errors, stats or a cancel token
+        finder = DuplicateFinder(self.directory, recursive=self.recursive, extension=self.extension,
+                                 cache=self.cache, engine=self.engine, index=self.index, quiet=True)
+        groups = await _run(method, finder, executor=self.executor, token=finder.token)
+        return {
+            'groups': {str(k): [str(p) for p in v] for k, v in groups.items()},
+            'stats': dict(finder.stats),
+            'errors': [{'path': str(p), 'error': msg} for p, msg in finder.errors],
+        }
+
+    async def find_by_name(self) -> Dict:
+        return await self._find(DuplicateFinder.find_by_name)
+
+    async def find_by_size(self) -> Dict:
+        return await self._find(DuplicateFinder.find_by_size)
+
+    async def find_by_hash(self, hash_algo: Optional[str] = None, confirm: bool = False) -> Dict:
+        return await self._find(lambda finder: finder.find_by_hash_staged(hash_algo, confirm=confirm))
+
+class AsyncFileManager:
+    """Async move/copy/delete. No prompts or printing: callers confirm first and get structured results."""
+
+    def __init__(self, workers: Optional[int] = None, executor: Optional[Executor] = None):
+        self.workers = workers
+        self.executor = executor
+
+    async def plan_move(self, sources: Iterable[Union[str, Path]], dest_folder: Union[str, Path],
+                        overwrite: bool = False) -> MovePlan:
+        planner = MovePlanner(overwrite=overwrite, workers=self.workers)
+        return await _run(planner.plan_into, list(sources), dest_folder, executor=self.executor)
+
+    async def move(self, sources: Iterable[Union[str, Path]], dest_folder: Union[str, Path],
+                   overwrite: bool = False) -> MovePlan:
+        progress = Progress("Moving")
+        planner = MovePlanner(overwrite=overwrite, workers=self.workers, progress=progress)
+        return await _run(planner.move, list(sources), dest_folder, executor=self.executor, token=progress.token)
+
+    async def copy(self, sources: Iterable[Union[str, Path]], dest_folder: Union[str, Path],
+                   overwrite: bool = False) -> BulkCopyReport:
+        progress = Progress("Copying")
+        copier = BulkCopier(workers=self.workers, overwrite=overwrite, progress=progress)
+        return await _run(copier.copy_tree, list(sources), dest_folder, executor=self.executor, token=progress.token)
+
+    async def delete(self, targets: Iterable[Union[str, Path]], recursive: bool = False,
+                     use_trash: bool = False) -> Dict:
+        progress = Progress("Deleting")
+        deleter = BulkDeleter(workers=self.workers, use_trash=use_trash, quiet=True, progress=progress)
+        plan = await _run(deleter.plan, list(targets), recursive, executor=self.executor, token=progress.token)
+        results = await _run(deleter.execute, plan, executor=self.executor, token=progress.token)
+        return {
+            'plan': {'files': plan.files, 'dirs': plan.dirs, 'bytes': plan.bytes},
+            'results': [{'path': str(t), 'ok': ok} for t, ok in zip(plan.targets, results)],
+            'errors': [{'path': str(p), 'error': msg} for p, msg in deleter.errors],
+        }
\ No newline at end of file
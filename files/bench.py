@@ -0,0 +1,255 @@
+from contextlib import redirect_stdout
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+from files.copy_files import CopyManager
+from files.delete_files import DeleteManager
+from files.duplicate_files import DuplicateFinder
+from files.hash_cache import HashCache
+from files.hash_engine import HashEngine
+from files.list_files import FileLister
+from files.move_files import MoveManager
+from files.recursive_list import RecursiveLister
+from files.utils import read_io_counters
+
+SIZE_DISTRIBUTIONS = ('fixed', 'uniform', 'lognormal')
+EXTENSIONS = ('.txt', '.jpg', '.pdf', '.mp3', '.bin')
+
+class TreeSpec:
+    """Shape of a synthetic benchmark tree. The same spec and seed always produce the same tree."""
+
+    def __init__(self, depth: int = 3, fanout: int = 4, files_per_dir: int = 20, size_dist: str = 'lognormal',
+                 mean_size: int = 64 * 1024, max_size: int = 16 * 1024 * 1024, dup_ratio: float = 0.2,
+                 seed: int = 42):
+        if size_dist not in SIZE_DISTRIBUTIONS:
+            raise ValueError(f"Unknown size distribution '{size_dist}'. Choose from {', '.join(SIZE_DISTRIBUTIONS)}.")
+        self.depth = depth
+        self.fanout = fanout
+        self.files_per_dir = files_per_dir
+        self.size_dist = size_dist
+        self.mean_size = mean_size
+        self.max_size = max_size
+        self.dup_ratio = dup_ratio
+        self.seed = seed
+
+    def to_dict(self) -> Dict:
+        return dict(vars(self))
+
+    def _size(self, rng: random.Random) -> int:
+        if self.size_dist == 'fixed':
+            size = self.mean_size
+        elif self.size_dist == 'uniform':
+            size = rng.randint(0, 2 * self.mean_size)
+        else:
+            # Many small files and a long tail of large ones, like a real home folder
+            size = int(rng.lognormvariate(0, 1.0) * self.mean_size / 1.6487)
+        return min(size, self.max_size)
+
+def generate_tree(root: Union[str, Path], spec: TreeSpec) -> Dict:
+    """Create spec's tree of folders and files under root. Returns counts of what was written."""
+    rng = random.Random(spec.seed)
+    root = Path(root)
+    totals = {'files': 0, 'dirs': 0, 'bytes': 0, 'duplicates': 0}
+    originals: List[bytes] = []
+    level = [root]
+    root.mkdir(parents=True, exist_ok=True)
+    for depth in range(spec.depth + 1):
+        next_level = []
+        for folder in level:
+            for i in range(spec.files_per_dir):
+                if originals and rng.random() < spec.dup_ratio:
+                    data = rng.choice(originals)
+                    totals['duplicates'] += 1
+                else:
+                    data = rng.randbytes(spec._size(rng))
+                    # Keep a bounded pool of originals to copy duplicates from
+                    if len(originals) < 256:
+                        originals.append(data)
+                    else:
+                        originals[rng.randrange(256)] = data
+                (folder / f"file_{i}{rng.choice(EXTENSIONS)}").write_bytes(data)
+                totals['files'] += 1
+                totals['bytes'] += len(data)
+            if depth < spec.depth:
+                for j in range(spec.fanout):
+                    sub = folder / f"dir_{j}"
+                    sub.mkdir()
+                    totals['dirs'] += 1
+                    next_level.append(sub)
+        level = next_level
+    return totals
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def measure(func: Callable, files: int = 0, nbytes: int = 0) -> Dict:
+    """Run func once and return its wall time, read/write syscalls, peak RSS and throughput."""
+    io_before = read_io_counters()
+    start = time.perf_counter()
+    # Messages printed by the managers would only add noise to the timings
+    with redirect_stdout(io.StringIO()):
+        result = func()
+    wall = time.perf_counter() - start
+    io_after = read_io_counters()
+    if files == 0 and isinstance(result, (list, dict)):
+        files = len(result)
+    stats = {
+        'wall': round(wall, 6),
+        'read_syscalls': io_after.get('syscr', 0) - io_before.get('syscr', 0),
+        'write_syscalls': io_after.get('syscw', 0) - io_before.get('syscw', 0),
+        'peak_rss_mb': round(_peak_rss_mb(), 1),
+        'items': files,
+        'items_per_sec': round(files / wall, 1) if wall else 0.0,
+    }
+    if nbytes:
+        stats['mb_per_sec'] = round(nbytes / (1024 * 1024) / wall, 2) if wall else 0.0
+    return stats
+
+class Benchmark:
+    """Times listing, duplicate finding and copy/move/delete on a synthetic tree in a temp dir."""
+
+    def __init__(self, spec: TreeSpec, repeat: int = 3, workdir: Optional[Union[str, Path]] = None):
+        self.spec = spec
+        self.repeat = repeat
+        self.workdir = Path(workdir) if workdir else None
+
+    def _best(self, func: Callable, files: int = 0, nbytes: int = 0) -> Dict:
+        runs = [measure(func, files, nbytes) for _ in range(self.repeat)]
+        return min(runs, key=lambda r: r['wall'])
+
+    def run(self, progress: Callable[[str], None] = print) -> Dict:
+        base = Path(tempfile.mkdtemp(prefix="folderly-bench-", dir=self.workdir))
+        # Folderly's state goes to the temp dir too, so e.g. resolving the 'auto' hash doesn't touch ~/.folderly
+        home = os.environ.get("FOLDERLY_HOME")
+        os.environ["FOLDERLY_HOME"] = str(base / "home")
+        try:
+            tree = base / "tree"
+            progress(f"Generating tree in {tree}...")
+            totals = generate_tree(tree, self.spec)
+            nfiles, nbytes = totals['files'], totals['bytes']
+            engine = HashEngine.from_env()
+            results = {}
+
+            def record(name: str, stats: Dict):
+                results[name] = stats
+                progress(f"  {name:<24} {stats['wall'] * 1000:10.1f} ms  {stats['items_per_sec']:>12.0f} items/s")
+
+            record('list_files', self._best(lambda: FileLister(str(tree)).list_files()))
+            record('list_files_recursive', self._best(lambda: RecursiveLister(str(tree)).list_files_recursive()))
+            record('list_folders_recursive', self._best(lambda: RecursiveLister(str(tree)).list_folders_recursive()))
+            record('list_by_extension', self._best(lambda: RecursiveLister(str(tree)).list_files_recursive('.txt')))
+
+            def finder(**kwargs) -> DuplicateFinder:
+                return DuplicateFinder(tree, recursive=True, engine=engine, quiet=True, **kwargs)
+            record('duplicates_by_name', self._best(lambda: finder().find_by_name(), nfiles))
+            record('duplicates_by_size', self._best(lambda: finder().find_by_size(), nfiles))
+            record('duplicates_by_hash', self._best(lambda: finder().find_by_hash(), nfiles, nbytes))
+            record('duplicates_staged', self._best(lambda: finder().find_by_hash_staged(), nfiles, nbytes))
+            cache = HashCache(base / "hash_cache.db")
+            try:
+                finder(cache=cache).find_by_hash_staged()
+                record('duplicates_staged_cached',
+                       self._best(lambda: finder(cache=cache).find_by_hash_staged(), nfiles, nbytes))
+            finally:
+                cache.close()
+
+            copy_runs, move_runs, delete_runs = [], [], []
+            for i in range(self.repeat):
+                dest = base / f"copy_{i}"
+                dest.mkdir()
+                copy_runs.append(measure(lambda: CopyManager().copy_bulk([tree], dest), nfiles, nbytes))
+                moved = base / f"moved_{i}"
+                moved.mkdir()
+                move_runs.append(measure(lambda: MoveManager().move_multiple([dest / tree.name], moved), nfiles, nbytes))
+                delete_runs.append(measure(lambda: DeleteManager().delete_bulk(
+                    [moved / tree.name], recursive=True, confirm=False), nfiles, nbytes))
+            record('copy_bulk', min(copy_runs, key=lambda r: r['wall']))
+            record('move_multiple', min(move_runs, key=lambda r: r['wall']))
+            record('delete_bulk', min(delete_runs, key=lambda r: r['wall']))
+            engine.close()
+        finally:
+            if home is None:
+                os.environ.pop("FOLDERLY_HOME", None)
+            else:
+                os.environ["FOLDERLY_HOME"] = home
+            shutil.rmtree(base, ignore_errors=True)
+        return {
+            'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'platform': {'python': platform.python_version(), 'system': platform.platform(),
+                         'cpus': os.cpu_count()},
+            'spec': self.spec.to_dict(),
+            'tree': totals,
+            'repeat': self.repeat,
+            'results': results,
+        }
+
+def compare(current: Dict, baseline: Dict, threshold: float = 0.10) -> List[str]:
+    """Compare wall times against a baseline result file, marking operations slower than threshold."""
+    lines = []
+    if current.get('spec') != baseline.get('spec'):
+        lines.append("Warning: baseline was recorded with a different tree spec.")
+    for name, stats in current['results'].items():
+        old = baseline.get('results', {}).get(name)
+        if old is None or not old['wall']:
+            lines.append(f"{name:<24} (no baseline)")
+            continue
+        change = (stats['wall'] - old['wall']) / old['wall']
+        flag = "  REGRESSION" if change > threshold else ""
+        lines.append(f"{name:<24} {old['wall'] * 1000:10.1f} ms -> {stats['wall'] * 1000:10.1f} ms "
+                     f"({change:+.1%}){flag}")
+    return lines
+
+def add_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument('--depth', type=int, default=3, help="folder levels below the root (default 3)")
+    parser.add_argument('--fanout', type=int, default=4, help="subfolders per folder (default 4)")
+    parser.add_argument('--files-per-dir', type=int, default=20, help="files per folder (default 20)")
+    parser.add_argument('--size-dist', choices=SIZE_DISTRIBUTIONS, default='lognormal')
+    parser.add_argument('--mean-size', type=int, default=64 * 1024, help="mean file size in bytes")
+    parser.add_argument('--dup-ratio', type=float, default=0.2, help="share of files that are duplicates")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=3, help="runs per operation; the fastest is kept")
+    parser.add_argument('--workdir', help="where to create the temp tree (default: system temp dir)")
+    parser.add_argument('--output', '-o', help="save results as JSON to this file")
+    parser.add_argument('--baseline', help="compare against a previously saved results file")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="slowdown that counts as a regression (default 0.10 = 10%%)")
+
+def run_from_args(args: argparse.Namespace) -> int:
+    """Run the benchmark described by parsed arguments. Returns 1 if a regression was found, else 0."""
+    spec = TreeSpec(depth=args.depth, fanout=args.fanout, files_per_dir=args.files_per_dir,
+                    size_dist=args.size_dist, mean_size=args.mean_size, dup_ratio=args.dup_ratio, seed=args.seed)
+    result = Benchmark(spec, repeat=args.repeat, workdir=args.workdir).run()
+    tree = result['tree']
+    print(f"Tree: {tree['files']} files, {tree['dirs']} folders, {tree['bytes'] / (1024 * 1024):.1f} MB, "
+          f"{tree['duplicates']} duplicates.")
+    if args.output:
+        Path(args.output).write_text(json.dumps(result, indent=2))
+        print(f"Results saved to {args.output}")
+    if args.baseline:
+        lines = compare(result, json.loads(Path(args.baseline).read_text()), args.threshold)
+        print(f"\nCompared with {args.baseline}:")
+        for line in lines:
+            print(line)
+        if any(line.endswith("REGRESSION") for line in lines):
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    # Usage: python -m files.bench [--depth N] [--fanout N] ... [-o results.json] [--baseline old.json]
+    parser = argparse.ArgumentParser(prog="folderly bench",
+                                     description="Benchmark Folderly operations on a synthetic tree.")
+    add_arguments(parser)
+    sys.exit(run_from_args(parser.parse_args()))
\ No newline at end of file
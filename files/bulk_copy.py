@@ -0,0 +1,172 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+import errno
+import os
+import shutil
+import time
+
+from files.progress import Progress
+from files.walker import walk
+
+# Largest request passed to copy_file_range/sendfile in one call
+MAX_CHUNK = 1 << 30
+
+class CopyJobResult:
+    __slots__ = ('src', 'dest', 'ok', 'bytes', 'error')
+
+    def __init__(self, src: str, dest: str, ok: bool, nbytes: int = 0, error: Optional[str] = None):
+        self.src = src
+        self.dest = dest
+        self.ok = ok
+        self.bytes = nbytes
+        self.error = error
+
+    def __repr__(self) -> str:
+        return f"CopyJobResult({self.src!r} -> {self.dest!r}, ok={self.ok}, bytes={self.bytes})"
+
+class BulkCopyReport:
+    def __init__(self, results: List[CopyJobResult], seconds: float, dir_errors: Optional[List[Tuple[str, str]]] = None):
+        self.results = results
+        self.seconds = seconds
+        # Folders that couldn't be created, as (path, message); nothing under them was copied
+        self.dir_errors = dir_errors or []
+        self.files = sum(1 for r in results if r.ok)
+        self.failed = sum(1 for r in results if not r.ok) + len(self.dir_errors)
+        self.bytes = sum(r.bytes for r in results)
+
+    @property
+    def files_per_sec(self) -> float:
+        return self.files / self.seconds if self.seconds else 0.0
+
+    @property
+    def mb_per_sec(self) -> float:
+        return self.bytes / (1024 * 1024) / self.seconds if self.seconds else 0.0
+
+    def summary(self) -> str:
+        return (f"Copied {self.files} files ({self.bytes / (1024 * 1024):.1f} MB) in {self.seconds:.2f}s "
+                f"[{self.files_per_sec:.0f} files/s, {self.mb_per_sec:.1f} MB/s], {self.failed} failed.")
+
+def _copy_fd_range(fin: int, fout: int, size: int) -> int:
+    """Copy size bytes between file descriptors in the kernel. Raises OSError if unsupported."""
+    copied = 0
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while copied < size:
+                n = os.copy_file_range(fin, fout, min(size - copied, MAX_CHUNK))
+                if n == 0:
+                    break
+                copied += n
+            return copied
+        except OSError as e:
+            if copied or e.errno not in (errno.EXDEV, errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+                raise
+    while copied < size:
+        n = os.sendfile(fout, fin, copied, min(size - copied, MAX_CHUNK))
+        if n == 0:
+            break
+        copied += n
+    return copied
+
+def copy_file_fast(src: str, dest: str, overwrite: bool = False) -> int:
+    """Copy one file's data and metadata like shutil.copy2, in the kernel where possible. Returns bytes copied."""
+    flags = os.O_WRONLY | os.O_CREAT | (os.O_TRUNC if overwrite else os.O_EXCL)
+    with open(src, 'rb') as fsrc:
+        size = os.fstat(fsrc.fileno()).st_size
+        fd = os.open(dest, flags, 0o666)
+        with open(fd, 'wb') as fdest:
+            try:
+                copied = _copy_fd_range(fsrc.fileno(), fdest.fileno(), size)
+            except (OSError, AttributeError):
+                fsrc.seek(0)
+                fdest.seek(0)
+                fdest.truncate()
+                shutil.copyfileobj(fsrc, fdest, 1024 * 1024)
+                copied = fdest.tell()
+    shutil.copystat(src, dest)
+    return copied
+
+class BulkCopier:
+    """Copies many files on a bounded thread pool."""
+
+    def __init__(self, workers: Optional[int] = None, overwrite: bool = False, max_in_flight: Optional[int] = None,
+                 progress: Optional[Progress] = None):
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self.overwrite = overwrite
+        self.max_in_flight = max_in_flight or self.workers * 4
+        self.progress = progress
+
+    def plan(self, sources: Iterable[Union[str, Path]], dest_folder: Union[str, Path]) -> Tuple[List[str], List[Tuple[str, str]]]:
+        """Expand files and folders into (dirs to create, (src, dest) file jobs) under dest_folder."""
+        dest_folder = os.fspath(dest_folder)
+        dirs, jobs = [], []
+        for src in sources:
+            src = os.fspath(src)
+            dest = os.path.join(dest_folder, os.path.basename(src.rstrip(os.sep)))
+            if os.path.isdir(src):
+                dirs.append(dest)
+                for entry in walk(src, files=True, dirs=True, follow_symlinks=True):
+                    target = os.path.join(dest, os.path.relpath(entry.path, src))
+                    if entry.is_dir():
+                        dirs.append(target)
+                    else:
+                        jobs.append((entry.path, target))
+            else:
+                jobs.append((src, dest))
+        return dirs, jobs
+
+    def _copy_one(self, src: str, dest: str) -> CopyJobResult:
+        try:
+            result = CopyJobResult(src, dest, True, copy_file_fast(src, dest, overwrite=self.overwrite))
+        except FileExistsError:
+            result = CopyJobResult(src, dest, False, error="destination exists")
+        except OSError as e:
+            result = CopyJobResult(src, dest, False, error=str(e))
+        if self.progress is not None:
+            self.progress.advance(entries=1, nbytes=result.bytes)
+        return result
+
+    def copy(self, jobs: Iterable[Tuple[str, str]], dirs: Iterable[str] = ()) -> BulkCopyReport:
+        """Create dirs (parents first), then copy every (src, dest) job. Results keep the order of jobs."""
+        start = time.perf_counter()
+        dir_errors = []
+        for d in sorted(set(dirs), key=len):
+            if self._failed_parent(d, dir_errors) is not None:
+                continue
+            try:
+                os.makedirs(d, exist_ok=True)
+            except OSError as e:
+                dir_errors.append((d, str(e)))
+        results = []
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = deque()
+            for src, dest in jobs:
+                if self.progress is not None and self.progress.cancelled:
+                    break
+                failed = self._failed_parent(dest, dir_errors)
+                if failed is not None:
+                    future = Future()
+                    future.set_result(CopyJobResult(src, dest, False, error=f"could not create {failed}"))
+                    pending.append(future)
+                    continue
+                pending.append(executor.submit(self._copy_one, src, dest))
+                if len(pending) >= self.max_in_flight:
+                    results.append(pending.popleft().result())
+            while pending:
+                results.append(pending.popleft().result())
+        return BulkCopyReport(results, time.perf_counter() - start, dir_errors)
+
+    @staticmethod
+    def _failed_parent(path: str, dir_errors: List[Tuple[str, str]]) -> Optional[str]:
+        for d, _ in dir_errors:
+            if path == d or path.startswith(d + os.sep):
+                return d
+        return None
+
+    def copy_tree(self, sources: Iterable[Union[str, Path]], dest_folder: Union[str, Path]) -> BulkCopyReport:
+        """Plan and copy files/folders into dest_folder."""
+        dirs, jobs = self.plan(sources, dest_folder)
+        if self.progress is not None:
+            self.progress.begin("copying", total_entries=len(jobs))
+        return self.copy(jobs, dirs)
\ No newline at end of file
@@ -0,0 +1,213 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, List, Optional, Set, Tuple, Union
+import os
+import threading
+import time
+import uuid
+
+from files.progress import Progress
+from files.utils import get_folderly_dir, stat_entry
+from files.walker import walk
+
+DIR_FLAGS = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0) | getattr(os, 'O_NOFOLLOW', 0)
+
+def _clear_dir_fd(fd: int) -> int:
+    """Delete everything inside the open directory fd, bottom-up, using *at() calls. Returns entries removed."""
+    removed = 0
+    with os.scandir(fd) as it:
+        entries = list(it)
+    for entry in entries:
+        if entry.is_dir(follow_symlinks=False):
+            sub = os.open(entry.name, DIR_FLAGS, dir_fd=fd)
+            try:
+                removed += _clear_dir_fd(sub)
+            finally:
+                os.close(sub)
+            os.rmdir(entry.name, dir_fd=fd)
+        else:
+            os.unlink(entry.name, dir_fd=fd)
+        removed += 1
+    return removed
+
+def remove_tree(path: Union[str, Path]) -> int:
+    """Delete a folder and its contents (like shutil.rmtree) without re-resolving paths. Returns entries removed."""
+    fd = os.open(path, DIR_FLAGS)
+    try:
+        removed = _clear_dir_fd(fd)
+    finally:
+        os.close(fd)
+    os.rmdir(path)
+    return removed + 1
+
+def get_trash_dir(path: Union[str, Path]) -> Path:
+    """Return a trash folder on the same filesystem as path."""
+    path = Path(path).absolute()
+    trash = get_folderly_dir() / "trash"
+    trash.mkdir(exist_ok=True)
+    if trash.stat().st_dev != os.lstat(path.parent).st_dev:
+        trash = path.parent / ".folderly-trash"
+        trash.mkdir(exist_ok=True)
+        _remember_trash_dir(trash)
+    return trash
+
+_trash_lock = threading.Lock()
+
+def _read_trash_dirs() -> List[Path]:
+    try:
+        with open(get_folderly_dir() / "trash_dirs.txt", encoding='utf-8', errors='surrogateescape') as f:
+            return [Path(line.rstrip("\n")) for line in f if line.strip()]
+    except OSError:
+        return []
+
+def _remember_trash_dir(trash: Path):
+    # Listed in ~/.folderly/trash_dirs.txt so empty_trash can find it later
+    with _trash_lock:
+        if trash in _read_trash_dirs():
+            return
+        with open(get_folderly_dir() / "trash_dirs.txt", 'a', encoding='utf-8', errors='surrogateescape') as f:
+            f.write(f"{trash}\n")
+
+def trash_dirs() -> List[Path]:
+    """Every trash folder in use: ~/.folderly/trash and each .folderly-trash folder made on another device."""
+    dirs = [get_folderly_dir() / "trash"] + _read_trash_dirs()
+    return [d for d in dict.fromkeys(dirs) if d.is_dir() and not d.is_symlink()]
+
+def move_to_trash(path: Union[str, Path]) -> Path:
+    """Rename path into the trash on its filesystem and return its new location."""
+    path = Path(path)
+    dest = get_trash_dir(path) / f"{uuid.uuid4().hex}-{path.name}"
+    os.rename(path, dest)
+    return dest
+
+class DeletePlan:
+    def __init__(self, targets: List[Path], recursive: bool):
+        self.targets = targets
+        self.recursive = recursive
+        self.files = 0
+        self.dirs = 0
+        self.bytes = 0
+        self.missing: Set[Path] = set()
+        for target in targets:
+            if not os.path.lexists(target):
+                self.missing.add(target)
+                continue
+            if target.is_dir() and not target.is_symlink():
+                self.dirs += 1
+                for entry in walk(target, files=True, dirs=True):
+                    if entry.is_dir(follow_symlinks=False):
+                        self.dirs += 1
+                    else:
+                        self.files += 1
+                        try:
+                            self.bytes += stat_entry(entry, follow_symlinks=False).st_size
+                        except OSError:
+                            pass
+            else:
+                self.files += 1
+                self.bytes += target.lstat().st_size
+
+    def describe(self) -> str:
+        text = (f"{len(self.targets) - len(self.missing)} targets: {self.files} files, {self.dirs} folders, "
+                f"{self.bytes / (1024 * 1024):.1f} MB")
+        if self.missing:
+            text += f" ({len(self.missing)} not found)"
+        return text
+
+class BulkDeleter:
+    """Deletes many files/folders after a single confirmation, in parallel or into the trash."""
+
+    def __init__(self, workers: Optional[int] = None, use_trash: bool = False, purge: bool = True,
+                 quiet: bool = False, progress: Optional[Progress] = None):
+        self.workers = workers or min(32, (os.cpu_count() or 1) * 4)
+        self.use_trash = use_trash
+        self.purge = purge
+        self.trashed: List[Tuple[Path, Path]] = []
+        self.purge_thread: Optional[threading.Thread] = None
+        # (path, message) for every failure; printed too unless quiet
+        self.errors: List[Tuple[Path, str]] = []
+        self.quiet = quiet
+        self.progress = progress
+
+    def _report(self, message: str, path: Optional[Path] = None):
+        if path is not None:
+            self.errors.append((path, message))
+        if not self.quiet:
+            print(message)
+
+    def plan(self, targets: Iterable[Union[str, Path]], recursive: bool = False) -> DeletePlan:
+        return DeletePlan([Path(t) for t in targets], recursive)
+
+    def _remove_tree(self, path: Path) -> int:
+        removed = remove_tree(path)
+        if self.progress is not None:
+            self.progress.advance(entries=removed)
+        return removed
+
+    def _delete_dir(self, executor: ThreadPoolExecutor, target: Path):
+        fd = os.open(target, DIR_FLAGS)
+        try:
+            with os.scandir(fd) as it:
+                entries = list(it)
+            futures = []
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    futures.append(executor.submit(self._remove_tree, target / entry.name))
+                else:
+                    os.unlink(entry.name, dir_fd=fd)
+                    if self.progress is not None:
+                        self.progress.advance(entries=1)
+            for future in futures:
+                future.result()
+        finally:
+            os.close(fd)
+        os.rmdir(target)
+
+    def execute(self, plan: DeletePlan) -> List[bool]:
+        """Delete every target in the plan. Returns a list of booleans indicating success for each target."""
+        results = []
+        start = time.perf_counter()
+        if self.progress is not None:
+            self.progress.begin("deleting", total_entries=plan.files + plan.dirs)
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            for target in plan.targets:
+                if self.progress is not None and self.progress.cancelled:
+                    results.append(False)
+                    continue
+                if target in plan.missing:
+                    self._report(f"{target} does not exist.", target)
+                    results.append(False)
+                    continue
+                try:
+                    is_dir = target.is_dir() and not target.is_symlink()
+                    if is_dir and not plan.recursive:
+                        target.rmdir()
+                    elif self.use_trash:
+                        self.trashed.append((target, move_to_trash(target)))
+                    elif is_dir:
+                        self._delete_dir(executor, target)
+                    else:
+                        target.unlink()
+                    if self.progress is not None:
+                        self.progress.advance(entries=1)
+                    results.append(True)
+                except OSError as e:
+                    self._report(f"Error deleting {target}: {e}", target)
+                    results.append(False)
+        self._report(f"Deleted {sum(results)} of {len(results)} targets in {time.perf_counter() - start:.2f}s."
+                     + (" (cancelled)" if self.progress is not None and self.progress.cancelled else ""))
+        if self.trashed and self.purge:
+            trashed = [path for _, path in self.trashed]
+            self.purge_thread = threading.Thread(target=self._purge, args=(trashed,), name="folderly-purge")
+            self.purge_thread.start()
+        return results
+
+    def _purge(self, paths: List[Path]):
+        for path in paths:
+            try:
+                if path.is_dir() and not path.is_symlink():
+                    remove_tree(path)
+                else:
+                    path.unlink()
+            except OSError as e:
+                self._report(f"Error purging {path}: {e}", path)
\ No newline at end of file
@@ -0,0 +1,268 @@
+from collections import Counter
+from itertools import combinations, groupby
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+import hashlib
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+
+from files.fastio import DROP_CACHE_MIN_SIZE, advise
+from files.utils import get_folderly_dir
+
+# Gear table as in FastCDC: a fixed pseudo-random 64-bit value per byte value
+GEAR = [int.from_bytes(hashlib.blake2b(bytes([b]), digest_size=8).digest(), 'little') for b in range(256)]
+# Low 8 gear bits of each byte value, as a bytes.translate table
+_GEAR_LOW = bytes(g & 0xFF for g in GEAR)
+_LOW_BIT = bytes(b & 1 for b in range(256))
+# Bytes of context in each position's hash bit
+WINDOW = 8
+
+def gear_bits(data: Union[bytes, bytearray]) -> bytes:
+    """One gear-hash bit (0 or 1) per byte of data, over the last WINDOW bytes."""
+    x = int.from_bytes(data.translate(_GEAR_LOW), 'big')
+    # Shifting right by 9 bits moves bit j of a byte to bit j - 1 of the next byte: after these, the low
+    # bit of byte i is the XOR of bit j of byte i - j for j < 8
+    x ^= x >> 9
+    x ^= x >> 18
+    x ^= x >> 36
+    return x.to_bytes(len(data), 'big').translate(_LOW_BIT)
+
+# On-disk index record: chunk digest, file id, chunk length
+RECORD = struct.Struct('<16sII')
+DIGEST_SIZE = 16
+
+def chunk_params(avg_size: int) -> Tuple[int, int, int, int, int]:
+    """(min_size, avg_size, max_size, strict_run, loose_run) for a power-of-two average chunk size."""
+    bits = avg_size.bit_length() - 1
+    if avg_size != 1 << bits or bits < 8:
+        raise ValueError("avg_size must be a power of two of at least 256 bytes")
+    # Normalized chunking: a harder cut condition below the average size, an easier one above it
+    return avg_size // 4, avg_size, avg_size * 8, bits, bits - 3
+
+def iter_chunks(path: Union[str, Path], avg_size: int = 8192,
+                buffer_size: int = 4 * 1024 * 1024) -> Iterator[Tuple[bytes, int]]:
+    """Split a file into content-defined chunks and yield (digest, length) for each."""
+    min_size, avg_size, max_size, strict_run, loose_run = chunk_params(avg_size)
+    strict, loose = b"\1" * strict_run, b"\1" * loose_run
+    buffer_size = max(buffer_size, 2 * max_size)
+    buf = bytearray(buffer_size)
+    view = memoryview(buf)
+    filled = 0
+    eof = False
+    with open(path, 'rb', buffering=0) as file:
+        advise(file.fileno(), 'SEQUENTIAL')
+        try:
+            while True:
+                while not eof and filled < buffer_size:
+                    n = file.readinto(view[filled:])
+                    if not n:
+                        eof = True
+                    filled += n or 0
+                if not filled:
+                    return
+                # Cut searches start at least WINDOW bytes into a chunk, so bits never lack context
+                bits = gear_bits(buf)
+                pos = 0
+                # Without EOF, only cut while a whole max-size chunk is buffered, so cuts don't depend on buffering
+                while pos < filled and (eof or filled - pos >= max_size):
+                    end = min(pos + max_size, filled)
+                    if end - pos <= min_size:
+                        cut = end
+                    else:
+                        normal = min(pos + avg_size, end)
+                        i = bits.find(strict, pos + min_size - strict_run, normal)
+                        if i >= 0:
+                            cut = i + strict_run
+                        else:
+                            i = bits.find(loose, normal - loose_run + 1, end)
+                            cut = i + loose_run if i >= 0 else end
+                    yield hashlib.blake2b(view[pos:cut], digest_size=DIGEST_SIZE).digest(), cut - pos
+                    pos = cut
+                if eof:
+                    return
+                buf[:filled - pos] = view[pos:filled]
+                filled -= pos
+        finally:
+            if os.fstat(file.fileno()).st_size >= DROP_CACHE_MIN_SIZE:
+                advise(file.fileno(), 'DONTNEED')
+
+def chunk_into(path: Union[str, Path], file_id: int, directory: Union[str, Path], buckets: int,
+               avg_size: int = 8192, flush_size: int = 64 * 1024) -> Tuple[int, int]:
+    """Chunk a file and append its records to the bucket files of a ChunkIndex directory. Returns (chunks, bytes)."""
+    pending: Dict[int, bytearray] = {}
+    chunks = nbytes = 0
+
+    def flush(bucket: int, data: bytearray):
+        # O_APPEND writes of whole records from concurrent workers don't interleave within a record
+        fd = os.open(os.path.join(directory, f"{bucket:02x}.bin"), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+        try:
+            os.write(fd, data)
+        finally:
+            os.close(fd)
+        data.clear()
+
+    for digest, length in iter_chunks(path, avg_size):
+        bucket = digest[0] & (buckets - 1)
+        data = pending.setdefault(bucket, bytearray())
+        data += RECORD.pack(digest, file_id, length)
+        if len(data) >= flush_size:
+            flush(bucket, data)
+        chunks += 1
+        nbytes += length
+    for bucket, data in pending.items():
+        if data:
+            flush(bucket, data)
+    return chunks, nbytes
+
+class ChunkReport:
+    def __init__(self):
+        self.files = 0
+        self.chunks = 0
+        self.unique_chunks = 0
+        self.total_bytes = 0
+        self.unique_bytes = 0
+        # Chunks shared by more than max_fanout files (e.g. runs of zeros) count toward savings, not pairs
+        self.common_chunks = 0
+        # (file, file, shared bytes), most shared first
+        self.pairs: List[Tuple[Path, Path, int]] = []
+        self.sizes: Dict[Path, int] = {}
+
+    @property
+    def savings(self) -> int:
+        """Bytes that chunk-level deduplication of all scanned files would save."""
+        return self.total_bytes - self.unique_bytes
+
+    def summary(self) -> str:
+        return (f"Chunked {self.files} files ({self.total_bytes / (1024 * 1024):.1f} MB) into {self.chunks} chunks, "
+                f"{self.unique_chunks} unique; sharing chunks would save {self.savings / (1024 * 1024):.1f} MB. "
+                f"{len(self.pairs)} file pairs share data.")
+
+class ChunkIndex:
+    """On-disk index of chunk digests, in hash-partitioned bucket files, for finding files that share content."""
+
+    def __init__(self, directory: Optional[Union[str, Path]] = None, buckets: int = 64,
+                 max_bucket_bytes: int = 16 * 1024 * 1024, avg_size: int = 8192):
+        if buckets < 1 or buckets > 256 or buckets & (buckets - 1):
+            raise ValueError("buckets must be a power of two between 1 and 256")
+        chunk_params(avg_size)
+        if directory is None:
+            root = get_folderly_dir() / "chunks"
+            root.mkdir(exist_ok=True)
+            directory = tempfile.mkdtemp(prefix="index-", dir=root)
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.buckets = buckets
+        self.max_bucket_bytes = max_bucket_bytes
+        self.avg_size = avg_size
+        self.paths: List[Path] = []
+        self.sizes: List[int] = []
+
+    def add_file(self, path: Union[str, Path], size: int) -> int:
+        """Register a file and return its id, for chunk_into."""
+        self.paths.append(Path(path))
+        self.sizes.append(size)
+        return len(self.paths) - 1
+
+    def job(self, file_id: int) -> Tuple:
+        """Arguments for chunk_into(*job) that chunk the given file into this index."""
+        return (self.paths[file_id], file_id, str(self.directory), self.buckets, self.avg_size)
+
+    def _split(self, path: Path, level: int) -> List[Path]:
+        # Partition an oversized bucket by the digest byte at level, streaming it through mmap
+        parts: Dict[int, bytearray] = {}
+        outputs = {}
+        with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for offset in range(0, len(mm), RECORD.size):
+                record = mm[offset:offset + RECORD.size]
+                data = parts.setdefault(record[level], bytearray())
+                data += record
+                if len(data) >= 64 * 1024:
+                    if record[level] not in outputs:
+                        outputs[record[level]] = open(f"{path}.{record[level]:02x}", 'wb')
+                    outputs[record[level]].write(data)
+                    data.clear()
+        for key, data in parts.items():
+            if key not in outputs:
+                outputs[key] = open(f"{path}.{key:02x}", 'wb')
+            outputs[key].write(data)
+            outputs[key].close()
+        path.unlink()
+        return [Path(f"{path}.{key:02x}") for key in sorted(parts)]
+
+    def _single_digest(self, path: Path) -> Optional[Tuple[bytes, int, Counter]]:
+        # A part holding one chunk digest only (e.g. a run of zeros in many files) can't be split further:
+        # count it in one streaming pass. Returns None at the first record with another digest
+        with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            first = mm[:DIGEST_SIZE]
+            files = Counter()
+            length = 0
+            for digest, file_id, length in RECORD.iter_unpack(mm):
+                if digest != first:
+                    return None
+                files[file_id] += 1
+        return first, length, files
+
+    def _groups_in(self, path: Path, level: int) -> Iterator[Tuple[bytes, int, Counter]]:
+        size = path.stat().st_size
+        if size == 0:
+            return
+        if size > self.max_bucket_bytes:
+            group = self._single_digest(path)
+            if group is not None:
+                yield group
+                return
+        if size > self.max_bucket_bytes and level < DIGEST_SIZE:
+            for part in self._split(path, level):
+                yield from self._groups_in(part, level + 1)
+            return
+        with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            # Records start with the digest, so sorting the raw records groups each chunk's occurrences
+            records = sorted(mm[i:i + RECORD.size] for i in range(0, len(mm), RECORD.size))
+        for digest, group in groupby(records, key=lambda r: r[:DIGEST_SIZE]):
+            files = Counter()
+            for _, file_id, length in map(RECORD.unpack, group):
+                files[file_id] += 1
+            yield digest, length, files
+
+    def groups(self) -> Iterator[Tuple[bytes, int, Counter]]:
+        """Yield (digest, chunk length, {file id: occurrences}) for every distinct chunk, bucket by bucket."""
+        for bucket in range(self.buckets):
+            path = self.directory / f"{bucket:02x}.bin"
+            if path.exists():
+                yield from self._groups_in(path, 1)
+
+    def report(self, min_shared: int = 0, max_fanout: int = 64) -> ChunkReport:
+        """Total and unique bytes, and every pair of files sharing at least min_shared bytes. Consumes the buckets."""
+        report = ChunkReport()
+        report.files = len(self.paths)
+        shared: Counter = Counter()
+        for digest, length, files in self.groups():
+            occurrences = sum(files.values())
+            report.chunks += occurrences
+            report.unique_chunks += 1
+            report.total_bytes += occurrences * length
+            report.unique_bytes += length
+            if len(files) > max_fanout:
+                report.common_chunks += 1
+            elif len(files) > 1:
+                for a, b in combinations(sorted(files), 2):
+                    shared[a, b] += length * min(files[a], files[b])
+        for (a, b), nbytes in shared.most_common():
+            if nbytes < min_shared:
+                break
+            report.pairs.append((self.paths[a], self.paths[b], nbytes))
+            report.sizes[self.paths[a]] = self.sizes[a]
+            report.sizes[self.paths[b]] = self.sizes[b]
+        return report
+
+    def close(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def __enter__(self) -> 'ChunkIndex':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
\ No newline at end of file
@@ -1,11 +1,18 @@
 from pathlib import Path
-from typing import List, Union
+from typing import List, Optional, Union
 import shutil
 import os
 
+from files.bulk_copy import BulkCopier, BulkCopyReport
+from files.bulk_delete import move_to_trash
+from files.journal import OperationJournal, journal_batch
+from files.progress import Progress
+
 class CopyManager:
-    def __init__(self):
-        pass
+    def __init__(self, journal: Optional[OperationJournal] = None):
+        """With a journal, each copy is recorded so it can be undone, and replaced destinations go to the trash."""
+        self.journal = journal
+        self.last_report: Optional[BulkCopyReport] = None
 
     def copy_single(self, src: Union[str, Path], dest: Union[str, Path], overwrite: bool = False) -> bool:
         """
@@ -15,26 +22,31 @@ class CopyManager:
         """
         src = Path(src)
         dest = Path(dest)
+        replace = False
         if dest.exists():
-            if overwrite:
-                if dest.is_file() or dest.is_symlink():
-                    dest.unlink()
-                elif dest.is_dir():
-                    shutil.rmtree(dest)
-            else:
+            if not overwrite:
+                return False
+            if src.exists() and os.path.samefile(src, dest):
+                print(f"Error copying {src} to {dest}: source and destination are the same")
                 return False
-        try:
-            if src.is_file():
-                shutil.copy2(str(src), str(dest))
-            elif src.is_dir():
-                shutil.copytree(str(src), str(dest))
-            else:
-                print(f"{src} is not a file or directory.")
+            replace = True
+        with journal_batch(self.journal, "copy"):
+            try:
+                if not src.is_file() and not src.is_dir():
+                    print(f"{src} is not a file or directory.")
+                    return False
+                if replace:
+                    self._replace(dest)
+                if src.is_file():
+                    shutil.copy2(str(src), str(dest))
+                else:
+                    shutil.copytree(str(src), str(dest))
+                if self.journal is not None:
+                    self.journal.record('copy', src, dest)
+                return True
+            except Exception as e:
+                print(f"Error copying {src} to {dest}: {e}")
                 return False
-            return True
-        except Exception as e:
-            print(f"Error copying {src} to {dest}: {e}")
-            return False
 
     def copy_multiple(self, sources: List[Union[str, Path]], dest_folder: Union[str, Path], overwrite: bool = False) -> List[bool]:
         """
@@ -43,9 +55,78 @@ class CopyManager:
         """
         dest_folder = Path(dest_folder)
         results = []
-        for src in sources:
-            src = Path(src)
-            dest = dest_folder / src.name
-            result = self.copy_single(src, dest, overwrite=overwrite)
-            results.append(result)
-        return results 
\ No newline at end of file
+        with journal_batch(self.journal, "copy"):
+            for src in sources:
+                src = Path(src)
+                dest = dest_folder / src.name
+                result = self.copy_single(src, dest, overwrite=overwrite)
+                results.append(result)
+        return results 
+
+    def copy_bulk(self, sources: List[Union[str, Path]], dest_folder: Union[str, Path], overwrite: bool = False,
+                  workers: Optional[int] = None, progress: Optional[Progress] = None) -> List[bool]:
+        """
+        Copy multiple files or folders to the destination folder on a worker pool.
+        With overwrite, an existing destination is replaced, as in copy_single.
+        Returns a list of booleans indicating success for each source.
+        """
+        dest_folder = Path(dest_folder)
+        copier = BulkCopier(workers=workers, progress=progress)
+        all_dirs, all_jobs, owners, results, copied = [], [], [], [], []
+        with journal_batch(self.journal, "copy"):
+            for src in sources:
+                src = Path(src)
+                dest = dest_folder / src.name
+                if not src.exists():
+                    print(f"{src} is not a file or directory.")
+                    results.append(False)
+                    continue
+                if os.path.lexists(dest):
+                    if not overwrite:
+                        results.append(False)
+                        continue
+                    if dest.exists() and os.path.samefile(src, dest):
+                        print(f"Error copying {src} to {dest}: source and destination are the same")
+                        results.append(False)
+                        continue
+                    try:
+                        self._replace(dest)
+                    except OSError as e:
+                        print(f"Error copying {src} to {dest}: {e}")
+                        results.append(False)
+                        continue
+                copied.append((len(results), src, dest))
+                dirs, jobs = copier.plan([src], dest_folder)
+                all_dirs.extend(dirs)
+                all_jobs.extend(jobs)
+                owners.extend([len(results)] * len(jobs))
+                results.append(True)
+            if progress is not None:
+                progress.begin("copying", total_entries=len(all_jobs))
+            report = copier.copy(all_jobs, all_dirs)
+            for d, error in report.dir_errors:
+                print(f"Error creating {d}: {error}")
+            for owner, job in zip(owners, report.results):
+                if not job.ok:
+                    print(f"Error copying {job.src} to {job.dest}: {job.error}")
+                    results[owner] = False
+            for owner in owners[len(report.results):]:
+                results[owner] = False
+            for owner, _, dest in copied:
+                if any(d == str(dest) or d.startswith(str(dest) + os.sep) for d, _ in report.dir_errors):
+                    results[owner] = False
+            for _, src, dest in copied:
+                # Journal partial copies too, so undo can clean them up
+                if os.path.lexists(dest) and self.journal is not None:
+                    self.journal.record('copy', src, dest)
+            self.last_report = report
+            return results
+
+    def _replace(self, dest: Path):
+        # With a journal the replaced destination goes to the trash, so undo can bring it back
+        if self.journal is not None:
+            self.journal.record('delete', dest, move_to_trash(dest))
+        elif dest.is_dir() and not dest.is_symlink():
+            shutil.rmtree(dest)
+        else:
+            dest.unlink()
\ No newline at end of file
@@ -0,0 +1,198 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+import asyncio
+import inspect
+import json
+import os
+import threading
+
+from files.async_api import get_executor, shutdown_executor
+from files.duplicate_files import DuplicateFinder
+from files.hash_cache import HashCache
+from files.hash_engine import HashEngine
+from files.list_files import FileLister
+from files.recursive_list import RecursiveLister
+from files.utils import get_folderly_dir, get_user_root_dirs
+from files.watcher import FolderWatcher
+
+# Memoized answers kept at once; the least recently used is dropped first
+MAX_MEMO = 256
+
+def get_socket_path() -> Path:
+    return Path(os.environ.get("FOLDERLY_SOCKET", get_folderly_dir() / "daemon.sock"))
+
+class FolderlyDaemon:
+    """Local JSON-RPC server on a Unix socket that keeps a live view of the root folders and the hash cache warm."""
+
+    def __init__(self, socket_path: Optional[Union[str, Path]] = None,
+                 roots: Optional[Iterable[Union[str, Path]]] = None):
+        self.socket_path = Path(socket_path) if socket_path else get_socket_path()
+        self.watcher = FolderWatcher(roots if roots is not None else get_user_root_dirs().values())
+        self.cache = HashCache()
+        try:
+            self.engine = HashEngine.from_env()
+        except ValueError as e:
+            print(f"FOLDERLY_HASH_BACKEND/FOLDERLY_HASH_WORKERS: {e} Using the default.")
+            self.engine = HashEngine()
+        self._hash_lock = threading.Lock()
+        self._memo: OrderedDict[str, tuple] = OrderedDict()
+        self._memo_lock = threading.Lock()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.methods: Dict[str, Callable] = {
+            'ping': self.ping,
+            'stats': self.stats,
+            'list_files': self.list_files,
+            'list_folders': self.list_folders,
+            'find_duplicates': self.find_duplicates,
+            'shutdown': self.shutdown,
+        }
+
+    def _index_for(self, folder: str):
+        return self.watcher.tree if self.watcher.tree.covers(folder) else None
+
+    def _memoized(self, key: str, folder: str, compute: Callable):
+        # Results from the live tree stay valid until the tree's version changes
+        index = self._index_for(folder)
+        if index is None:
+            return compute(None)
+        version = index.version
+        with self._memo_lock:
+            hit = self._memo.get(key)
+            if hit is not None and hit[0] == version:
+                self._memo.move_to_end(key)
+                return hit[1]
+        result = compute(index)
+        with self._memo_lock:
+            self._memo[key] = (version, result)
+            self._memo.move_to_end(key)
+            while len(self._memo) > MAX_MEMO:
+                self._memo.popitem(last=False)
+        return result
+
+    def ping(self) -> str:
+        return "pong"
+
+    def stats(self) -> Dict:
+        return {
+            'watch_backend': self.watcher.backend,
+            'watched_roots': sorted(self.watcher.tree.roots),
+            'entries': len(self.watcher.tree.entries),
+            'hash_cache_hits': self.cache.hits,
+            'hash_cache_misses': self.cache.misses,
+            'memoized': len(self._memo),
+        }
+
+    def list_files(self, folder: str, recursive: bool = False, extension: Optional[str] = None) -> List[str]:
+        folder = os.path.abspath(os.path.expanduser(folder))
+
+        def compute(index):
+            if recursive:
+                paths = RecursiveLister(folder, index=index).iter_files_recursive(extension)
+            elif extension:
+                paths = FileLister(folder, index=index).list_by_extension(extension)
+            else:
+                paths = FileLister(folder, index=index).iter_files()
+            return [str(p) for p in paths]
+        return self._memoized(json.dumps(['list_files', folder, recursive, extension]), folder, compute)
+
+    def list_folders(self, folder: str, recursive: bool = False) -> List[str]:
+        folder = os.path.abspath(os.path.expanduser(folder))
+
+        def compute(index):
+            if recursive:
+                paths = RecursiveLister(folder, index=index).iter_folders_recursive()
+            else:
+                paths = FileLister(folder, index=index).iter_folders()
+            return [str(p) for p in paths]
+        return self._memoized(json.dumps(['list_folders', folder, recursive]), folder, compute)
+
+    def find_duplicates(self, folder: str, recursive: bool = False, extension: Optional[str] = None) -> Dict:
+        folder = os.path.abspath(os.path.expanduser(folder))
+
+        def compute(index):
+            finder = DuplicateFinder(folder, recursive=recursive, extension=extension, cache=self.cache,
+                                     engine=self.engine, index=index, quiet=True)
+            with self._hash_lock:
+                groups = finder.find_by_hash_staged()
+            return {
+                'groups': {k: [str(p) for p in v] for k, v in groups.items()},
+                'hash_algo': finder.stats['hash_algo'],
+                'errors': [{'path': str(p), 'error': msg} for p, msg in finder.errors],
+            }
+        return self._memoized(json.dumps(['find_duplicates', folder, recursive, extension]), folder, compute)
+
+    def shutdown(self) -> str:
+        if self._server is not None:
+            self._server.close()
+        return "shutting down"
+
+    async def _dispatch(self, request: Dict) -> Optional[Dict]:
+        req_id = request.get('id')
+        method = self.methods.get(request.get('method'))
+        if method is None:
+            return {'jsonrpc': '2.0', 'id': req_id,
+                    'error': {'code': -32601, 'message': f"Method not found: {request.get('method')}"}}
+        params = request.get('params') or {}
+        try:
+            if isinstance(params, list):
+                bound = inspect.signature(method).bind(*params)
+            elif isinstance(params, dict):
+                bound = inspect.signature(method).bind(**params)
+            else:
+                raise TypeError("params must be an array or an object")
+        except TypeError as e:
+            return {'jsonrpc': '2.0', 'id': req_id, 'error': {'code': -32602, 'message': str(e)}}
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                get_executor(), lambda: method(*bound.args, **bound.kwargs))
+        except Exception as e:
+            return {'jsonrpc': '2.0', 'id': req_id, 'error': {'code': -32000, 'message': str(e)}}
+        if req_id is None:
+            return None  # notification
+        return {'jsonrpc': '2.0', 'id': req_id, 'result': result}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    response = {'jsonrpc': '2.0', 'id': None, 'error': {'code': -32700, 'message': "Parse error"}}
+                else:
+                    response = await self._dispatch(request)
+                if response is not None:
+                    writer.write(json.dumps(response).encode() + b"\n")
+                    await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self):
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        # Create the socket owner-only from the start: a chmod after bind leaves a window where others can connect
+        umask = os.umask(0o177)
+        try:
+            self._server = await asyncio.start_unix_server(self._handle, path=str(self.socket_path),
+                                                           limit=16 * 1024 * 1024)
+        finally:
+            os.umask(umask)
+        self.watcher.start()
+        print(f"Folderly daemon listening on {self.socket_path}")
+        try:
+            await self._server.wait_closed()
+        finally:
+            self.watcher.stop()
+            self.cache.close()
+            self.engine.close()
+            shutdown_executor()
+            if self.socket_path.exists():
+                self.socket_path.unlink()
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(FolderlyDaemon().serve())
+    except KeyboardInterrupt:
+        print("\nDaemon stopped.")
\ No newline at end of file
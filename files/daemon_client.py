@@ -0,0 +1,67 @@
+from pathlib import Path
+from typing import Any, Optional, Union
+import json
+import os
+import socket
+import sys
+
+from files.utils import get_folderly_dir
+
+class DaemonError(Exception):
+    """Error returned by the Folderly daemon for a request."""
+
+class DaemonClient:
+    """Thin JSON-RPC client for the Folderly daemon."""
+
+    def __init__(self, socket_path: Optional[Union[str, Path]] = None, timeout: Optional[float] = 60.0):
+        self.socket_path = str(socket_path or os.environ.get("FOLDERLY_SOCKET", get_folderly_dir() / "daemon.sock"))
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(timeout)
+        self.sock.connect(self.socket_path)
+        self._file = self.sock.makefile('rb')
+        self._next_id = 0
+
+    @classmethod
+    def connect_if_running(cls, socket_path: Optional[Union[str, Path]] = None) -> Optional['DaemonClient']:
+        """Return a connected client, or None if no daemon is listening."""
+        try:
+            return cls(socket_path)
+        except OSError:
+            return None
+
+    def call(self, method: str, **params) -> Any:
+        self._next_id += 1
+        request = {'jsonrpc': '2.0', 'id': self._next_id, 'method': method, 'params': params}
+        self.sock.sendall(json.dumps(request).encode() + b"\n")
+        line = self._file.readline()
+        if not line:
+            raise DaemonError("Daemon closed the connection")
+        response = json.loads(line)
+        if 'error' in response:
+            raise DaemonError(response['error']['message'])
+        return response['result']
+
+    def close(self):
+        self._file.close()
+        self.sock.close()
+
+if __name__ == "__main__":
+    # Usage: python -m files.daemon_client <method> [key=value ...]
+    if len(sys.argv) < 2:
+        print("Usage: daemon_client.py <method> [key=value ...]")
+        sys.exit(2)
+    params = {}
+    for arg in sys.argv[2:]:
+        key, _, value = arg.partition('=')
+        params[key] = json.loads(value) if value[:1] in ('[', '{', '"') or value in ('true', 'false', 'null') else value
+    client = DaemonClient.connect_if_running()
+    if client is None:
+        print("Folderly daemon is not running (start it with: python -m files.daemon).")
+        sys.exit(1)
+    try:
+        print(json.dumps(client.call(sys.argv[1], **params), indent=2))
+    except DaemonError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    finally:
+        client.close()
\ No newline at end of file
@@ -0,0 +1,116 @@
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple, Union
+import errno
+import os
+import shutil
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows; reflinks are then never attempted
+    fcntl = None
+
+from files.fastio import identical_groups
+
+# _IOW(0x94, 9, int) from <linux/fs.h>
+FICLONE = 0x40049409
+
+# Errors meaning "this filesystem can't reflink", as opposed to a real I/O failure
+REFLINK_UNSUPPORTED = {errno.EOPNOTSUPP, errno.ENOTTY, errno.EINVAL, errno.EXDEV, errno.ENOSYS, errno.EBADF}
+
+def reflink(src: Union[str, Path], dest: Union[str, Path]):
+    """Create dest as a copy-on-write clone of src (btrfs, XFS, ...). Raises OSError if unsupported."""
+    if fcntl is None:
+        raise OSError(errno.ENOSYS, "reflinks are not supported on this platform")
+    with open(src, 'rb') as fsrc, open(dest, 'xb') as fdest:
+        fcntl.ioctl(fdest.fileno(), FICLONE, fsrc.fileno())
+
+class DedupeReport:
+    def __init__(self):
+        self.linked: List[Tuple[Path, Path, str]] = []
+        self.skipped: List[Tuple[Path, str]] = []
+        self.bytes_reclaimed = 0
+
+    def summary(self) -> str:
+        return (f"Linked {len(self.linked)} duplicates, reclaimed {self.bytes_reclaimed} bytes, "
+                f"skipped {len(self.skipped)}.")
+
+class Deduplicator:
+    """Replaces duplicate files with reflinks or hard links to one kept copy."""
+    MODES = ('auto', 'reflink', 'hardlink')
+
+    def __init__(self, mode: str = 'auto', verify: bool = True):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown dedupe mode '{mode}'. Choose from {', '.join(self.MODES)}.")
+        self.mode = mode
+        self.verify = verify
+
+    def _link(self, keep: Path, dup: Path) -> str:
+        tmp = dup.with_name(f".{dup.name}.folderly-{os.getpid()}.tmp")
+        try:
+            method = 'hardlink'
+            if self.mode in ('auto', 'reflink'):
+                try:
+                    reflink(keep, tmp)
+                    shutil.copystat(dup, tmp)
+                    method = 'reflink'
+                except OSError as e:
+                    if tmp.exists():
+                        tmp.unlink()
+                    if self.mode == 'reflink' or e.errno not in REFLINK_UNSUPPORTED:
+                        raise
+            if method == 'hardlink':
+                os.link(keep, tmp)
+            os.replace(tmp, dup)
+            return method
+        except BaseException:
+            if tmp.exists():
+                tmp.unlink()
+            raise
+
+    def dedupe_group(self, paths: Sequence[Union[str, Path]], report: DedupeReport):
+        by_device: Dict[int, List[Tuple[Path, os.stat_result]]] = {}
+        for p in paths:
+            p = Path(p)
+            try:
+                st = p.stat()
+            except OSError as e:
+                report.skipped.append((p, str(e)))
+                continue
+            by_device.setdefault(st.st_dev, []).append((p, st))
+        for members in by_device.values():
+            if len(members) < 2:
+                report.skipped.extend((p, "no duplicate on the same device") for p, _ in members)
+                continue
+            keep, keep_st = members[0]
+            candidates = []
+            for dup, st in members[1:]:
+                if st.st_ino == keep_st.st_ino:
+                    report.skipped.append((dup, "already linked"))
+                else:
+                    candidates.append((dup, st))
+            if self.verify and candidates:
+                # One lockstep pass over the whole group instead of comparing each file with the keeper
+                same = set()
+                for group in identical_groups([keep] + [dup for dup, _ in candidates]):
+                    if group[0] == keep:
+                        same = set(group)
+            for dup, st in candidates:
+                if self.verify and dup not in same:
+                    report.skipped.append((dup, "contents differ"))
+                    continue
+                try:
+                    method = self._link(keep, dup)
+                except OSError as e:
+                    report.skipped.append((dup, str(e)))
+                    continue
+                report.linked.append((dup, keep, method))
+                # A file with other hard links keeps its data alive, so replacing this name frees nothing
+                if st.st_nlink == 1:
+                    report.bytes_reclaimed += st.st_size
+
+    def dedupe(self, groups: Dict[object, List[Path]]) -> DedupeReport:
+        """Link every duplicate group returned by DuplicateFinder.find_by_hash/find_by_hash_staged."""
+        report = DedupeReport()
+        for paths in groups.values():
+            self.dedupe_group(paths, report)
+        return report
\ No newline at end of file
@@ -1,10 +1,15 @@
 from pathlib import Path
-from typing import List, Union
+from typing import List, Optional, Union
 import shutil
 
+from files.bulk_delete import BulkDeleter, move_to_trash
+from files.journal import OperationJournal, journal_batch
+from files.progress import Progress, cancel_on_interrupt
+
 class DeleteManager:
-    def __init__(self):
-        pass
+    def __init__(self, journal: Optional[OperationJournal] = None):
+        """With a journal, deletes go to the trash (a rename) and are recorded so they can be undone."""
+        self.journal = journal
 
     def delete_single(self, target: Union[str, Path], recursive: bool = False, confirm: bool = True) -> bool:
         """
@@ -22,7 +27,9 @@ class DeleteManager:
                 print("Delete cancelled.")
                 return False
         try:
-            if target.is_file() or target.is_symlink():
+            if self.journal is not None and (not target.is_dir() or target.is_symlink() or recursive):
+                self.journal.record('delete', target, move_to_trash(target))
+            elif target.is_file() or target.is_symlink():
                 target.unlink()
             elif target.is_dir():
                 if recursive:
@@ -40,7 +47,41 @@ class DeleteManager:
         Delete multiple files or folders. Returns a list of booleans indicating success for each delete.
         """
         results = []
-        for target in targets:
-            result = self.delete_single(target, recursive=recursive, confirm=confirm)
-            results.append(result)
-        return results 
\ No newline at end of file
+        with journal_batch(self.journal, "delete"):
+            for target in targets:
+                result = self.delete_single(target, recursive=recursive, confirm=confirm)
+                results.append(result)
+        return results 
+
+    def delete_bulk(self, targets: List[Union[str, Path]], recursive: bool = False, confirm: bool = True,
+                    use_trash: bool = False, progress: Optional[Progress] = None, undoable: bool = True) -> List[bool]:
+        """
+        Delete multiple files or folders with one confirmation for the whole batch.
+        Returns a list of booleans indicating success for each delete.
+        """
+        undoable = undoable and self.journal is not None
+        if undoable:
+            deleter = BulkDeleter(use_trash=True, purge=False, progress=progress)
+        else:
+            deleter = BulkDeleter(use_trash=use_trash, progress=progress)
+        plan = deleter.plan(targets, recursive=recursive)
+        if confirm:
+            try:
+                resp = input(f"Are you sure you want to delete {plan.describe()}? (y/n): ").lower()
+            except KeyboardInterrupt:
+                print()
+                resp = 'n'
+            if resp != 'y':
+                print("Delete cancelled.")
+                return [False] * len(plan.targets)
+        if progress is not None:
+            # Ctrl-C stops after the current target instead of aborting halfway through one
+            with cancel_on_interrupt(progress.token):
+                results = deleter.execute(plan)
+        else:
+            results = deleter.execute(plan)
+        if undoable:
+            with self.journal.batch("delete"):
+                for target, trash_path in deleter.trashed:
+                    self.journal.record('delete', target, trash_path)
+        return results
\ No newline at end of file
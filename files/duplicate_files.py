@@ -1,21 +1,82 @@
 from pathlib import Path
-from typing import Dict, List, Union, Optional
-import hashlib
+from typing import Callable, Dict, List, Tuple, Union, Optional
+import os
+
+from files.chunks import ChunkIndex, ChunkReport, chunk_into
+from files.hash_algos import COLLISION_RESISTANT, resolve_algorithm
+from files.hash_cache import HashCache
+from files.hash_engine import HashEngine, hash_file, hash_head_tail
+from files.index import FileIndex
+from files.progress import CancelToken, Progress
+from files.similar import DHASH_KIND, HammingLSH, block_fingerprint, block_size_class, image_fingerprint, image_suffixes
+from files.walker import walk_paths
 
 class DuplicateFinder:
-    def __init__(self, directory: Union[str, Path], recursive: bool = False, extension: Optional[str] = None):
+    def __init__(self, directory: Union[str, Path], recursive: bool = False, extension: Optional[str] = None,
+                 cache: Optional[HashCache] = None, engine: Optional[HashEngine] = None,
+                 index: Optional[FileIndex] = None, quiet: bool = False, progress: Optional[Progress] = None):
         self.directory = Path(directory)
         self.recursive = recursive
         self.extension = extension
+        self.cache = cache
+        self.engine = engine or HashEngine(backend='serial')
+        self.index = index
+        self.stats = {}
+        # Files that couldn't be read, as (path, message); printed too unless quiet
+        self.errors: List[Tuple[Path, str]] = []
+        self.quiet = quiet
+        # Counts files walked/hashed and bytes read. Cancelling its token from another thread
+        # stops the scan early; the groups confirmed so far are returned
+        self.progress = progress or Progress("Finding duplicates")
+
+    @property
+    def token(self) -> CancelToken:
+        return self.progress.token
+
+    def _error(self, f: Path, message: str):
+        self.errors.append((f, message))
+        if not self.quiet:
+            print(message)
 
     def _get_files(self) -> List[Path]:
-        if self.recursive:
-            files = [f for f in self.directory.rglob('*') if f.is_file()]
-        else:
-            files = [f for f in self.directory.iterdir() if f.is_file()]
-        if self.extension:
-            files = [f for f in files if f.suffix == self.extension]
-        return files
+        if self.index is not None:
+            return self.index.query(self.directory, recursive=self.recursive, suffix=self.extension)
+        self.progress.begin("walking")
+        return list(walk_paths(self.directory, max_depth=None if self.recursive else 0,
+                               extensions=[self.extension] if self.extension else None, progress=self.progress))
+
+    def _hash_many(self, files: List[Path], stat_map: Dict[Path, os.stat_result], kind: Union[str, Callable],
+                   func: Callable, args_for: Callable, read_size: Optional[int] = None) -> Dict[Path, str]:
+        """Hash files with func(*args_for(f, st)), consulting the hash cache first. Returns {path: digest}."""
+        kind_for = kind if callable(kind) else lambda st: kind
+        digests = {}
+        misses = []
+        for f in files:
+            try:
+                st = stat_map.get(f) or f.stat()
+            except OSError as e:
+                self._error(f, f"Error hashing {f}: {e}")
+                continue
+            stat_map[f] = st
+            if self.cache is not None:
+                digest = self.cache.get(st, kind_for(st))
+                if digest is not None:
+                    digests[f] = digest
+                    continue
+            misses.append(f)
+        for args, result in self.engine.map(func, (args_for(f, stat_map[f]) for f in misses)):
+            if self.progress.cancelled:
+                break
+            f = args[0]
+            size = stat_map[f].st_size
+            self.progress.advance(entries=1, nbytes=size if read_size is None else min(size, read_size))
+            if isinstance(result, Exception):
+                self._error(f, f"Error hashing {f}: {result}")
+                continue
+            digests[f] = result
+            if self.cache is not None:
+                self.cache.put(stat_map[f], kind_for(stat_map[f]), result)
+        return {f: digests[f] for f in files if f in digests}
 
     def find_by_name(self) -> Dict[str, List[Path]]:
         """Find duplicate files by name."""
@@ -33,18 +94,189 @@ class DuplicateFinder:
             size_map.setdefault(f.stat().st_size, []).append(f)
         return {k: v for k, v in size_map.items() if len(v) > 1}
 
-    def find_by_hash(self, hash_algo: str = 'sha256', chunk_size: int = 8192) -> Dict[str, List[Path]]:
-        """Find duplicate files by content hash (default: sha256)."""
+    def find_by_hash(self, hash_algo: Optional[str] = None, chunk_size: Optional[int] = None,
+                     confirm: bool = False) -> Dict[str, List[Path]]:
+        """Find duplicate files by content hash (default: FOLDERLY_HASH_ALGO or the fastest available)."""
+        hash_algo = resolve_algorithm(hash_algo)
         files = self._get_files()
         hash_map = {}
+        stat_map = {}
+        self.progress.begin("hashing", total_entries=len(files))
+        digests = self._hash_many(files, stat_map, hash_algo, hash_file,
+                                  lambda f, st: (f, hash_algo, chunk_size))
+        for f, file_hash in digests.items():
+            hash_map.setdefault(file_hash, []).append(f)
+        groups = {k: v for k, v in hash_map.items() if len(v) > 1}
+        if confirm:
+            groups = self._confirm(groups, stat_map, hash_algo, chunk_size)
+        if self.cache is not None:
+            self.cache.flush()
+        self.stats = {'hash_algo': hash_algo, 'confirmed': confirm}
+        return groups
+
+    def _confirm(self, groups: Dict[str, List[Path]], stat_map: Dict[Path, os.stat_result], hash_algo: str,
+                 chunk_size: Optional[int]) -> Dict[str, List[Path]]:
+        # Re-hash grouped files with sha256 and split any group whose members disagree (a collision)
+        if hash_algo in COLLISION_RESISTANT:
+            return groups
+        members = [f for group in groups.values() for f in group]
+        self.progress.begin("confirming", total_entries=len(members),
+                            total_bytes=sum(stat_map[f].st_size for f in members if f in stat_map))
+        digests = self._hash_many(members, stat_map, 'sha256', hash_file, lambda f, st: (f, 'sha256', chunk_size))
+        confirmed = {}
+        for group in groups.values():
+            for f in group:
+                if f in digests:
+                    confirmed.setdefault(digests[f], []).append(f)
+        return {k: v for k, v in confirmed.items() if len(v) > 1}
+
+    def find_by_hash_staged(self, hash_algo: Optional[str] = None, chunk_size: Optional[int] = None,
+                            partial_size: int = 4096, confirm: bool = False) -> Dict[str, List[Path]]:
+        """Find duplicate files by size, then a partial hash, then a full hash of the remaining candidates."""
+        hash_algo = resolve_algorithm(hash_algo)
+        files = self._get_files()
+        stats = {
+            'files': len(files),
+            'total_bytes': 0,
+            'size_stage_skipped_bytes': 0,
+            'partial_stage_skipped_bytes': 0,
+            'bytes_read': 0,
+        }
+
+        # Stage 1: group by size
+        size_map = {}
+        stat_map = {}
         for f in files:
-            h = hashlib.new(hash_algo)
+            if self.progress.cancelled:
+                break
             try:
-                with f.open('rb') as file:
-                    while chunk := file.read(chunk_size):
-                        h.update(chunk)
-                file_hash = h.hexdigest()
-                hash_map.setdefault(file_hash, []).append(f)
-            except Exception as e:
-                print(f"Error hashing {f}: {e}")
-        return {k: v for k, v in hash_map.items() if len(v) > 1} 
\ No newline at end of file
+                st = f.stat()
+            except OSError as e:
+                self._error(f, f"Error reading {f}: {e}")
+                continue
+            size = st.st_size
+            stat_map[f] = st
+            stats['total_bytes'] += size
+            size_map.setdefault(size, []).append(f)
+        for size, group in size_map.items():
+            if len(group) == 1:
+                stats['size_stage_skipped_bytes'] += size
+
+        # Stage 2: group by partial hash; small files are read whole and are already final.
+        # Every size group is hashed in one pass over the engine, then regrouped by (size, digest)
+        hash_map = {}
+        candidates = []
+        stage2 = [f for group in size_map.values() if len(group) > 1 for f in group]
+        self.progress.begin("partial hashing", total_entries=len(stage2))
+        partial_kind = f"{hash_algo}:partial{partial_size}"
+        digests = self._hash_many(stage2, stat_map,
+                                  lambda st: hash_algo if st.st_size <= 2 * partial_size else partial_kind,
+                                  hash_head_tail, lambda f, st: (f, st.st_size, hash_algo, partial_size, chunk_size),
+                                  2 * partial_size)
+        partial_map = {}
+        for f, key in digests.items():
+            size = stat_map[f].st_size
+            stats['bytes_read'] += min(size, 2 * partial_size)
+            partial_map.setdefault((size, key), []).append(f)
+        for (size, key), sub_group in partial_map.items():
+            if size <= 2 * partial_size:
+                hash_map.setdefault(key, []).extend(sub_group)
+            elif len(sub_group) > 1:
+                candidates.extend(sub_group)
+            else:
+                stats['partial_stage_skipped_bytes'] += size - 2 * partial_size
+
+        # Stage 3: full hash of remaining candidates
+        self.progress.begin("full hashing", total_entries=len(candidates),
+                            total_bytes=sum(stat_map[f].st_size for f in candidates))
+        digests = self._hash_many(candidates, stat_map, hash_algo, hash_file,
+                                  lambda f, st: (f, hash_algo, chunk_size))
+        for f, file_hash in digests.items():
+            stats['bytes_read'] += stat_map[f].st_size
+            hash_map.setdefault(file_hash, []).append(f)
+
+        groups = {k: v for k, v in hash_map.items() if len(v) > 1}
+        if confirm:
+            groups = self._confirm(groups, stat_map, hash_algo, chunk_size)
+        if self.cache is not None:
+            self.cache.flush()
+            stats['cache_hits'] = self.cache.hits
+            stats['cache_misses'] = self.cache.misses
+        stats['hash_algo'] = hash_algo
+        stats['confirmed'] = confirm
+        stats['cancelled'] = self.progress.cancelled
+        self.stats = stats
+        return groups
+
+    def find_similar(self, threshold: int = 6, min_binary_size: int = 8 * 1024 * 1024, blocks: int = 32,
+                     block_size: int = 4096) -> Dict[str, List[Path]]:
+        """Find near-duplicate images and large files by perceptual or block fingerprints."""
+        files = self._get_files()
+        suffixes = image_suffixes()
+        images, binaries = [], {}
+        stat_map = {}
+        for f in files:
+            if self.progress.cancelled:
+                break
+            if f.suffix.lower() in suffixes:
+                images.append(f)
+                continue
+            try:
+                st = f.stat()
+            except OSError as e:
+                self._error(f, f"Error reading {f}: {e}")
+                continue
+            if st.st_size >= min_binary_size:
+                stat_map[f] = st
+                binaries.setdefault(block_size_class(st.st_size, blocks, block_size), []).append(f)
+
+        self.progress.begin("fingerprinting", total_entries=len(images) + sum(len(g) for g in binaries.values()))
+        buckets = [('image', self._hash_many(images, stat_map, DHASH_KIND, image_fingerprint, lambda f, st: (f,)))]
+        for size_class, group in binaries.items():
+            digests = self._hash_many(group, stat_map, f"blocks{blocks}x{block_size}", block_fingerprint,
+                                      lambda f, st: (f, st.st_size, blocks, block_size), 2 * blocks * block_size)
+            # Same fingerprint in two classes is unrelated content, so the class is part of the key
+            buckets.append((f"blocks:{size_class}", digests))
+        if self.cache is not None:
+            self.cache.flush()
+
+        result = {}
+        for label, digests in buckets:
+            index = HammingLSH()
+            paths = []
+            for f, digest in digests.items():
+                index.add(int(digest, 16))
+                paths.append(f)
+            for fingerprint, items in index.groups(threshold):
+                result[f"{label}:{fingerprint:016x}"] = [paths[i] for i in sorted(items)]
+        return result
+
+    def find_shared_chunks(self, min_file_size: int = 1024 * 1024, min_shared: int = 1024 * 1024,
+                           avg_chunk: int = 8192) -> ChunkReport:
+        """Find files that share content without being identical, by content-defined chunking."""
+        files = self._get_files()
+        with ChunkIndex(avg_size=avg_chunk) as index:
+            for f in files:
+                try:
+                    size = f.stat().st_size
+                except OSError as e:
+                    self._error(f, f"Error reading {f}: {e}")
+                    continue
+                if size >= min_file_size:
+                    index.add_file(f, size)
+            self.progress.begin("chunking", total_entries=len(index.paths), total_bytes=sum(index.sizes))
+            jobs = (index.job(file_id) for file_id in range(len(index.paths)))
+            for args, result in self.engine.map(chunk_into, jobs):
+                if self.progress.cancelled:
+                    break
+                if isinstance(result, Exception):
+                    self._error(args[0], f"Error reading {args[0]}: {result}")
+                    continue
+                self.progress.advance(entries=1, nbytes=result[1])
+            # A file that failed or was cut off mid-way still has some chunks indexed; they only add to
+            # the totals and to pairs with files that share them, which is still true of its content
+            self.progress.begin("indexing")
+            report = index.report(min_shared=min_shared)
+        self.stats = {'files': report.files, 'chunks': report.chunks, 'unique_chunks': report.unique_chunks,
+                      'cancelled': self.progress.cancelled}
+        return report
\ No newline at end of file
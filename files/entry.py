@@ -0,0 +1,59 @@
+from pathlib import Path
+from typing import Optional
+import os
+import sys
+
+from files.utils import stat_entry
+
+class FileEntry:
+    """Lightweight record for one file or folder, used instead of a Path when listing large trees."""
+    __slots__ = ('parent', 'name', 'is_dir', 'size', 'mtime_ns')
+
+    def __init__(self, parent: str, name: str, is_dir: bool = False,
+                 size: Optional[int] = None, mtime_ns: Optional[int] = None):
+        self.parent = sys.intern(parent)
+        self.name = name
+        self.is_dir = is_dir
+        self.size = size
+        self.mtime_ns = mtime_ns
+
+    @classmethod
+    def from_path(cls, path: str, is_dir: bool = False, size: Optional[int] = None,
+                  mtime_ns: Optional[int] = None) -> 'FileEntry':
+        parent, name = os.path.split(path)
+        return cls(parent, name, is_dir, size, mtime_ns)
+
+    @classmethod
+    def from_dir_entry(cls, entry: os.DirEntry, stat: bool = False) -> 'FileEntry':
+        """Build from an os.scandir entry. With stat=True, size and mtime are filled in (one stat call)."""
+        is_dir = entry.is_dir()
+        size = mtime_ns = None
+        if stat:
+            st = stat_entry(entry)
+            size, mtime_ns = st.st_size, st.st_mtime_ns
+        return cls.from_path(entry.path, is_dir, size, mtime_ns)
+
+    @property
+    def path(self) -> Path:
+        return Path(self.parent, self.name)
+
+    @property
+    def suffix(self) -> str:
+        return '' if self.is_dir else os.path.splitext(self.name)[1]
+
+    def __fspath__(self) -> str:
+        return os.path.join(self.parent, self.name)
+
+    def __str__(self) -> str:
+        return os.path.join(self.parent, self.name)
+
+    def __repr__(self) -> str:
+        return f"FileEntry({str(self)!r})"
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, FileEntry):
+            return self.parent == other.parent and self.name == other.name
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash((self.parent, self.name))
\ No newline at end of file
@@ -0,0 +1,191 @@
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Sequence, Union
+import mmap
+import os
+import threading
+
+MIN_BUFFER = 64 * 1024
+MAX_BUFFER = 1024 * 1024
+
+def _mmap_min_size() -> Optional[int]:
+    value = os.environ.get("FOLDERLY_MMAP_MIN_MB", "").strip()
+    try:
+        return int(float(value) * 1024 * 1024) if value else None
+    except ValueError:
+        return None
+
+# With FOLDERLY_MMAP_MIN_MB set, files at least that large are read through mmap (no copy into a
+# user-space buffer). Off by default: a file truncated while mapped kills the process with SIGBUS
+MMAP_MIN_SIZE = _mmap_min_size()
+# Files at least this large are dropped from the page cache once read, so a scan doesn't evict everything else
+DROP_CACHE_MIN_SIZE = 8 * 1024 * 1024
+# Upper bound on the buffers a lockstep comparison holds at once
+GROUP_MEMORY = 64 * 1024 * 1024
+
+def buffer_size_for(size: int) -> int:
+    """Read size for a file of the given size: about a sixteenth of it, a power of two between 64 KiB and 1 MiB."""
+    return min(MAX_BUFFER, max(MIN_BUFFER, 1 << (size >> 4).bit_length()))
+
+def advise(fd: int, advice: str, offset: int = 0, length: int = 0):
+    """posix_fadvise where the platform has it; errors are ignored."""
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, offset, length, getattr(os, f"POSIX_FADV_{advice}"))
+        except OSError:
+            pass
+
+_pool = threading.local()
+
+def _take_buffer(size: int) -> bytearray:
+    buffers: Dict[int, List[bytearray]] = _pool.__dict__.setdefault('buffers', {})
+    free = buffers.get(size)
+    return free.pop() if free else bytearray(size)
+
+def _give_buffer(buf: bytearray):
+    free = _pool.__dict__.setdefault('buffers', {}).setdefault(len(buf), [])
+    if len(free) < 2:
+        free.append(buf)
+
+def iter_blocks(path: Union[str, Path], buffer_size: Optional[int] = None,
+                drop_cache: bool = True) -> Iterator[memoryview]:
+    """Yield a file's contents as memoryview blocks, each valid only until the next one is requested."""
+    with open(path, 'rb', buffering=0) as file:
+        fd = file.fileno()
+        size = os.fstat(fd).st_size
+        advise(fd, 'SEQUENTIAL')
+        try:
+            if size and MMAP_MIN_SIZE is not None and size >= MMAP_MIN_SIZE:
+                yield from _mapped_blocks(fd, buffer_size or MAX_BUFFER)
+            else:
+                yield from _buffered_blocks(file, buffer_size or buffer_size_for(size))
+        finally:
+            if drop_cache and size >= DROP_CACHE_MIN_SIZE:
+                advise(fd, 'DONTNEED')
+
+def _mapped_blocks(fd: int, step: int) -> Iterator[memoryview]:
+    with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as mm:
+        if hasattr(mm, 'madvise'):
+            mm.madvise(mmap.MADV_SEQUENTIAL)
+        view = memoryview(mm)
+        try:
+            for offset in range(0, len(mm), step):
+                # Released after use so the map can be closed even if the caller still holds the last block
+                block = view[offset:offset + step]
+                try:
+                    yield block
+                finally:
+                    block.release()
+        finally:
+            view.release()
+
+def _buffered_blocks(file: BinaryIO, size: int) -> Iterator[memoryview]:
+    buf = _take_buffer(size)
+    view = memoryview(buf)
+    try:
+        while n := file.readinto(buf):
+            block = view[:n]
+            try:
+                yield block
+            finally:
+                block.release()
+    finally:
+        view.release()
+        _give_buffer(buf)
+
+class _LockstepReader:
+    """One file of a lockstep comparison: reads consecutive blocks into its own buffer."""
+
+    def __init__(self, path: Path, size: int, block_size: int, keep_open: bool):
+        self.path = path
+        self.size = size
+        self.buf = bytearray(block_size)
+        self.n = 0
+        self.file: Optional[BinaryIO] = None
+        if keep_open:
+            self.file = open(path, 'rb', buffering=0)
+            advise(self.file.fileno(), 'SEQUENTIAL')
+
+    def read(self, offset: int) -> int:
+        if self.file is not None:
+            self.n = self.file.readinto(self.buf) or 0
+        else:
+            # Over the open-file budget: reopen for each block
+            with open(self.path, 'rb', buffering=0) as file:
+                file.seek(offset)
+                self.n = file.readinto(self.buf) or 0
+        return self.n
+
+    def same_block(self, other: '_LockstepReader') -> bool:
+        if self.n != other.n:
+            return False
+        if self.n == len(self.buf):
+            return self.buf == other.buf
+        return self.buf[:self.n] == other.buf[:other.n]
+
+    def close(self):
+        if self.file is not None:
+            if self.size >= DROP_CACHE_MIN_SIZE:
+                advise(self.file.fileno(), 'DONTNEED')
+            self.file.close()
+            self.file = None
+
+def _lockstep(paths: List[Path], size: int, buffer_size: Optional[int], max_open: int) -> List[List[Path]]:
+    block_size = buffer_size or buffer_size_for(size)
+    block_size = max(MIN_BUFFER, min(block_size, GROUP_MEMORY // len(paths)))
+    readers = []
+    try:
+        for i, path in enumerate(paths):
+            try:
+                readers.append(_LockstepReader(path, size, block_size, keep_open=i < max_open))
+            except OSError:
+                continue
+        classes = [readers] if len(readers) > 1 else []
+        identical = []
+        offset = 0
+        # Read to EOF rather than to the stat size, so a file that grew since is still compared in full
+        while classes:
+            next_classes = []
+            for members in classes:
+                split: List[List[_LockstepReader]] = []
+                for reader in members:
+                    try:
+                        reader.read(offset)
+                    except OSError:
+                        reader.close()
+                        continue
+                    for sub in split:
+                        if sub[0].same_block(reader):
+                            sub.append(reader)
+                            break
+                    else:
+                        split.append([reader])
+                for sub in split:
+                    if len(sub) > 1 and sub[0].n == 0:
+                        identical.append(sub)
+                    elif len(sub) > 1:
+                        next_classes.append(sub)
+                    else:
+                        # Nothing else matches this file so far: stop reading it
+                        sub[0].close()
+            classes = next_classes
+            offset += block_size
+        return [[reader.path for reader in members] for members in identical]
+    finally:
+        for reader in readers:
+            reader.close()
+
+def identical_groups(paths: Sequence[Union[str, Path]], buffer_size: Optional[int] = None,
+                     max_open: int = 64) -> List[List[Path]]:
+    """Split paths into groups of byte-for-byte identical files, reading each size group in lockstep."""
+    by_size: Dict[int, List[Path]] = {}
+    for p in paths:
+        p = Path(p)
+        try:
+            by_size.setdefault(p.stat().st_size, []).append(p)
+        except OSError:
+            continue
+    groups = []
+    for size, members in by_size.items():
+        if len(members) > 1:
+            groups.extend(_lockstep(members, size, buffer_size, max_open))
+    return groups
\ No newline at end of file
@@ -0,0 +1,106 @@
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import functools
+import hashlib
+import json
+import os
+import time
+
+from files.utils import get_folderly_dir
+
+try:
+    import xxhash
+except ImportError:  # xxhash is optional; the hashlib algorithms are always available
+    xxhash = None
+
+# name -> factory returning a fresh hasher with update(data) and hexdigest()
+_REGISTRY: Dict[str, Callable[[], Any]] = {}
+
+def register_algorithm(name: str, factory: Callable[[], Any]):
+    """Make factory() usable as hash_algo=name for hashing and for 'auto' selection."""
+    _REGISTRY[name] = factory
+
+for _name in ('blake2b', 'blake2s', 'sha1', 'md5', 'sha256', 'sha512'):
+    try:
+        hashlib.new(_name)  # md5/sha1 can be disabled, e.g. in FIPS mode
+    except ValueError:
+        continue
+    register_algorithm(_name, functools.partial(hashlib.new, _name))
+if xxhash is not None:
+    for _name in ('xxh3_64', 'xxh3_128', 'xxh64'):
+        if hasattr(xxhash, _name):
+            register_algorithm(_name, getattr(xxhash, _name))
+
+def available_algorithms() -> List[str]:
+    return sorted(_REGISTRY)
+
+def new_hasher(name: str):
+    """A fresh hasher for a registered algorithm (or any other hashlib name)."""
+    factory = _REGISTRY.get(name)
+    if factory is not None:
+        return factory()
+    try:
+        return hashlib.new(name)
+    except ValueError:
+        raise ValueError(f"Unknown hash algorithm '{name}'. Choose from auto, {', '.join(available_algorithms())}.")
+
+def benchmark_algorithms(names: Optional[Iterable[str]] = None, sample_size: int = 1024 * 1024,
+                         rounds: int = 3) -> Dict[str, float]:
+    """Throughput of each algorithm in MB/s, hashing sample_size random bytes four times (best of rounds)."""
+    data = memoryview(os.urandom(sample_size))
+    speeds = {}
+    for name in names or available_algorithms():
+        best = float('inf')
+        for _ in range(rounds):
+            start = time.perf_counter()
+            h = new_hasher(name)
+            for _ in range(4):
+                h.update(data)
+            h.hexdigest()
+            best = min(best, time.perf_counter() - start)
+        speeds[name] = 4 * sample_size / max(best, 1e-9) / (1024 * 1024)
+    return speeds
+
+# Digests of these can be trusted not to collide, so groups found with them need no sha256 re-check
+COLLISION_RESISTANT = frozenset(('sha256', 'sha512', 'blake2b', 'blake2s'))
+
+def check_env_algorithm():
+    """Raise ValueError if FOLDERLY_HASH_ALGO is set to something other than auto or an available algorithm."""
+    name = os.environ.get("FOLDERLY_HASH_ALGO")
+    if name and name.lower() != 'auto':
+        new_hasher(name.lower())
+
+_fastest: Optional[str] = None
+
+def fastest_algorithm(path: Optional[Path] = None) -> str:
+    """The fastest available algorithm, measured once and kept in ~/.folderly/hash_algo.json."""
+    global _fastest
+    if _fastest is not None:
+        return _fastest
+    path = path or get_folderly_dir() / "hash_algo.json"
+    available = available_algorithms()
+    try:
+        with open(path) as f:
+            saved = json.load(f)
+        if saved.get('available') == available and saved.get('algorithm') in _REGISTRY:
+            _fastest = saved['algorithm']
+            return _fastest
+    except (OSError, ValueError, AttributeError):
+        pass
+    speeds = benchmark_algorithms(available)
+    _fastest = max(speeds, key=speeds.get)
+    try:
+        with open(path, 'w') as f:
+            json.dump({'available': available, 'algorithm': _fastest,
+                       'mb_per_sec': {k: round(v) for k, v in speeds.items()}}, f)
+    except OSError:
+        pass
+    return _fastest
+
+def resolve_algorithm(name: Optional[str] = None) -> str:
+    """The concrete algorithm for name, else FOLDERLY_HASH_ALGO, else the fastest available."""
+    name = (name or os.environ.get("FOLDERLY_HASH_ALGO") or 'auto').lower()
+    if name == 'auto':
+        return fastest_algorithm()
+    new_hasher(name)
+    return name
\ No newline at end of file
@@ -0,0 +1,91 @@
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+import os
+import sqlite3
+import threading
+import time
+
+from files.utils import get_folderly_dir
+
+class HashCache:
+    """Persistent SQLite cache of file digests keyed by (device, inode, size, mtime_ns)."""
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None, max_entries: int = 1_000_000):
+        self.db_path = Path(db_path) if db_path else get_folderly_dir() / "hash_cache.db"
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Recency of cache hits, written in one go by flush() so lookups stay read-only
+        self._touched: Dict[Tuple[int, int, str], float] = {}
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS hashes (
+                dev INTEGER NOT NULL,
+                ino INTEGER NOT NULL,
+                kind TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (dev, ino, kind)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS hashes_last_used ON hashes (last_used)")
+        self.conn.commit()
+
+    def get(self, st: os.stat_result, kind: str) -> Optional[str]:
+        """Return the cached digest for a stat result, or None if missing or stale."""
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT size, mtime_ns, digest FROM hashes WHERE dev = ? AND ino = ? AND kind = ?",
+                (st.st_dev, st.st_ino, kind),
+            ).fetchone()
+            if row is None or row[0] != st.st_size or row[1] != st.st_mtime_ns:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[(st.st_dev, st.st_ino, kind)] = time.time()
+            return row[2]
+
+    def put(self, st: os.stat_result, kind: str, digest: str):
+        """Store a digest for a stat result, replacing any stale entry."""
+        with self._lock:
+            self._touched.pop((st.st_dev, st.st_ino, kind), None)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO hashes (dev, ino, kind, size, mtime_ns, digest, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (st.st_dev, st.st_ino, kind, st.st_size, st.st_mtime_ns, digest, time.time()),
+            )
+
+    def flush(self):
+        """Commit pending writes and evict the least recently used entries over the cap."""
+        with self._lock:
+            if self._touched:
+                self.conn.executemany(
+                    "UPDATE hashes SET last_used = ? WHERE dev = ? AND ino = ? AND kind = ?",
+                    [(used, dev, ino, kind) for (dev, ino, kind), used in self._touched.items()],
+                )
+                self._touched.clear()
+            count = self.conn.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+            if count > self.max_entries:
+                self.conn.execute(
+                    "DELETE FROM hashes WHERE rowid IN "
+                    "(SELECT rowid FROM hashes ORDER BY last_used LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+            self.conn.commit()
+
+    def clear(self):
+        """Remove every cached entry."""
+        with self._lock:
+            self._touched.clear()
+            self.conn.execute("DELETE FROM hashes")
+            self.conn.commit()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            self.conn.close()
\ No newline at end of file
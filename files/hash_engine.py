@@ -0,0 +1,88 @@
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Optional, Tuple, Union
+import os
+
+from files.fastio import iter_blocks
+from files.hash_algos import new_hasher
+
+def hash_file(path: Union[str, Path], hash_algo: str = 'sha256', chunk_size: Optional[int] = None) -> str:
+    """Hash the full contents of a file, read in chunk_size blocks (default: sized to the file, see fastio)."""
+    h = new_hasher(hash_algo)
+    for block in iter_blocks(path, chunk_size):
+        h.update(block)
+    return h.hexdigest()
+
+def hash_partial(path: Union[str, Path], size: int, hash_algo: str = 'sha256', partial_size: int = 4096) -> str:
+    """Hash the first and last partial_size bytes of a file of the given size."""
+    h = new_hasher(hash_algo)
+    with open(path, 'rb') as file:
+        h.update(file.read(partial_size))
+        file.seek(max(size - partial_size, partial_size))
+        h.update(file.read(partial_size))
+    return h.hexdigest()
+
+def hash_head_tail(path: Union[str, Path], size: int, hash_algo: str = 'sha256', partial_size: int = 4096,
+                   chunk_size: Optional[int] = None) -> str:
+    """hash_partial, except files of at most 2 * partial_size bytes are hashed whole with hash_file."""
+    if size <= 2 * partial_size:
+        return hash_file(path, hash_algo, chunk_size)
+    return hash_partial(path, size, hash_algo, partial_size)
+
+class HashEngine:
+    """Runs hashing jobs serially or on a thread/process pool."""
+    BACKENDS = ('serial', 'threads', 'processes')
+
+    def __init__(self, backend: str = 'threads', workers: Optional[int] = None, max_in_flight: Optional[int] = None):
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unknown hash backend '{backend}'. Choose from {', '.join(self.BACKENDS)}.")
+        self.backend = backend
+        self.workers = workers or os.cpu_count() or 1
+        self.max_in_flight = max_in_flight or self.workers * 4
+        self._executor: Optional[Executor] = None
+
+    @classmethod
+    def from_env(cls) -> 'HashEngine':
+        """Build an engine from FOLDERLY_HASH_BACKEND and FOLDERLY_HASH_WORKERS."""
+        backend = os.environ.get("FOLDERLY_HASH_BACKEND", "threads")
+        workers = os.environ.get("FOLDERLY_HASH_WORKERS")
+        return cls(backend=backend, workers=int(workers) if workers else None)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.backend == 'threads':
+                self._executor = ThreadPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        return self._executor
+
+    def map(self, func: Callable, jobs: Iterable[Tuple]) -> Iterator[Tuple[Tuple, Any]]:
+        """Apply func(*args) to each args tuple in jobs, yielding (args, result) in order."""
+        if self.backend == 'serial' or self.workers == 1:
+            for args in jobs:
+                try:
+                    yield args, func(*args)
+                except Exception as e:
+                    yield args, e
+            return
+
+        executor = self._get_executor()
+        pending = deque()
+        for args in jobs:
+            pending.append((args, executor.submit(func, *args)))
+            if len(pending) >= self.max_in_flight:
+                yield self._result(*pending.popleft())
+        while pending:
+            yield self._result(*pending.popleft())
+
+    def _result(self, args: Tuple, future) -> Tuple[Tuple, Any]:
+        try:
+            return args, future.result()
+        except Exception as e:
+            return args, e
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
\ No newline at end of file
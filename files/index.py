@@ -0,0 +1,137 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import os
+import sqlite3
+
+from files.entry import FileEntry
+from files.utils import get_folderly_dir, stat_entry
+
+class FileIndex:
+    """On-disk SQLite index of file metadata for fast queries without walking the disk."""
+
+    def __init__(self, db_path: Optional[Union[str, Path]] = None):
+        self.db_path = Path(db_path) if db_path else get_folderly_dir() / "index.db"
+        self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entries (
+                path TEXT PRIMARY KEY,
+                parent TEXT NOT NULL,
+                suffix TEXT NOT NULL,
+                is_dir INTEGER NOT NULL,
+                is_symlink INTEGER NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS entries_parent ON entries (parent);
+            CREATE INDEX IF NOT EXISTS entries_suffix ON entries (suffix, size);
+            CREATE INDEX IF NOT EXISTS entries_size ON entries (size);
+            CREATE INDEX IF NOT EXISTS entries_mtime ON entries (mtime_ns);
+            CREATE TABLE IF NOT EXISTS dirs (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL
+            );
+        """)
+        self.conn.commit()
+
+    @staticmethod
+    def _subtree_range(path: str):
+        # Every path under `path` sorts between "path/" and "path0" ('0' follows '/')
+        return path.rstrip(os.sep) + os.sep, path.rstrip(os.sep) + chr(ord(os.sep) + 1)
+
+    def _remove_tree(self, path: str):
+        low, high = self._subtree_range(path)
+        for table in ("entries", "dirs"):
+            self.conn.execute(f"DELETE FROM {table} WHERE path = ? OR (path >= ? AND path < ?)", (path, low, high))
+
+    def refresh(self, root: Union[str, Path], full: bool = False) -> Dict[str, int]:
+        """Bring the index for root up to date, re-listing only changed directories."""
+        root = os.path.abspath(root)
+        stats = {'dirs_scanned': 0, 'dirs_skipped': 0}
+        stack = [root]
+        while stack:
+            current = stack.pop()
+            try:
+                st = os.stat(current)
+            except OSError:
+                self._remove_tree(current)
+                continue
+            row = self.conn.execute("SELECT mtime_ns FROM dirs WHERE path = ?", (current,)).fetchone()
+            if not full and row is not None and row[0] == st.st_mtime_ns:
+                stats['dirs_skipped'] += 1
+                stack.extend(r[0] for r in self.conn.execute(
+                    "SELECT path FROM entries WHERE parent = ? AND is_dir = 1 AND is_symlink = 0", (current,)))
+                continue
+
+            stats['dirs_scanned'] += 1
+            try:
+                with os.scandir(current) as it:
+                    entries = list(it)
+            except OSError:
+                self._remove_tree(current)
+                continue
+            seen = set()
+            rows = []
+            for entry in entries:
+                try:
+                    is_symlink = entry.is_symlink()
+                    is_dir = entry.is_dir()
+                    est = stat_entry(entry)
+                except OSError:
+                    continue
+                seen.add(entry.path)
+                suffix = '' if is_dir else os.path.splitext(entry.name)[1]
+                rows.append((entry.path, current, suffix, int(is_dir), int(is_symlink), est.st_size, est.st_mtime_ns))
+                if is_dir and not is_symlink:
+                    stack.append(entry.path)
+            for (old,) in self.conn.execute("SELECT path FROM entries WHERE parent = ?", (current,)).fetchall():
+                if old not in seen:
+                    self._remove_tree(old)
+            self.conn.executemany("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+            self.conn.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?)", (current, st.st_mtime_ns))
+        self.conn.commit()
+        return stats
+
+    def query(self, root: Union[str, Path], recursive: bool = True, files: bool = True, dirs: bool = False,
+              suffix: Optional[str] = None, min_size: Optional[int] = None, max_size: Optional[int] = None,
+              after: Optional[datetime] = None, before: Optional[datetime] = None,
+              entries: bool = False) -> Union[List[Path], List[FileEntry]]:
+        """Return indexed paths under root matching every given filter."""
+        root = os.path.abspath(root)
+        if recursive:
+            low, high = self._subtree_range(root)
+            clauses, params = ["path >= ?", "path < ?"], [low, high]
+        else:
+            clauses, params = ["parent = ?"], [root]
+        if files and not dirs:
+            clauses.append("is_dir = 0")
+        elif dirs and not files:
+            clauses.append("is_dir = 1")
+        elif not files and not dirs:
+            return []
+        if suffix is not None:
+            clauses.append("suffix = ?")
+            params.append(suffix)
+        if min_size is not None:
+            clauses.append("size >= ?")
+            params.append(min_size)
+        if max_size is not None:
+            clauses.append("size <= ?")
+            params.append(max_size)
+        if after is not None:
+            clauses.append("mtime_ns > ?")
+            params.append(int(after.timestamp() * 1_000_000_000))
+        if before is not None:
+            clauses.append("mtime_ns < ?")
+            params.append(int(before.timestamp() * 1_000_000_000))
+        if entries:
+            sql = f"SELECT path, is_dir, size, mtime_ns FROM entries WHERE {' AND '.join(clauses)} ORDER BY path"
+            return [FileEntry.from_path(p, bool(d), size, mtime) for p, d, size, mtime in self.conn.execute(sql, params)]
+        sql = f"SELECT path FROM entries WHERE {' AND '.join(clauses)} ORDER BY path"
+        return [Path(r[0]) for r in self.conn.execute(sql, params)]
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
\ No newline at end of file
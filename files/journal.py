@@ -0,0 +1,150 @@
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from files.bulk_delete import remove_tree, trash_dirs
+from files.move_planner import MovePlanner
+from files.utils import get_folderly_dir
+
+class OperationJournal:
+    """Append-only JSON-lines log of file operations, grouped into batches that can be undone."""
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, batch_size: int = 256):
+        self.path = Path(path) if path else get_folderly_dir() / "journal.ndjson"
+        self.batch_size = batch_size
+        self._buffer: List[str] = []
+        self._batch: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def batch(self, description: str = ""):
+        """Group every record made inside the block into one undoable batch."""
+        if self._batch is not None:
+            yield self._batch
+            return
+        self._batch = uuid.uuid4().hex
+        self._append({'op': 'begin', 'batch': self._batch, 'description': description})
+        try:
+            yield self._batch
+        finally:
+            self._batch = None
+            self.flush()
+
+    def _append(self, record: Dict):
+        record['time'] = time.time()
+        with self._lock:
+            self._buffer.append(json.dumps(record))
+            full = len(self._buffer) >= self.batch_size
+        if full:
+            self.flush()
+
+    def record(self, op: str, src: Union[str, Path], dest: Union[str, Path]):
+        """Log a completed operation. Outside a batch() block, the record is its own batch."""
+        if self._batch is None:
+            with self.batch(op):
+                self.record(op, src, dest)
+            return
+        self._append({'op': op, 'batch': self._batch, 'src': os.path.abspath(src), 'dest': os.path.abspath(dest)})
+
+    def flush(self):
+        with self._lock:
+            if not self._buffer:
+                return
+            lines, self._buffer = self._buffer, []
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write("\n".join(lines) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _read(self) -> List[Dict]:
+        self.flush()
+        if not self.path.exists():
+            return []
+        records = []
+        with open(self.path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue  # torn write from a crash
+        return records
+
+    def last_batch(self) -> Optional[List[Dict]]:
+        """Return the records of the most recent batch that hasn't been undone, or None."""
+        records = self._read()
+        undone = {r['batch'] for r in records if r['op'] == 'undo'}
+        reverted = {(r['batch'], r['of'], r['src'], r['dest']) for r in records if r['op'] == 'reverted'}
+        batches: Dict[str, List[Dict]] = {}
+        for r in records:
+            if r['op'] in ('move', 'copy', 'delete') and r['batch'] not in undone:
+                if (r['batch'], r['op'], r['src'], r['dest']) not in reverted:
+                    batches.setdefault(r['batch'], []).append(r)
+        if not batches:
+            return None
+        return list(batches.values())[-1]
+
+    def _invert(self, record: Dict):
+        src, dest, op = record['src'], record['dest'], record['op']
+        if op == 'copy':
+            if os.path.isdir(dest) and not os.path.islink(dest):
+                remove_tree(dest)
+            else:
+                os.unlink(dest)
+            return
+        if os.path.lexists(src):
+            raise FileExistsError(f"'{src}' already exists")
+        os.makedirs(os.path.dirname(src), exist_ok=True)
+        if op == 'delete':
+            os.rename(dest, src)
+            return
+        plan = MovePlanner().execute(MovePlanner().plan([(dest, src)]))
+        if not plan.steps[0].ok:
+            raise OSError(plan.steps[0].error)
+
+    def undo(self) -> List[str]:
+        """Revert the latest batch, newest operation first. Returns one message per operation."""
+        records = self.last_batch()
+        if records is None:
+            return ["Nothing to undo."]
+        messages = []
+        failed = 0
+        for record in reversed(records):
+            try:
+                self._invert(record)
+                self._append({'op': 'reverted', 'batch': record['batch'], 'of': record['op'],
+                              'src': record['src'], 'dest': record['dest']})
+                messages.append(f"Undid {record['op']}: {record['src']}")
+            except OSError as e:
+                failed += 1
+                messages.append(f"Could not undo {record['op']} of {record['src']}: {e}")
+        if not failed:
+            self._append({'op': 'undo', 'batch': records[0]['batch']})
+        self.flush()
+        return messages
+
+    def empty_trash(self) -> int:
+        """Permanently remove everything in every Folderly trash folder."""
+        count = 0
+        for trash in trash_dirs():
+            for item in trash.iterdir():
+                if item.is_dir() and not item.is_symlink():
+                    shutil.rmtree(item)
+                else:
+                    item.unlink()
+                count += 1
+            if trash.name == ".folderly-trash":
+                try:
+                    trash.rmdir()
+                except OSError:
+                    pass
+        return count
+
+def journal_batch(journal: Optional[OperationJournal], description: str = ""):
+    """journal.batch(description), or a no-op context when there is no journal."""
+    return journal.batch(description) if journal is not None else nullcontext()
\ No newline at end of file
@@ -1,32 +1,58 @@
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional, Union
 from datetime import datetime
 
+from files.entry import FileEntry
+from files.index import FileIndex
+from files.snapshot import Snapshot
+from files.walker import walk_entries, walk_paths
+
 class FileLister:
-    def __init__(self, directory: str):
+    def __init__(self, directory: str, index: Optional[FileIndex] = None):
+        """If an index is given, listings are answered from it instead of reading the disk."""
         self.directory = Path(directory)
+        self.index = index
+
+    def _walk(self, entries: bool, **kwargs) -> Iterator[Union[Path, FileEntry]]:
+        if self.index is not None:
+            return iter(self.index.query(self.directory, recursive=False, entries=entries, **kwargs))
+        if entries:
+            return walk_entries(self.directory, max_depth=0, **kwargs)
+        return walk_paths(self.directory, max_depth=0, **kwargs)
 
-    def list_all(self) -> List[Path]:
+    def list_all(self, entries: bool = False) -> List[Union[Path, FileEntry]]:
         """List all files and folders in the directory."""
+        if entries:
+            return list(self._walk(entries, files=True, dirs=True))
         return list(self.directory.iterdir())
 
-    def list_files(self) -> List[Path]:
-        """List only files."""
-        return [f for f in self.directory.iterdir() if f.is_file()]
+    def iter_files(self, entries: bool = False) -> Iterator[Union[Path, FileEntry]]:
+        """Yield only files, as they are read from the directory."""
+        return self._walk(entries)
+
+    def iter_folders(self, entries: bool = False) -> Iterator[Union[Path, FileEntry]]:
+        """Yield only folders, as they are read from the directory."""
+        return self._walk(entries, files=False, dirs=True)
+
+    def list_files(self, entries: bool = False) -> List[Union[Path, FileEntry]]:
+        """List only files. With entries=True, returns FileEntry records instead of Paths."""
+        return list(self.iter_files(entries))
 
-    def list_folders(self) -> List[Path]:
-        """List only folders."""
-        return [f for f in self.directory.iterdir() if f.is_dir()]
+    def list_folders(self, entries: bool = False) -> List[Union[Path, FileEntry]]:
+        """List only folders. With entries=True, returns FileEntry records instead of Paths."""
+        return list(self.iter_folders(entries))
 
-    def list_by_extension(self, extension: str) -> List[Path]:
+    def list_by_extension(self, extension: str, entries: bool = False) -> List[Union[Path, FileEntry]]:
         """List files by extension (e.g., '.txt')."""
-        return [f for f in self.list_files() if f.suffix == extension]
+        if self.index is not None:
+            return self.index.query(self.directory, recursive=False, suffix=extension, entries=entries)
+        return list(self._walk(entries, extensions=[extension]))
 
-    def list_by_date(self, after: Optional[datetime] = None, before: Optional[datetime] = None) -> List[Path]:
+    def list_by_date(self, after: Optional[datetime] = None, before: Optional[datetime] = None,
+                     entries: bool = False) -> List[Union[Path, FileEntry]]:
         """List files modified after/before certain dates."""
-        result = []
-        for f in self.list_files():
-            mtime = datetime.fromtimestamp(f.stat().st_mtime)
-            if (after is None or mtime > after) and (before is None or mtime < before):
-                result.append(f)
-        return result 
\ No newline at end of file
+        if self.index is not None:
+            return self.index.query(self.directory, recursive=False, after=after, before=before, entries=entries)
+        snapshot = Snapshot.build(self.directory, recursive=False)
+        indices = snapshot.filter(after=after, before=before)
+        return snapshot.to_entries(indices) if entries else snapshot.to_paths(indices)
\ No newline at end of file
@@ -1,10 +1,32 @@
 from pathlib import Path
-from typing import List, Union
-import shutil
+from typing import List, Optional, Union
+
+from files.bulk_delete import move_to_trash
+from files.journal import OperationJournal, journal_batch
+from files.move_planner import MovePlan, MovePlanner
 
 class MoveManager:
-    def __init__(self):
-        pass
+    def __init__(self, journal: Optional[OperationJournal] = None):
+        """With a journal, moves are recorded so they can be undone."""
+        self.journal = journal
+
+    def _planner(self, overwrite: bool) -> MovePlanner:
+        return MovePlanner(overwrite=overwrite, displace=move_to_trash if self.journal is not None else None)
+
+    def _run(self, plan: MovePlan, planner: MovePlanner) -> List[bool]:
+        planner.execute(plan)
+        results = []
+        with journal_batch(self.journal, "move"):
+            for step in plan.steps:
+                if not step.ok and step.error != "destination exists":
+                    print(f"Error moving {step.src} to {step.dest}: {step.error}")
+                if step.ok and self.journal is not None:
+                    # Recorded first so undo moves the source back before restoring what it replaced
+                    if step.replaced is not None:
+                        self.journal.record('delete', step.dest, step.replaced)
+                    self.journal.record('move', step.src, step.dest)
+                results.append(bool(step.ok))
+        return results
 
     def move_single(self, src: Union[str, Path], dest: Union[str, Path], overwrite: bool = False) -> bool:
         """
@@ -12,33 +34,18 @@ class MoveManager:
         If overwrite is False and destination exists, skip and return False.
         Returns True if moved, False otherwise.
         """
-        src = Path(src)
-        dest = Path(dest)
-        if dest.exists():
-            if overwrite:
-                if dest.is_file() or dest.is_symlink():
-                    dest.unlink()
-                elif dest.is_dir():
-                    shutil.rmtree(dest)
-            else:
-                return False
-        try:
-            shutil.move(str(src), str(dest))
-            return True
-        except Exception as e:
-            print(f"Error moving {src} to {dest}: {e}")
-            return False
+        planner = self._planner(overwrite)
+        return self._run(planner.plan([(src, dest)]), planner)[0]
+
+    def plan_multiple(self, sources: List[Union[str, Path]], dest_folder: Union[str, Path],
+                      overwrite: bool = False) -> MovePlan:
+        """Dry run of move_multiple: what would be renamed or copied, and how many bytes would be copied."""
+        return MovePlanner(overwrite=overwrite).plan_into(sources, dest_folder)
 
     def move_multiple(self, sources: List[Union[str, Path]], dest_folder: Union[str, Path], overwrite: bool = False) -> List[bool]:
         """
         Move multiple files or folders to the destination folder.
         Returns a list of booleans indicating success for each move.
         """
-        dest_folder = Path(dest_folder)
-        results = []
-        for src in sources:
-            src = Path(src)
-            dest = dest_folder / src.name
-            result = self.move_single(src, dest, overwrite=overwrite)
-            results.append(result)
-        return results 
\ No newline at end of file
+        planner = self._planner(overwrite)
+        return self._run(planner.plan_into(sources, dest_folder), planner)
\ No newline at end of file
@@ -0,0 +1,295 @@
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Tuple, Union
+import ctypes
+import ctypes.util
+import errno
+import os
+import shutil
+import stat
+import sys
+
+from files.bulk_copy import BulkCopier
+from files.progress import Progress
+from files.utils import stat_entry
+from files.walker import walk
+
+AT_FDCWD = -100
+RENAME_NOREPLACE = 1
+RENAME_EXCHANGE = 2
+
+_renameat2 = None
+if sys.platform.startswith('linux'):
+    try:
+        _libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        _renameat2 = _libc.renameat2
+        _renameat2.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_int, ctypes.c_char_p, ctypes.c_uint]
+    except (OSError, AttributeError):  # glibc < 2.28
+        _renameat2 = None
+
+def renameat2(src: Union[str, Path], dest: Union[str, Path], flags: int) -> bool:
+    """Call renameat2(2). Returns False where it is unsupported."""
+    if _renameat2 is None:
+        return False
+    if _renameat2(AT_FDCWD, os.fsencode(src), AT_FDCWD, os.fsencode(dest), flags) == 0:
+        return True
+    err = ctypes.get_errno()
+    if err in (errno.ENOSYS, errno.EINVAL, errno.EOPNOTSUPP):
+        return False
+    raise OSError(err, os.strerror(err), str(src), None, str(dest))
+
+def _tree_size(path: str) -> int:
+    if not os.path.isdir(path) or os.path.islink(path):
+        return os.lstat(path).st_size
+    total = 0
+    for entry in walk(path):
+        try:
+            total += stat_entry(entry, follow_symlinks=False).st_size
+        except OSError:
+            pass
+    return total
+
+def _remove(path: str):
+    if os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    else:
+        os.unlink(path)
+
+def _is_real_dir(path: str) -> bool:
+    return os.path.isdir(path) and not os.path.islink(path)
+
+def _replica_plan(src: str, dest: str):
+    """Lay out an exact copy of src at dest: (dirs, file jobs, other entries, errors)."""
+    dirs, jobs, others, errors = [], [], [], []
+    stack = [(src, dest)]
+    while stack:
+        s, d = stack.pop()
+        try:
+            st = os.lstat(s)
+        except OSError as e:
+            errors.append(str(e))
+            continue
+        if stat.S_ISDIR(st.st_mode):
+            dirs.append((s, d))
+            try:
+                with os.scandir(s) as it:
+                    names = [entry.name for entry in it]
+            except OSError as e:
+                errors.append(str(e))
+                continue
+            stack.extend((os.path.join(s, name), os.path.join(d, name)) for name in names)
+        elif stat.S_ISREG(st.st_mode):
+            jobs.append((s, d))
+        else:
+            others.append((s, d, st))
+    return dirs, jobs, others, errors
+
+def _recreate(src: str, dest: str, st: os.stat_result):
+    """Recreate a symlink, fifo or device node at dest."""
+    if stat.S_ISLNK(st.st_mode):
+        os.symlink(os.readlink(src), dest)
+    elif stat.S_ISFIFO(st.st_mode):
+        os.mkfifo(dest, stat.S_IMODE(st.st_mode))
+    elif stat.S_ISCHR(st.st_mode) or stat.S_ISBLK(st.st_mode):
+        os.mknod(dest, st.st_mode, st.st_rdev)
+    else:
+        raise OSError(errno.EOPNOTSUPP, "can't be copied to another device (socket or unknown type)", src)
+    try:
+        shutil.copystat(src, dest, follow_symlinks=False)
+    except OSError:
+        pass
+
+class MoveStep:
+    __slots__ = ('src', 'dest', 'method', 'bytes', 'ok', 'error', 'replaced')
+
+    def __init__(self, src: str, dest: str, method: str, nbytes: int = 0):
+        self.src = src
+        self.dest = dest
+        self.method = method
+        self.bytes = nbytes
+        self.ok: Optional[bool] = None
+        self.error: Optional[str] = None
+        # Where the overwritten destination was put aside, when the planner has a displace hook
+        self.replaced: Optional[str] = None
+
+    def __repr__(self) -> str:
+        return f"MoveStep({self.src!r} -> {self.dest!r}, {self.method}, bytes={self.bytes})"
+
+class MovePlan:
+    def __init__(self, steps: List[MoveStep]):
+        self.steps = steps
+
+    @property
+    def bytes_to_copy(self) -> int:
+        return sum(s.bytes for s in self.steps if s.method == 'copy')
+
+    def describe(self) -> str:
+        """Human-readable dry-run summary of the plan."""
+        renames = sum(1 for s in self.steps if s.method == 'rename')
+        copies = sum(1 for s in self.steps if s.method == 'copy')
+        skips = [s for s in self.steps if s.method == 'skip']
+        lines = [f"{s.method:>6}: {s.src} -> {s.dest}" + (f" ({s.bytes} bytes)" if s.method == 'copy' else "")
+                 for s in self.steps]
+        lines.append(f"{renames} renames, {copies} cross-device copies "
+                     f"({self.bytes_to_copy / (1024 * 1024):.1f} MB to copy), {len(skips)} skipped.")
+        return "\n".join(lines)
+
+class MovePlanner:
+    """Plans and runs batch moves: atomic renames on the same device, parallel copies across devices."""
+
+    def __init__(self, overwrite: bool = False, workers: Optional[int] = None,
+                 displace: Optional[Callable[[str], Union[str, Path]]] = None, progress: Optional[Progress] = None):
+        self.overwrite = overwrite
+        self.workers = workers
+        self.displace = displace
+        # Cancelling its token stops before the next step; a source is never removed unless fully copied
+        self.progress = progress
+
+    def _discard(self, path: str) -> Optional[str]:
+        if self.displace is None:
+            _remove(path)
+            return None
+        try:
+            return os.fspath(self.displace(path))
+        except OSError as e:
+            raise OSError(e.errno, f"moved, but the replaced destination was left at {path}: {e.strerror}")
+
+    def plan(self, pairs: Iterable[Tuple[Union[str, Path], Union[str, Path]]]) -> MovePlan:
+        """Build a plan for (src, dest) pairs without touching anything."""
+        steps = []
+        for src, dest in pairs:
+            src, dest = os.fspath(src), os.fspath(dest)
+            try:
+                src_dev = os.lstat(src).st_dev
+                dest_dev = os.stat(os.path.dirname(os.path.abspath(dest))).st_dev
+            except OSError as e:
+                step = MoveStep(src, dest, 'skip')
+                step.error = str(e)
+                steps.append(step)
+                continue
+            if os.path.lexists(dest) and not self.overwrite:
+                step = MoveStep(src, dest, 'skip')
+                step.error = "destination exists"
+                steps.append(step)
+            elif src_dev == dest_dev:
+                steps.append(MoveStep(src, dest, 'rename'))
+            else:
+                steps.append(MoveStep(src, dest, 'copy', _tree_size(src)))
+        return MovePlan(steps)
+
+    def plan_into(self, sources: Iterable[Union[str, Path]], dest_folder: Union[str, Path]) -> MovePlan:
+        """Plan moving each source into dest_folder under its own name."""
+        return self.plan((s, os.path.join(os.fspath(dest_folder), os.path.basename(os.fspath(s).rstrip(os.sep))))
+                         for s in sources)
+
+    def _rename(self, src: str, dest: str) -> Optional[str]:
+        # Returns where the replaced destination went, if there was one and displace kept it
+        if not os.path.lexists(dest):
+            if not renameat2(src, dest, RENAME_NOREPLACE):
+                if os.path.lexists(dest):
+                    raise FileExistsError(errno.EEXIST, "destination exists", dest)
+                os.rename(src, dest)
+            return None
+        if os.path.samestat(os.lstat(src), os.lstat(dest)):
+            raise OSError(errno.EINVAL, "source and destination are the same file", dest)
+        if not self.overwrite:
+            raise FileExistsError(errno.EEXIST, "destination exists", dest)
+        if _is_real_dir(dest) or _is_real_dir(src) or self.displace is not None:
+            # Swap atomically, then discard the old destination, which now sits at src.
+            # rename() can't replace a folder, or a file with a folder, and replace() can't keep the old file
+            if renameat2(src, dest, RENAME_EXCHANGE):
+                return self._discard(src)
+            aside = f"{dest}.folderly-old-{os.getpid()}"
+            os.rename(dest, aside)
+            try:
+                os.rename(src, dest)
+            except OSError:
+                os.rename(aside, dest)
+                raise
+            return self._discard(aside)
+        os.replace(src, dest)
+        return None
+
+    def execute(self, plan: MovePlan, dry_run: bool = False) -> MovePlan:
+        """Run the plan (unless dry_run). Each step's ok/error is filled in."""
+        if dry_run:
+            return plan
+        copies = []
+        for step in plan.steps:
+            if step.method == 'skip':
+                step.ok = False
+            elif self.progress is not None and self.progress.cancelled:
+                step.ok, step.error = False, "cancelled"
+            elif step.method == 'rename':
+                try:
+                    step.replaced = self._rename(step.src, step.dest)
+                    step.ok = True
+                except OSError as e:
+                    step.ok, step.error = False, str(e)
+            else:
+                copies.append(step)
+        if copies:
+            self._execute_copies(copies)
+        return plan
+
+    def _execute_copies(self, steps: List[MoveStep]):
+        # Copy every cross-device source next to its destination, then swap it in and drop the source.
+        # Symlinks, fifos and device nodes are recreated rather than followed; the source is only
+        # removed when every entry of it was copied
+        copier = BulkCopier(workers=self.workers, progress=self.progress)
+        layouts, all_dirs, all_jobs, owners = [], [], [], []
+        for i, step in enumerate(steps):
+            staging = f"{step.dest}.folderly-partial-{os.getpid()}"
+            dirs, jobs, others, errors = _replica_plan(step.src, staging)
+            layouts.append((staging, dirs, others, errors))
+            all_dirs.extend(d for _, d in dirs)
+            all_jobs.extend(jobs)
+            owners.extend([i] * len(jobs))
+        report = copier.copy(all_jobs, all_dirs)
+        failed = {}
+        for owner, job in zip(owners, report.results):
+            if not job.ok:
+                failed.setdefault(owner, job.error)
+        for owner in owners[len(report.results):]:
+            failed.setdefault(owner, "cancelled")
+        for d, error in report.dir_errors:
+            for i, (staging, _, _, _) in enumerate(layouts):
+                if d == staging or d.startswith(staging + os.sep):
+                    failed.setdefault(i, error)
+        for i, step in enumerate(steps):
+            staging, dirs, others, errors = layouts[i]
+            if errors:
+                failed.setdefault(i, f"{len(errors)} entries couldn't be read: {errors[0]}")
+            if i not in failed:
+                for src, dest, st in others:
+                    try:
+                        _recreate(src, dest, st)
+                    except OSError as e:
+                        failed[i] = str(e)
+                        break
+            if i in failed:
+                step.ok, step.error = False, failed[i]
+                if os.path.lexists(staging):
+                    _remove(staging)
+                continue
+            for src, dest in reversed(dirs):
+                try:
+                    shutil.copystat(src, dest)
+                except OSError:
+                    pass
+            try:
+                step.replaced = self._rename(staging, step.dest)
+            except OSError as e:
+                step.ok, step.error = False, str(e)
+                if os.path.lexists(staging):
+                    _remove(staging)
+                continue
+            try:
+                _remove(step.src)
+                step.ok = True
+            except OSError as e:
+                step.ok, step.error = False, f"copied, but the source couldn't be removed: {e}"
+
+    def move(self, sources: Iterable[Union[str, Path]], dest_folder: Union[str, Path],
+             dry_run: bool = False) -> MovePlan:
+        """Plan and run moving sources into dest_folder."""
+        return self.execute(self.plan_into(sources, dest_folder), dry_run=dry_run)
\ No newline at end of file
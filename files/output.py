@@ -0,0 +1,144 @@
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Union
+import base64
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+from files.entry import FileEntry
+
+FORMATS = ('text', 'ndjson', 'null', 'json')
+
+# Lone surrogates: bytes of a file name that aren't valid UTF-8, as os.fsdecode keeps them
+_SURROGATE = re.compile('[\ud800-\udfff]')
+
+def _b64(path: str) -> str:
+    return base64.b64encode(os.fsencode(path)).decode('ascii')
+
+class RecordWriter:
+    """Streams listings and reports as text, null-terminated, NDJSON or JSON."""
+
+    def __init__(self, fmt: str = 'text', stream: Optional[BinaryIO] = None, stat: bool = False,
+                 buffer_size: int = 64 * 1024, max_delay: float = 0.1):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format '{fmt}'. Choose from {', '.join(FORMATS)}.")
+        self.fmt = fmt
+        self.stream = stream or sys.stdout.buffer
+        # Fill in size/mtime (one lstat each) for entries that were listed without them
+        self.stat = stat
+        self.buffer_size = buffer_size
+        self.max_delay = max_delay
+        self.count = 0
+        self._buffer = bytearray()
+        self._last_flush = time.monotonic()
+        self._terminator = b"\0" if fmt == 'null' else b"\n"
+        self._lock = threading.Lock()
+        self._timer: Optional[threading.Timer] = None
+
+    def _emit(self, data: bytes):
+        with self._lock:
+            if self.fmt == 'json':
+                self._buffer += b",\n" if self.count else b"[\n"
+            self._buffer += data
+            if self.fmt != 'json':
+                self._buffer += self._terminator
+            self.count += 1
+            now = time.monotonic()
+            if len(self._buffer) >= self.buffer_size or now - self._last_flush >= self.max_delay:
+                self._flush()
+            elif self._timer is None:
+                # Flush what's buffered even if no further record comes in time
+                self._timer = threading.Timer(self.max_delay, self._timed_flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _timed_flush(self):
+        with self._lock:
+            self._timer = None
+            try:
+                self._flush()
+            except (OSError, ValueError):
+                pass  # the stream is gone; the next write from the main thread reports it
+
+    def _object(self, obj: Dict) -> bytes:
+        for key, value in list(obj.items()):
+            if isinstance(value, str) and _SURROGATE.search(value):
+                obj[f"{key}_b64"] = _b64(value)
+            elif isinstance(value, list) and any(isinstance(v, str) and _SURROGATE.search(v) for v in value):
+                obj[f"{key}_b64"] = [_b64(v) for v in value]
+        text = json.dumps(obj, ensure_ascii=False)
+        return _SURROGATE.sub(lambda m: f"\\u{ord(m.group()):04x}", text).encode('utf-8')
+
+    def entry_record(self, entry: Union[FileEntry, Path, str]) -> Dict:
+        if not isinstance(entry, FileEntry):
+            path = os.fspath(entry)
+            entry = FileEntry.from_path(path, os.path.isdir(path))
+        if self.stat and entry.size is None:
+            try:
+                st = os.lstat(entry)
+                entry.size, entry.mtime_ns = st.st_size, st.st_mtime_ns
+            except OSError:
+                pass
+        record = {'path': str(entry), 'name': entry.name, 'type': 'dir' if entry.is_dir else 'file'}
+        if entry.size is not None:
+            record['size'] = entry.size
+            record['mtime_ns'] = entry.mtime_ns
+        return record
+
+    def write_entry(self, entry: Union[FileEntry, Path, str]):
+        if self.fmt in ('text', 'null'):
+            self._emit(os.fsencode(entry))
+        else:
+            self._emit(self._object(self.entry_record(entry)))
+
+    def write_entries(self, entries: Iterable[Union[FileEntry, Path, str]]) -> int:
+        """Write entries as they arrive and return how many were written."""
+        before = self.count
+        for entry in entries:
+            self.write_entry(entry)
+        return self.count - before
+
+    def write_group(self, key, paths: List[Union[Path, str]]):
+        """One duplicate group: text/null write "key<TAB>path" per path, JSON formats one object per group."""
+        if self.fmt in ('text', 'null'):
+            prefix = os.fsencode(str(key)) + b"\t"
+            for path in paths:
+                self._emit(prefix + os.fsencode(path))
+        else:
+            self._emit(self._object({'key': key, 'count': len(paths), 'paths': [os.fspath(p) for p in paths]}))
+
+    def write_groups(self, groups: Dict) -> int:
+        for key, paths in groups.items():
+            self.write_group(key, paths)
+        return len(groups)
+
+    def write_record(self, record: Dict, text: Optional[str] = None):
+        """A result record (e.g. one move); text/null write `text`, or the record's values tab-separated."""
+        if self.fmt in ('text', 'null'):
+            line = text if text is not None else "\t".join(str(v) for v in record.values())
+            self._emit(line.encode('utf-8', 'surrogateescape'))
+        else:
+            self._emit(self._object(record))
+
+    def _flush(self):
+        if self._buffer:
+            self.stream.write(self._buffer)
+            self._buffer.clear()
+        self.stream.flush()
+        self._last_flush = time.monotonic()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def close(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if self.fmt == 'json':
+                self._buffer += b"\n]\n" if self.count else b"[]\n"
+            self._flush()
\ No newline at end of file
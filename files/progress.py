@@ -0,0 +1,136 @@
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, TextIO
+import json
+import os
+import signal
+import sys
+import threading
+import time
+
+class CancelToken:
+    """Cooperative cancellation flag. Long-running operations check it and return partial results."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+class Progress:
+    """Thread-safe progress counters for one operation, with its CancelToken."""
+
+    def __init__(self, operation: str, callback: Optional[Callable[[Dict], None]] = None, interval: float = 0.2,
+                 token: Optional[CancelToken] = None):
+        self.operation = operation
+        self.stage: Optional[str] = None
+        self.callback = callback
+        self.interval = interval
+        self.token = token or CancelToken()
+        self.entries = 0
+        self.bytes = 0
+        self.total_entries: Optional[int] = None
+        self.total_bytes: Optional[int] = None
+        self.start = time.monotonic()
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        return self.token.cancelled
+
+    def begin(self, stage: str, total_entries: Optional[int] = None, total_bytes: Optional[int] = None):
+        with self._lock:
+            self.stage = stage
+            self.entries = 0
+            self.bytes = 0
+            self.total_entries = total_entries
+            self.total_bytes = total_bytes
+            self.start = time.monotonic()
+
+    def advance(self, entries: int = 0, nbytes: int = 0):
+        with self._lock:
+            self.entries += entries
+            self.bytes += nbytes
+            now = time.monotonic()
+            due = self.callback is not None and now - self._last_report >= self.interval
+            if due:
+                self._last_report = now
+        if due:
+            self.callback(self.snapshot())
+
+    def snapshot(self, done: bool = False) -> Dict:
+        elapsed = max(time.monotonic() - self.start, 1e-9)
+        files_per_sec = self.entries / elapsed
+        bytes_per_sec = self.bytes / elapsed
+        eta = None
+        if self.total_bytes and bytes_per_sec > 0:
+            eta = max(self.total_bytes - self.bytes, 0) / bytes_per_sec
+        elif self.total_entries and files_per_sec > 0:
+            eta = max(self.total_entries - self.entries, 0) / files_per_sec
+        return {
+            'operation': self.operation,
+            'stage': self.stage,
+            'entries': self.entries,
+            'bytes': self.bytes,
+            'total_entries': self.total_entries,
+            'total_bytes': self.total_bytes,
+            'elapsed': round(elapsed, 3),
+            'files_per_sec': round(files_per_sec, 1),
+            'mb_per_sec': round(bytes_per_sec / (1024 * 1024), 2),
+            'eta': round(eta, 1) if eta is not None else None,
+            'done': done,
+            'cancelled': self.cancelled,
+        }
+
+    def finish(self):
+        if self.callback is not None:
+            self.callback(self.snapshot(done=True))
+
+class ProgressLine:
+    """Renders snapshots as a single live status line (for terminals)."""
+
+    def __init__(self, stream: TextIO = sys.stderr):
+        self.stream = stream
+
+    def __call__(self, snap: Dict):
+        label = f"{snap['operation']} [{snap['stage']}]" if snap['stage'] else snap['operation']
+        line = (f"{label}: {snap['entries']} entries, {snap['bytes'] / (1024 * 1024):.1f} MB, "
+                f"{snap['files_per_sec']:.0f} files/s, {snap['mb_per_sec']:.1f} MB/s")
+        if snap['eta'] is not None and not snap['done']:
+            line += f", ETA {snap['eta']:.0f}s"
+        if snap['cancelled']:
+            line += " (cancelled)"
+        self.stream.write("\r" + line.ljust(100) + ("\n" if snap['done'] else ""))
+        self.stream.flush()
+
+class JsonLinesProgress:
+    """Writes each snapshot as one JSON object per line (for scripting)."""
+
+    def __init__(self, stream: TextIO = sys.stderr):
+        self.stream = stream
+
+    def __call__(self, snap: Dict):
+        self.stream.write(json.dumps(snap) + "\n")
+        self.stream.flush()
+
+def make_progress(operation: str, token: Optional[CancelToken] = None) -> Progress:
+    """Build a Progress rendered according to FOLDERLY_PROGRESS: 'line', 'json' or 'off'."""
+    mode = os.environ.get("FOLDERLY_PROGRESS", "line" if sys.stderr.isatty() else "off")
+    callback = {'line': ProgressLine(), 'json': JsonLinesProgress()}.get(mode)
+    return Progress(operation, callback=callback, token=token)
+
+@contextmanager
+def cancel_on_interrupt(token: CancelToken):
+    """Within the block, Ctrl-C cancels token (so the operation returns partial results) instead of raising."""
+    if threading.current_thread() is not threading.main_thread():
+        yield token
+        return
+    previous = signal.signal(signal.SIGINT, lambda signum, frame: token.cancel())
+    try:
+        yield token
+    finally:
+        signal.signal(signal.SIGINT, previous)
\ No newline at end of file
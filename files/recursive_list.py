@@ -1,17 +1,39 @@
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional, Union
+
+from files.entry import FileEntry
+from files.index import FileIndex
+from files.progress import Progress
+from files.walker import walk_entries, walk_paths
 
 class RecursiveLister:
-    def __init__(self, directory: str):
+    def __init__(self, directory: str, index: Optional[FileIndex] = None):
+        """If an index is given, listings are answered from it instead of walking the disk."""
         self.directory = Path(directory)
+        self.index = index
+
+    def iter_files_recursive(self, extension: Optional[str] = None, entries: bool = False,
+                             progress: Optional[Progress] = None) -> Iterator[Union[Path, FileEntry]]:
+        """Yield files in the directory and its subdirectories as they are found, optionally filtered by extension."""
+        if self.index is not None:
+            return iter(self.index.query(self.directory, suffix=extension or None, entries=entries))
+        walker = walk_entries if entries else walk_paths
+        return walker(self.directory, extensions=[extension] if extension else None, progress=progress)
+
+    def iter_folders_recursive(self, entries: bool = False,
+                               progress: Optional[Progress] = None) -> Iterator[Union[Path, FileEntry]]:
+        """Yield folders in the directory and its subdirectories as they are found."""
+        if self.index is not None:
+            return iter(self.index.query(self.directory, files=False, dirs=True, entries=entries))
+        walker = walk_entries if entries else walk_paths
+        return walker(self.directory, files=False, dirs=True, progress=progress)
 
-    def list_files_recursive(self, extension: Optional[str] = None) -> List[Path]:
+    def list_files_recursive(self, extension: Optional[str] = None, entries: bool = False,
+                             progress: Optional[Progress] = None) -> List[Union[Path, FileEntry]]:
         """List all files in the directory and its subdirectories, optionally filtered by extension."""
-        files = [f for f in self.directory.rglob('*') if f.is_file()]
-        if extension:
-            files = [f for f in files if f.suffix == extension]
-        return files
+        return list(self.iter_files_recursive(extension, entries, progress))
 
-    def list_folders_recursive(self) -> List[Path]:
+    def list_folders_recursive(self, entries: bool = False,
+                               progress: Optional[Progress] = None) -> List[Union[Path, FileEntry]]:
         """List all folders in the directory and its subdirectories."""
-        return [f for f in self.directory.rglob('*') if f.is_dir()] 
\ No newline at end of file
+        return list(self.iter_folders_recursive(entries, progress))
\ No newline at end of file
@@ -0,0 +1,294 @@
+from array import array
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple, Union
+import hashlib
+import struct
+import zlib
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional; PNG, BMP and PPM/PGM are decoded in pure Python
+    Image = None
+
+# Which decoder image_fingerprint uses; their resizing differs, so fingerprints are cached per decoder
+IMAGE_DECODER = 'pil' if Image is not None else 'py'
+DHASH_KIND = f"dhash-{IMAGE_DECODER}"
+
+PURE_IMAGE_FORMATS = {'.png', '.bmp', '.ppm', '.pgm'}
+PIL_IMAGE_FORMATS = {'.jpg', '.jpeg', '.gif', '.webp', '.tif', '.tiff'}
+
+def image_suffixes() -> set:
+    """Image suffixes that can be decoded here: the pure-Python ones, plus Pillow's when it is installed."""
+    return PURE_IMAGE_FORMATS | PIL_IMAGE_FORMATS if Image is not None else set(PURE_IMAGE_FORMATS)
+
+# dHash grid: 9 columns by 8 rows gives 8 left/right comparisons per row, 64 bits in all
+GRID_W, GRID_H = 9, 8
+
+def _gray(pixels: bytes, channels: int, step: int) -> Iterator[int]:
+    # Luma of every step-th pixel in a row of 8-bit samples
+    if channels < 3:
+        return iter(pixels[::channels * step])
+    stride = channels * step
+    return ((r * 299 + g * 587 + b * 114) // 1000
+            for r, g, b in zip(pixels[0::stride], pixels[1::stride], pixels[2::stride]))
+
+class _Grid:
+    """Accumulates grayscale rows into GRID_W x GRID_H box averages without keeping the image."""
+
+    def __init__(self, width: int, height: int):
+        if width <= 0 or height <= 0:
+            raise ValueError("empty image")
+        self.width = width
+        self.height = height
+        # Only about 64 samples per row are needed for a 9-column grid
+        self.step = max(1, width // 64)
+        self.columns = [x * GRID_W // width for x in range(0, width, self.step)]
+        self.sums = [0] * (GRID_W * GRID_H)
+        self.counts = [0] * (GRID_W * GRID_H)
+
+    def add_row(self, y: int, values: Iterator[int]):
+        base = (y * GRID_H // self.height) * GRID_W
+        sums, counts = self.sums, self.counts
+        for column, value in zip(self.columns, values):
+            sums[base + column] += value
+            counts[base + column] += 1
+
+    def dhash(self) -> int:
+        cells = [s / c if c else 0.0 for s, c in zip(self.sums, self.counts)]
+        bits = 0
+        for row in range(GRID_H):
+            for col in range(GRID_W - 1):
+                i = row * GRID_W + col
+                bits = (bits << 1) | (cells[i] < cells[i + 1])
+        return bits
+
+def _paeth(a: int, b: int, c: int) -> int:
+    p = a + b - c
+    pa, pb, pc = abs(p - a), abs(p - b), abs(p - c)
+    if pa <= pb and pa <= pc:
+        return a
+    return b if pb <= pc else c
+
+def _unfilter(kind: int, row: bytearray, prev: bytearray, bpp: int):
+    n = len(row)
+    if kind == 1:
+        for i in range(bpp, n):
+            row[i] = (row[i] + row[i - bpp]) & 0xFF
+    elif kind == 2:
+        for i in range(n):
+            row[i] = (row[i] + prev[i]) & 0xFF
+    elif kind == 3:
+        for i in range(n):
+            left = row[i - bpp] if i >= bpp else 0
+            row[i] = (row[i] + ((left + prev[i]) >> 1)) & 0xFF
+    elif kind == 4:
+        for i in range(n):
+            left = row[i - bpp] if i >= bpp else 0
+            up_left = prev[i - bpp] if i >= bpp else 0
+            row[i] = (row[i] + _paeth(left, prev[i], up_left)) & 0xFF
+    elif kind != 0:
+        raise ValueError(f"bad PNG filter type {kind}")
+
+def _png_grid(f) -> _Grid:
+    if f.read(8) != b'\x89PNG\r\n\x1a\n':
+        raise ValueError("not a PNG file")
+    grid = palette = None
+    decompressor = zlib.decompressobj()
+    pending = bytearray()
+    y = 0
+    while True:
+        header = f.read(8)
+        if len(header) < 8:
+            raise ValueError("truncated PNG")
+        length, kind = struct.unpack('>I4s', header)
+        data = f.read(length)
+        f.read(4)  # CRC
+        if kind == b'IHDR':
+            width, height, depth, color, _, _, interlace = struct.unpack('>IIBBBBB', data)
+            if depth != 8 or interlace or color not in (0, 2, 3, 4, 6):
+                raise ValueError("unsupported PNG (only 8-bit, non-interlaced images are decoded without Pillow)")
+            channels = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}[color]
+            row_bytes = width * channels
+            prev = bytearray(row_bytes)
+            grid = _Grid(width, height)
+        elif kind == b'PLTE':
+            palette = data
+        elif kind == b'IDAT' and grid is not None:
+            pending += decompressor.decompress(data)
+            while len(pending) > row_bytes and y < height:
+                row = bytearray(pending[1:row_bytes + 1])
+                _unfilter(pending[0], row, prev, channels)
+                del pending[:row_bytes + 1]
+                if color == 3:
+                    if palette is None:
+                        raise ValueError("PNG palette missing")
+                    rgb = b"".join(palette[i * 3:i * 3 + 3] for i in row[::grid.step])
+                    grid.add_row(y, _gray(rgb, 3, 1))
+                else:
+                    grid.add_row(y, _gray(row, channels, grid.step))
+                prev = row
+                y += 1
+        elif kind == b'IEND':
+            break
+    if grid is None or y < height:
+        raise ValueError("truncated PNG")
+    return grid
+
+def _bmp_grid(f) -> _Grid:
+    header = f.read(54)
+    if header[:2] != b'BM' or len(header) < 54:
+        raise ValueError("not a BMP file")
+    offset, = struct.unpack('<I', header[10:14])
+    width, height, _, bits, compression = struct.unpack('<iiHHI', header[18:34])
+    if bits not in (24, 32) or compression not in (0, 3):
+        raise ValueError("unsupported BMP (only 24/32-bit uncompressed images are decoded without Pillow)")
+    channels = bits // 8
+    row_size = (width * channels + 3) & ~3
+    bottom_up = height > 0
+    height = abs(height)
+    grid = _Grid(width, height)
+    # Rows are independent, so only about 64 of them are read
+    for y in range(0, height, max(1, height // 64)):
+        f.seek(offset + (height - 1 - y if bottom_up else y) * row_size)
+        row = f.read(width * channels)
+        # BGR(A) -> luma
+        grid.add_row(y, _gray(_bgr_to_rgb(row, channels), 3, grid.step))
+    return grid
+
+def _bgr_to_rgb(row: bytes, channels: int) -> bytes:
+    rgb = bytearray(len(row) // channels * 3)
+    rgb[0::3] = row[2::channels]
+    rgb[1::3] = row[1::channels]
+    rgb[2::3] = row[0::channels]
+    return bytes(rgb)
+
+def _ppm_grid(f) -> _Grid:
+    tokens = []
+    while len(tokens) < 4:
+        line = f.readline()
+        if not line:
+            raise ValueError("truncated PPM")
+        tokens += line.split(b'#')[0].split()
+    magic, width, height, maxval = tokens[0], int(tokens[1]), int(tokens[2]), int(tokens[3])
+    if magic not in (b'P5', b'P6') or maxval > 255:
+        raise ValueError("unsupported PPM/PGM (only 8-bit binary P5/P6 images are decoded without Pillow)")
+    channels = 3 if magic == b'P6' else 1
+    row_size = width * channels
+    start = f.tell()
+    grid = _Grid(width, height)
+    for y in range(0, height, max(1, height // 64)):
+        f.seek(start + y * row_size)
+        grid.add_row(y, _gray(f.read(row_size), channels, grid.step))
+    return grid
+
+_DECODERS = {'.png': _png_grid, '.bmp': _bmp_grid, '.ppm': _ppm_grid, '.pgm': _ppm_grid}
+
+def image_fingerprint(path: Union[str, Path]) -> str:
+    """64-bit difference hash (dHash) of an image as 16 hex digits."""
+    suffix = Path(path).suffix.lower()
+    if Image is not None:
+        with Image.open(path) as img:
+            img.draft('L', (GRID_W * 8, GRID_H * 8))  # lets JPEG decode at reduced size
+            small = img.convert('L').resize((GRID_W, GRID_H), Image.BILINEAR)
+            grid = _Grid(GRID_W, GRID_H)
+            pixels = list(small.getdata())
+            for y in range(GRID_H):
+                grid.add_row(y, iter(pixels[y * GRID_W:(y + 1) * GRID_W]))
+    else:
+        decoder = _DECODERS.get(suffix)
+        if decoder is None:
+            raise ValueError(f"can't decode {suffix} images without Pillow")
+        with open(path, 'rb') as f:
+            grid = decoder(f)
+    return f"{grid.dhash():016x}"
+
+def block_fingerprint(path: Union[str, Path], size: int, blocks: int = 32, block_size: int = 4096) -> str:
+    """SimHash of sampled blocks of a large file, as 16 hex digits."""
+    stride = 1 << max(block_size.bit_length() - 1, (size // blocks).bit_length())
+    votes = [0] * 64
+    with open(path, 'rb') as f:
+        for offset in range(0, max(size - block_size, 0) + 1, stride):
+            f.seek(offset)
+            digest = hashlib.blake2b(f.read(block_size), digest_size=8, salt=offset.to_bytes(8, 'little'))
+            value = int.from_bytes(digest.digest(), 'big')
+            for bit in range(64):
+                votes[bit] += 1 if value >> bit & 1 else -1
+    bits = 0
+    for bit in range(64):
+        if votes[bit] > 0:
+            bits |= 1 << bit
+    return f"{bits:016x}"
+
+def block_size_class(size: int, blocks: int = 32, block_size: int = 4096) -> int:
+    """Files are only compared with files of the same class (same sampling grid)."""
+    return max(block_size.bit_length() - 1, (size // blocks).bit_length())
+
+if hasattr(int, 'bit_count'):
+    def hamming(a: int, b: int) -> int:
+        return (a ^ b).bit_count()
+else:
+    def hamming(a: int, b: int) -> int:
+        return bin(a ^ b).count('1')
+
+class HammingLSH:
+    """Groups 64-bit fingerprints within a Hamming radius of each other, using locality-sensitive hashing."""
+
+    def __init__(self, tables: int = 8, max_bucket: int = 64):
+        self.tables = tables
+        # Each new fingerprint is compared with at most this many earlier ones in its bucket
+        self.max_bucket = max_bucket
+        self.fingerprints = array('Q')
+
+    def __len__(self) -> int:
+        return len(self.fingerprints)
+
+    def add(self, fingerprint: int) -> int:
+        """Add a fingerprint and return its item number (items are numbered in insertion order)."""
+        self.fingerprints.append(fingerprint)
+        return len(self.fingerprints) - 1
+
+    def groups(self, radius: int) -> Iterator[Tuple[int, List[int]]]:
+        """Yield (representative fingerprint, items) for every group of more than one item."""
+        fingerprints = self.fingerprints
+        parent = array('l', range(len(fingerprints)))
+
+        def find(x: int) -> int:
+            while parent[x] != x:
+                parent[x] = parent[parent[x]]
+                x = parent[x]
+            return x
+
+        # Identical fingerprints first, so the windowed passes see each value once
+        first: Dict[int, int] = {}
+        distinct = []
+        for item, fp in enumerate(fingerprints):
+            seen = first.setdefault(fp, item)
+            if seen != item:
+                parent[item] = seen
+            else:
+                distinct.append(item)
+        del first
+
+        for table in range(self.tables):
+            shift = table * 64 // self.tables
+            buckets: Dict[int, List[int]] = {}
+            for item in distinct:
+                fp = fingerprints[item]
+                key = ((fp >> shift) | (fp << (64 - shift))) & 0xFFFF if shift else fp & 0xFFFF
+                bucket = buckets.setdefault(key, [])
+                root = find(item)
+                for other in bucket[-self.max_bucket:]:
+                    if hamming(fp, fingerprints[other]) <= radius:
+                        other_root = find(other)
+                        if other_root != root:
+                            parent[max(root, other_root)] = min(root, other_root)
+                            root = min(root, other_root)
+                bucket.append(item)
+            del buckets
+
+        components: Dict[int, List[int]] = {}
+        for item in range(len(fingerprints)):
+            components.setdefault(find(item), []).append(item)
+        for root, items in components.items():
+            if len(items) > 1:
+                yield fingerprints[root], items
\ No newline at end of file
@@ -0,0 +1,108 @@
+from array import array
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+import os
+
+from files.entry import FileEntry
+from files.utils import stat_entry
+from files.walker import walk
+
+try:
+    import numpy as np
+except ImportError:  # optional: filters fall back to pure-Python loops over the same columns
+    np = None
+
+class Snapshot:
+    """Columnar snapshot of the files in a directory, built in one scandir pass."""
+
+    def __init__(self):
+        self.paths: List[str] = []
+        self.sizes = array('q')
+        self.mtimes = array('q')
+        self.suffix_codes = array('i')
+        self.suffix_table: List[str] = []
+        self._suffix_ids: Dict[str, int] = {}
+
+    @classmethod
+    def build(cls, directory: Union[str, Path], recursive: bool = True, **walk_kwargs) -> 'Snapshot':
+        """Scan directory (recursively by default); extra keyword arguments are passed to walker.walk."""
+        snap = cls()
+        if not recursive:
+            walk_kwargs['max_depth'] = 0
+        for entry in walk(directory, **walk_kwargs):
+            try:
+                st = stat_entry(entry)
+            except OSError:
+                continue
+            snap.append(entry.path, st.st_size, st.st_mtime_ns)
+        return snap
+
+    def append(self, path: str, size: int, mtime_ns: int):
+        suffix = os.path.splitext(path)[1]
+        code = self._suffix_ids.get(suffix)
+        if code is None:
+            code = self._suffix_ids[suffix] = len(self.suffix_table)
+            self.suffix_table.append(suffix)
+        self.paths.append(path)
+        self.sizes.append(size)
+        self.mtimes.append(mtime_ns)
+        self.suffix_codes.append(code)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def filter(self, suffix: Optional[str] = None, min_size: Optional[int] = None, max_size: Optional[int] = None,
+               after: Optional[datetime] = None, before: Optional[datetime] = None) -> Sequence[int]:
+        """Return the row indices matching every given filter (mtime compared strictly, like FileLister.list_by_date)."""
+        code = self._suffix_ids.get(suffix, -1) if suffix is not None else None
+        after_ns = int(after.timestamp() * 1_000_000_000) if after else None
+        before_ns = int(before.timestamp() * 1_000_000_000) if before else None
+
+        if np is not None:
+            mask = np.ones(len(self), dtype=bool)
+            sizes = np.frombuffer(self.sizes, dtype=np.int64)
+            mtimes = np.frombuffer(self.mtimes, dtype=np.int64)
+            if code is not None:
+                mask &= np.frombuffer(self.suffix_codes, dtype=np.int32) == code
+            if min_size is not None:
+                mask &= sizes >= min_size
+            if max_size is not None:
+                mask &= sizes <= max_size
+            if after_ns is not None:
+                mask &= mtimes > after_ns
+            if before_ns is not None:
+                mask &= mtimes < before_ns
+            return np.flatnonzero(mask)
+
+        return [
+            i for i, (size, mtime, c) in enumerate(zip(self.sizes, self.mtimes, self.suffix_codes))
+            if (code is None or c == code)
+            and (min_size is None or size >= min_size)
+            and (max_size is None or size <= max_size)
+            and (after_ns is None or mtime > after_ns)
+            and (before_ns is None or mtime < before_ns)
+        ]
+
+    def sort(self, indices: Sequence[int], by: str = 'size', reverse: bool = False) -> Sequence[int]:
+        """Order row indices by 'size', 'mtime' or 'path'."""
+        if by == 'path':
+            return sorted(indices, key=self.paths.__getitem__, reverse=reverse)
+        if by not in ('size', 'mtime'):
+            raise ValueError(f"Cannot sort by '{by}'. Use 'size', 'mtime' or 'path'.")
+        column = self.sizes if by == 'size' else self.mtimes
+        if np is not None:
+            indices = np.asarray(indices, dtype=np.intp)
+            order = np.argsort(np.frombuffer(column, dtype=np.int64)[indices], kind='stable')
+            return indices[order[::-1]] if reverse else indices[order]
+        return sorted(indices, key=column.__getitem__, reverse=reverse)
+
+    def to_entries(self, indices: Optional[Sequence[int]] = None) -> List[FileEntry]:
+        if indices is None:
+            indices = range(len(self))
+        return [FileEntry.from_path(self.paths[i], False, self.sizes[i], self.mtimes[i]) for i in indices]
+
+    def to_paths(self, indices: Optional[Sequence[int]] = None) -> List[Path]:
+        if indices is None:
+            return [Path(p) for p in self.paths]
+        return [Path(self.paths[i]) for i in indices]
\ No newline at end of file
@@ -1,11 +1,24 @@
+import os
+import sys
+import time
 from pathlib import Path
 
-def get_user_root_dirs():
+# How long get_user_root_dirs trusts its last look at the disk, in seconds
+ROOT_DIRS_TTL = 30.0
+_root_dirs_cache = None  # (home, expires_at, roots)
+
+def get_user_root_dirs(max_age: float = ROOT_DIRS_TTL):
     """
     Returns a dictionary of common user root directories (Desktop, Downloads, Documents, Pictures, Music, Videos)
     that exist on the current system.
     """
+    global _root_dirs_cache
     home = Path.home()
+    now = time.monotonic()
+    if _root_dirs_cache is not None and max_age > 0:
+        cached_home, expires_at, cached = _root_dirs_cache
+        if cached_home == home and now < expires_at:
+            return dict(cached)
     roots = {
         "Desktop": home / "Desktop",
         "Downloads": home / "Downloads",
@@ -15,4 +28,30 @@ def get_user_root_dirs():
         "Videos": home / "Videos"
     }
     # Only include folders that actually exist
-    return {name: path for name, path in roots.items() if path.exists()} 
\ No newline at end of file
+    roots = {name: path for name, path in roots.items() if path.exists()}
+    _root_dirs_cache = (home, now + max_age, roots)
+    return dict(roots)
+
+def get_folderly_dir() -> Path:
+    """Returns the folder for Folderly's local state (~/.folderly or FOLDERLY_HOME), creating it if needed."""
+    path = Path(os.environ.get("FOLDERLY_HOME", Path.home() / ".folderly"))
+    path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+def read_io_counters() -> dict:
+    """Returns this process's I/O counters from /proc/self/io, or an empty dict."""
+    counters = {}
+    try:
+        with open('/proc/self/io') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                counters[key] = int(value)
+    except OSError:
+        pass
+    return counters
+
+def stat_entry(entry: os.DirEntry, follow_symlinks: bool = True) -> os.stat_result:
+    """entry.stat(), raising a folderly.stat audit event so the profiler can count it."""
+    sys.audit("folderly.stat", entry.path)
+    return entry.stat(follow_symlinks=follow_symlinks)
\ No newline at end of file
@@ -0,0 +1,73 @@
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Iterable, Iterator, Optional, Union
+import os
+
+from files.entry import FileEntry
+from files.progress import Progress
+from files.utils import stat_entry
+
+def walk(directory: Union[str, Path], files: bool = True, dirs: bool = False,
+         extensions: Optional[Iterable[str]] = None, max_depth: Optional[int] = None,
+         follow_symlinks: bool = False, exclude: Optional[Iterable[str]] = None,
+         progress: Optional[Progress] = None) -> Iterator[os.DirEntry]:
+    """Lazily walk a directory tree with os.scandir, yielding DirEntry objects as they are found."""
+    root = os.fspath(directory)
+    extensions = set(extensions) if extensions else None
+    exclude = list(exclude) if exclude else []
+    stack = [(root, 0)]
+    # Directories already queued, to avoid symlink loops when following links
+    seen = set()
+    while stack:
+        if progress is not None and progress.cancelled:
+            return
+        current, depth = stack.pop()
+        try:
+            with os.scandir(current) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        if progress is not None:
+            progress.advance(entries=len(entries))
+        for entry in entries:
+            if exclude:
+                rel = os.path.relpath(entry.path, root)
+                if any(fnmatch(entry.name, pattern) or fnmatch(rel, pattern) for pattern in exclude):
+                    continue
+            try:
+                is_dir = entry.is_dir()
+                is_file = not is_dir and entry.is_file()
+            except OSError:
+                continue
+            if is_dir:
+                if dirs:
+                    yield entry
+                if max_depth is not None and depth >= max_depth:
+                    continue
+                if entry.is_symlink():
+                    if not follow_symlinks:
+                        continue
+                    try:
+                        st = stat_entry(entry)
+                    except OSError:
+                        continue
+                    if (st.st_dev, st.st_ino) in seen:
+                        continue
+                    seen.add((st.st_dev, st.st_ino))
+                stack.append((entry.path, depth + 1))
+            elif is_file and files:
+                if extensions is None or os.path.splitext(entry.name)[1] in extensions:
+                    yield entry
+
+def walk_paths(directory: Union[str, Path], **kwargs) -> Iterator[Path]:
+    """Same as walk, but yields Path objects."""
+    for entry in walk(directory, **kwargs):
+        yield Path(entry.path)
+
+def walk_entries(directory: Union[str, Path], stat: bool = False, **kwargs) -> Iterator[FileEntry]:
+    """Same as walk, but yields FileEntry records. With stat=True, size and mtime are filled in."""
+    for entry in walk(directory, **kwargs):
+        try:
+            yield FileEntry.from_dir_entry(entry, stat=stat)
+        except OSError:
+            continue
\ No newline at end of file
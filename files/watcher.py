@@ -0,0 +1,267 @@
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Union
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from files.entry import FileEntry
+from files.utils import stat_entry
+from files.walker import walk
+
+# inotify constants from <sys/inotify.h>
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+EVENT_HEADER = struct.Struct('iIII')
+
+class LiveTree:
+    """Thread-safe in-memory view of one or more directory trees, queryable like FileIndex."""
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.entries: Dict[str, Tuple[bool, int, int]] = {}
+        self.children: Dict[str, Set[str]] = {}
+        self.roots: Set[str] = set()
+        # Bumped on every change, so callers can cache results derived from the tree
+        self.version = 0
+
+    def _add(self, path: str, is_dir: bool, st: os.stat_result):
+        self.entries[path] = (is_dir, st.st_size, st.st_mtime_ns)
+        self.children.setdefault(os.path.dirname(path), set()).add(path)
+
+    def _remove(self, path: str):
+        for child in self.children.pop(path, ()):
+            self._remove(child)
+        self.entries.pop(path, None)
+        siblings = self.children.get(os.path.dirname(path))
+        if siblings is not None:
+            siblings.discard(path)
+
+    def scan(self, directory: str) -> List[str]:
+        """(Re)load everything under directory from disk. Returns the directories found, including directory."""
+        found = []
+        for entry in walk(directory, files=True, dirs=True):
+            try:
+                found.append((entry.path, entry.is_dir(), stat_entry(entry)))
+            except OSError:
+                continue
+        with self.lock:
+            for child in list(self.children.get(directory, ())):
+                self._remove(child)
+            for path, is_dir, st in found:
+                self._add(path, is_dir, st)
+            self.version += 1
+        return [directory] + [path for path, is_dir, _ in found if is_dir]
+
+    def add_root(self, root: str) -> List[str]:
+        root = os.path.abspath(root)
+        dirs = self.scan(root)
+        with self.lock:
+            self.roots.add(root)
+        return dirs
+
+    def update(self, path: str) -> List[str]:
+        """Reconcile one path with the disk. Returns directories that are new to the view."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            with self.lock:
+                self._remove(path)
+                self.version += 1
+            return []
+        is_dir = os.path.isdir(path) and not os.path.islink(path)
+        with self.lock:
+            known = path in self.entries
+            self._add(path, os.path.isdir(path), st)
+            self.version += 1
+        if is_dir and not known:
+            return self.scan(path)
+        return []
+
+    def covers(self, path: Union[str, Path]) -> bool:
+        """True if path is inside a root this view has loaded."""
+        path = os.path.abspath(path)
+        with self.lock:
+            return any(path == root or path.startswith(root.rstrip(os.sep) + os.sep) for root in self.roots)
+
+    def query(self, root: Union[str, Path], recursive: bool = True, files: bool = True, dirs: bool = False,
+              suffix: Optional[str] = None, min_size: Optional[int] = None, max_size: Optional[int] = None,
+              after: Optional[datetime] = None, before: Optional[datetime] = None,
+              entries: bool = False) -> Union[List[Path], List[FileEntry]]:
+        """Return known paths (or FileEntry records, with entries=True) under root matching every given filter."""
+        root = os.path.abspath(root)
+        after_ns = int(after.timestamp() * 1_000_000_000) if after else None
+        before_ns = int(before.timestamp() * 1_000_000_000) if before else None
+        result = []
+        with self.lock:
+            stack = [root]
+            while stack:
+                for path in self.children.get(stack.pop(), ()):
+                    is_dir, size, mtime_ns = self.entries[path]
+                    if recursive and is_dir:
+                        stack.append(path)
+                    if (is_dir and not dirs) or (not is_dir and not files):
+                        continue
+                    if suffix is not None and (is_dir or os.path.splitext(path)[1] != suffix):
+                        continue
+                    if (min_size is not None and size < min_size) or (max_size is not None and size > max_size):
+                        continue
+                    if (after_ns is not None and mtime_ns <= after_ns) or (before_ns is not None and mtime_ns >= before_ns):
+                        continue
+                    result.append(path)
+            result.sort()
+            if entries:
+                return [FileEntry.from_path(p, *self.entries[p]) for p in result]
+        return [Path(p) for p in result]
+
+class _Inotify:
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.paths: Dict[int, str] = {}
+
+    def watch(self, path: str):
+        wd = self._add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {path}")
+        self.paths[wd] = path
+
+    def read(self, timeout: float) -> Optional[List[Tuple[str, int]]]:
+        """Return (path, mask) events, or None if the kernel queue overflowed."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _cookie, length = EVENT_HEADER.unpack_from(buf, offset)
+            name = buf[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b'\0')
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & IN_IGNORED:
+                self.paths.pop(wd, None)
+                continue
+            base = self.paths.get(wd)
+            if base is not None:
+                events.append((os.path.join(base, os.fsdecode(name)) if name else base, mask))
+        return events
+
+    def close(self):
+        os.close(self.fd)
+
+class FolderWatcher:
+    """Keeps a LiveTree in sync with the given roots from a background thread."""
+
+    def __init__(self, roots: Iterable[Union[str, Path]], poll_interval: float = 5.0, coalesce_delay: float = 0.2):
+        self.roots = [os.path.abspath(r) for r in roots]
+        self.poll_interval = poll_interval
+        self.coalesce_delay = coalesce_delay
+        self.tree = LiveTree()
+        self.backend = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="folderly-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        inotify = None
+        if sys.platform.startswith('linux'):
+            try:
+                inotify = _Inotify()
+            except (OSError, AttributeError):
+                inotify = None
+        try:
+            if inotify is not None:
+                self.backend = 'inotify'
+                self._run_inotify(inotify)
+            else:
+                self.backend = 'polling'
+                self._run_polling()
+        finally:
+            if inotify is not None:
+                inotify.close()
+
+    def _load(self, inotify: '_Inotify') -> bool:
+        """Scan every root and watch its directories. Returns False if watches ran out."""
+        for root in self.roots:
+            dirs = self.tree.add_root(root)
+            for d in dirs:
+                try:
+                    inotify.watch(d)
+                except OSError:
+                    return False
+        return True
+
+    def _run_inotify(self, inotify: '_Inotify'):
+        if not self._load(inotify):
+            self.backend = 'polling'
+            self._run_polling()
+            return
+        while not self._stop.is_set():
+            events = inotify.read(0.5)
+            if events is None:
+                self._load(inotify)
+                continue
+            if not events:
+                continue
+            # Coalesce a burst into one set of dirty paths
+            dirty = {path for path, _ in events}
+            deadline = time.monotonic() + self.coalesce_delay
+            while time.monotonic() < deadline:
+                more = inotify.read(max(deadline - time.monotonic(), 0))
+                if more is None:
+                    dirty = None
+                    break
+                dirty.update(path for path, _ in more)
+            if dirty is None:
+                self._load(inotify)
+                continue
+            # Parents first, so new folders are scanned before their contents are updated
+            for path in sorted(dirty, key=len):
+                for d in self.tree.update(path):
+                    try:
+                        inotify.watch(d)
+                    except OSError:
+                        pass
+
+    def _run_polling(self):
+        for root in self.roots:
+            self.tree.add_root(root)
+        while not self._stop.wait(self.poll_interval):
+            for root in self.roots:
+                self.tree.scan(root)
\ No newline at end of file
@@ -6,7 +6,15 @@ from files.move_files import MoveManager
 from files.delete_files import DeleteManager
 from files.copy_files import CopyManager
 from files.duplicate_files import DuplicateFinder
+from files.dedupe import Deduplicator
+from files.hash_algos import check_env_algorithm
+from files.hash_cache import HashCache
+from files.index import FileIndex
+from files.hash_engine import HashEngine
+from files.journal import OperationJournal
+from files.progress import cancel_on_interrupt, make_progress
 from pathlib import Path
+import os
 
 def print_duplicates(dupes):
     if not dupes:
@@ -17,6 +25,22 @@ def print_duplicates(dupes):
             for f in files:
                 print(f"  {f}")
 
+def find_hash_duplicates(finder, confirm: bool = False):
+    # Show a live progress line; Ctrl-C stops the scan and keeps the groups confirmed so far.
+    # Before deleting, confirm so groups from a fast non-cryptographic hash are re-checked with sha256
+    with cancel_on_interrupt(finder.token):
+        dupes = finder.find_by_hash_staged(confirm=confirm)
+    finder.progress.finish()
+    if finder.progress.cancelled:
+        print("Scan cancelled, showing partial results.")
+    return dupes
+
+def print_entries(entries):
+    if not entries:
+        print("(No items found)")
+    for entry in entries:
+        print(entry)
+
 def main():
     roots = get_user_root_dirs()
     print("Available root folders:")
@@ -41,10 +65,25 @@ def main():
         return
 
     lister = FileLister(str(folder_path))
-    rec_lister = RecursiveLister(str(folder_path))
-    mover = MoveManager()
-    deleter = DeleteManager()
-    copier = CopyManager()
+    # Recursive listings are answered from the on-disk index, refreshed first (only changed folders are re-read)
+    file_index = FileIndex()
+    rec_lister = RecursiveLister(str(folder_path), index=file_index)
+    # Every move/copy/delete is journaled (deletes go to the trash) so it can be undone
+    journal = OperationJournal()
+    mover = MoveManager(journal)
+    deleter = DeleteManager(journal)
+    copier = CopyManager(journal)
+    hash_cache = HashCache()
+    try:
+        hash_engine = HashEngine.from_env()
+    except ValueError as e:
+        print(f"FOLDERLY_HASH_BACKEND/FOLDERLY_HASH_WORKERS: {e} Using the default.")
+        hash_engine = HashEngine()
+    try:
+        check_env_algorithm()
+    except ValueError as e:
+        print(f"FOLDERLY_HASH_ALGO: {e} Using auto.")
+        os.environ["FOLDERLY_HASH_ALGO"] = "auto"
 
     # Menu for file operations
     while True:
@@ -66,25 +105,33 @@ def main():
         print("15. Find duplicate files by size")
         print("16. Find duplicate files by content hash")
         print("17. Auto-delete duplicates (keep one per group, by content hash)")
+        print("18. Deduplicate with hardlinks/reflinks (keeps every path, by content hash)")
+        print("19. Undo last move/copy/delete")
+        print("20. Empty trash (deleted files can no longer be restored)")
+        print("21. Find similar files (resized/re-encoded images, near-identical large files)")
+        print("22. Find files sharing content (backups, VM images, archives)")
         print("0. Exit")
         op = input("Enter your choice: ")
 
         if op == "1":
-            print(lister.list_all())
+            print_entries(lister.list_all(entries=True))
         elif op == "2":
-            print(lister.list_files())
+            print_entries(lister.list_files(entries=True))
         elif op == "3":
-            print(lister.list_folders())
+            print_entries(lister.list_folders(entries=True))
         elif op == "4":
             ext = input("Enter file extension (e.g., .txt): ")
-            print(lister.list_by_extension(ext))
+            print_entries(lister.list_by_extension(ext, entries=True))
         elif op == "5":
-            print(rec_lister.list_files_recursive())
+            file_index.refresh(folder_path)
+            print_entries(rec_lister.list_files_recursive(entries=True))
         elif op == "6":
             ext = input("Enter file extension (e.g., .txt): ")
-            print(rec_lister.list_files_recursive(ext))
+            file_index.refresh(folder_path)
+            print_entries(rec_lister.list_files_recursive(ext, entries=True))
         elif op == "7":
-            print(rec_lister.list_folders_recursive())
+            file_index.refresh(folder_path)
+            print_entries(rec_lister.list_folders_recursive(entries=True))
         elif op == "8":
             src = input("Enter the full path of the file/folder to move: ")
             dest_dir = input("Enter the destination directory: ")
@@ -106,6 +153,10 @@ def main():
                 validate_directory(dest_dir)
                 src_paths = [Path(s.strip()) for s in srcs]
                 dest_path = Path(dest_dir)
+                print(mover.plan_multiple(src_paths, dest_path).describe())
+                if input("Proceed with this move? (y/n): ").lower() != 'y':
+                    print("Move cancelled.")
+                    continue
                 results = mover.move_multiple(src_paths, dest_path)
                 for src_path, result in zip(src_paths, results):
                     if result:
@@ -121,7 +172,13 @@ def main():
         elif op == "11":
             targets = input("Enter full paths of files/folders to delete (comma separated): ").split(",")
             recursive = input("Delete recursively (for folders)? (y/n): ").lower() == 'y'
-            deleter.delete_multiple([t.strip() for t in targets], recursive=recursive, confirm=True)
+            undoable = input("Keep them in the trash so the delete can be undone? (y/n): ").lower() == 'y'
+            use_trash = not undoable and input("Move to trash first and purge in the background? (y/n): ").lower() == 'y'
+            progress = make_progress("Deleting")
+            # Ctrl-C at the confirmation cancels it; during the delete it stops after the current target
+            deleter.delete_bulk([t.strip() for t in targets], recursive=recursive, confirm=True,
+                                use_trash=use_trash, progress=progress, undoable=undoable)
+            progress.finish()
         elif op == "12":
             src = input("Enter the full path of the file/folder to copy: ")
             dest_dir = input("Enter the destination directory: ")
@@ -145,12 +202,16 @@ def main():
                 validate_directory(dest_dir)
                 src_paths = [Path(s.strip()) for s in srcs]
                 dest_path = Path(dest_dir)
-                results = copier.copy_multiple(src_paths, dest_path, overwrite=overwrite)
+                progress = make_progress("Copying")
+                with cancel_on_interrupt(progress.token):
+                    results = copier.copy_bulk(src_paths, dest_path, overwrite=overwrite, progress=progress)
+                progress.finish()
                 for src_path, result in zip(src_paths, results):
                     if result:
                         print(f"Copied {src_path} to {dest_path / src_path.name}")
                     else:
                         print(f"Failed to copy {src_path} to {dest_path / src_path.name}")
+                print(copier.last_report.summary())
             except Exception as e:
                 print(f"Error: {e}")
         elif op == "14":
@@ -171,15 +232,27 @@ def main():
             recursive = input("Search recursively? (y/n): ").lower() == 'y'
             ext = input("Enter file extension to filter (e.g., .pdf) or leave blank for all: ").strip()
             ext = ext if ext else None
-            finder = DuplicateFinder(folder_path, recursive=recursive, extension=ext)
-            dupes = finder.find_by_hash()
+            finder = DuplicateFinder(folder_path, recursive=recursive, extension=ext,
+                                     cache=hash_cache, engine=hash_engine,
+                                     progress=make_progress("Finding duplicates"))
+            dupes = find_hash_duplicates(finder)
             print_duplicates(dupes)
+            stats = finder.stats
+            print(f"\nRead {stats['bytes_read']} of {stats['total_bytes']} bytes "
+                  f"(skipped {stats['size_stage_skipped_bytes']} by size, "
+                  f"{stats['partial_stage_skipped_bytes']} by partial hash).")
         elif op == "17":
             recursive = input("Search recursively? (y/n): ").lower() == 'y'
             ext = input("Enter file extension to filter (e.g., .pdf) or leave blank for all: ").strip()
             ext = ext if ext else None
-            finder = DuplicateFinder(folder_path, recursive=recursive, extension=ext)
-            dupes = finder.find_by_hash()
+            finder = DuplicateFinder(folder_path, recursive=recursive, extension=ext,
+                                     cache=hash_cache, engine=hash_engine,
+                                     progress=make_progress("Finding duplicates"))
+            dupes = find_hash_duplicates(finder, confirm=True)
+            if finder.progress.cancelled:
+                # Partial groups may be missing members; don't act on them
+                print("Nothing was deleted.")
+                continue
             files_to_delete = []
             for group in dupes.values():
                 # Keep the first file, delete the rest
@@ -192,12 +265,73 @@ def main():
                     print(f"  {f}")
                 confirm = input("Are you sure you want to delete these files? (y/n): ").lower()
                 if confirm == 'y':
-                    deleter = DeleteManager()
-                    deleter.delete_multiple(files_to_delete, recursive=False, confirm=False)
+                    deleter.delete_bulk(files_to_delete, recursive=False, confirm=False)
                     print("Duplicates deleted.")
                 else:
                     print("Delete cancelled.")
+        elif op == "18":
+            recursive = input("Search recursively? (y/n): ").lower() == 'y'
+            ext = input("Enter file extension to filter (e.g., .pdf) or leave blank for all: ").strip()
+            ext = ext if ext else None
+            mode = input("Link mode - auto, reflink or hardlink (default auto): ").strip().lower() or 'auto'
+            finder = DuplicateFinder(folder_path, recursive=recursive, extension=ext,
+                                     cache=hash_cache, engine=hash_engine,
+                                     progress=make_progress("Finding duplicates"))
+            dupes = find_hash_duplicates(finder)
+            if finder.progress.cancelled:
+                print("Nothing was linked.")
+                continue
+            if not dupes:
+                print("No duplicates to link.")
+            else:
+                print_duplicates(dupes)
+                confirm = input("Replace these duplicates with links to the first file of each group? (y/n): ").lower()
+                if confirm == 'y':
+                    try:
+                        report = Deduplicator(mode=mode).dedupe(dupes)
+                    except ValueError as e:
+                        print(f"Error: {e}")
+                        continue
+                    for dup, keep, method in report.linked:
+                        print(f"  {dup} -> {keep} ({method})")
+                    for path, reason in report.skipped:
+                        print(f"  Skipped {path}: {reason}")
+                    print(report.summary())
+                else:
+                    print("Dedupe cancelled.")
+        elif op == "19":
+            for message in journal.undo():
+                print(message)
+        elif op == "20":
+            confirm = input("Permanently remove everything in the trash? (y/n): ").lower()
+            if confirm == 'y':
+                print(f"Removed {journal.empty_trash()} items from the trash.")
+        elif op == "21":
+            recursive = input("Search recursively? (y/n): ").lower() == 'y'
+            threshold = input("Max differing bits out of 64 (default 6): ").strip()
+            finder = DuplicateFinder(folder_path, recursive=recursive, cache=hash_cache, engine=hash_engine,
+                                     progress=make_progress("Finding similar files"))
+            with cancel_on_interrupt(finder.token):
+                dupes = finder.find_similar(threshold=int(threshold) if threshold.isdigit() else 6)
+            finder.progress.finish()
+            print_duplicates(dupes)
+        elif op == "22":
+            recursive = input("Search recursively? (y/n): ").lower() == 'y'
+            min_mb = input("Only files of at least this many MB (default 1): ").strip()
+            finder = DuplicateFinder(folder_path, recursive=recursive, engine=hash_engine,
+                                     progress=make_progress("Finding shared content"))
+            with cancel_on_interrupt(finder.token):
+                report = finder.find_shared_chunks(min_file_size=(int(min_mb) if min_mb.isdigit() else 1) * 1024 * 1024)
+            finder.progress.finish()
+            for a, b, shared in report.pairs:
+                smaller = min(report.sizes[a], report.sizes[b]) or 1
+                print(f"  {a}\n  {b}\n    share {shared / (1024 * 1024):.1f} MB ({100 * shared / smaller:.0f}% of the smaller file)")
+            print(report.summary())
         elif op == "0":
+            file_index.close()
+            hash_cache.close()
+            hash_engine.close()
+            journal.flush()
             print("Goodbye!")
             break
         else:
@@ -0,0 +1,36 @@
+from pathlib import Path
+import os
+import shutil
+import tempfile
+
+import pytest
+
+@pytest.fixture(autouse=True)
+def folderly_home(tmp_path, monkeypatch):
+    """Keep journals, trash and caches out of the real ~/.folderly."""
+    home = tmp_path / "home"
+    monkeypatch.setenv("FOLDERLY_HOME", str(home))
+    return home
+
+@pytest.fixture
+def other_device(tmp_path):
+    """A folder on a different filesystem than tmp_path, for cross-device moves."""
+    for base in ("/dev/shm", "/run/user/%d" % os.getuid()):
+        if os.path.isdir(base) and os.access(base, os.W_OK) and os.stat(base).st_dev != tmp_path.stat().st_dev:
+            path = Path(tempfile.mkdtemp(dir=base))
+            yield path
+            shutil.rmtree(path, ignore_errors=True)
+            return
+    pytest.skip("no second writable filesystem")
+
+@pytest.fixture
+def write():
+    """write(path, data) creates path and its parent folders and returns path; bytes are written as-is."""
+    def write(path: Path, data="data") -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if isinstance(data, bytes):
+            path.write_bytes(data)
+        else:
+            path.write_text(data)
+        return path
+    return write
@@ -0,0 +1,55 @@
+from concurrent.futures import ThreadPoolExecutor
+import asyncio
+import time
+
+import pytest
+
+import files.bulk_copy
+from files.async_api import AsyncDuplicateFinder, AsyncFileManager
+
+@pytest.fixture
+def slow_copies(monkeypatch):
+    copy = files.bulk_copy.copy_file_fast
+
+    def slow(src, dest, overwrite=False):
+        time.sleep(0.01)
+        return copy(src, dest, overwrite)
+    monkeypatch.setattr(files.bulk_copy, "copy_file_fast", slow)
+
+def test_cancelled_copy_stops_the_worker(tmp_path, write, slow_copies):
+    for i in range(200):
+        write(tmp_path / "src" / f"{i}.txt")
+    (tmp_path / "out").mkdir()
+    executor = ThreadPoolExecutor(1)
+
+    async def run():
+        task = asyncio.create_task(AsyncFileManager(workers=1, executor=executor).copy([tmp_path / "src"], tmp_path / "out"))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(run())
+    executor.shutdown(wait=True)
+    assert len(list((tmp_path / "out" / "src").iterdir())) < 100
+
+def test_concurrent_duplicate_scans_are_independent(tmp_path, write):
+    write(tmp_path / "a.txt", "same")
+    write(tmp_path / "b.txt", "same")
+    finder = AsyncDuplicateFinder(tmp_path)
+
+    async def run():
+        return await asyncio.gather(finder.find_by_hash("sha256"), finder.find_by_size(), finder.find_by_hash("md5"))
+
+    by_sha, by_size, by_md5 = asyncio.run(run())
+    assert [len(g) for g in by_sha['groups'].values()] == [2]
+    assert by_sha['stats']['hash_algo'] == "sha256"
+    assert by_md5['stats']['hash_algo'] == "md5"
+    assert list(by_size['groups']) == ["4"]
+
+def test_delete_returns_structured_results(tmp_path, write):
+    targets = [write(tmp_path / "a.txt"), write(tmp_path / "dir" / "b.txt").parent]
+    result = asyncio.run(AsyncFileManager().delete(targets, recursive=True))
+    assert [r['ok'] for r in result['results']] == [True, True]
+    assert result['plan']['files'] == 2
+    assert not any(t.exists() for t in targets)
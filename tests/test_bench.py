@@ -0,0 +1,20 @@
+import os
+
+import files.hash_algos
+from files.bench import Benchmark, TreeSpec, generate_tree
+
+def test_generate_tree_is_deterministic(tmp_path):
+    spec = TreeSpec(depth=1, fanout=2, files_per_dir=5, mean_size=100, max_size=1000)
+    first = generate_tree(tmp_path / "a", spec)
+    second = generate_tree(tmp_path / "b", spec)
+    assert first == second
+    assert first['files'] == 15
+
+def test_benchmark_leaves_folderly_home_alone(tmp_path, folderly_home, monkeypatch):
+    monkeypatch.setattr(files.hash_algos, "_fastest", None)
+    spec = TreeSpec(depth=1, fanout=2, files_per_dir=3, mean_size=100, max_size=1000)
+    result = Benchmark(spec, repeat=1, workdir=tmp_path).run(progress=lambda message: None)
+    assert 'duplicates_staged' in result['results']
+    assert os.environ["FOLDERLY_HOME"] == str(folderly_home)
+    assert not folderly_home.exists()
+    assert not any(p.name.startswith("folderly-bench-") for p in tmp_path.iterdir())
@@ -0,0 +1,100 @@
+import random
+
+import pytest
+
+from files.chunks import GEAR, ChunkIndex, chunk_into, chunk_params, gear_bits, iter_chunks
+from files.duplicate_files import DuplicateFinder
+
+AVG = 256
+
+def _random(n, seed):
+    return random.Random(seed).randbytes(n)
+
+def test_chunk_params():
+    assert chunk_params(8192) == (2048, 8192, 65536, 13, 10)
+    for bad in (100, 128, 3000):
+        with pytest.raises(ValueError):
+            chunk_params(bad)
+
+def test_gear_bits_matches_window_definition():
+    data = _random(200, 1)
+    bits = gear_bits(data)
+    for i in range(len(data)):
+        expected = 0
+        for j in range(min(8, i + 1)):
+            expected ^= GEAR[data[i - j]] >> j & 1
+        assert bits[i] == expected
+
+def test_chunk_lengths_cover_the_file_within_bounds(tmp_path, write):
+    data = _random(50_000, 2)
+    path = write(tmp_path / "f.bin", data)
+    min_size, _, max_size, _, _ = chunk_params(AVG)
+    lengths = [length for _, length in iter_chunks(path, avg_size=AVG)]
+    assert sum(lengths) == len(data)
+    assert all(min_size <= n <= max_size for n in lengths[:-1])
+    assert 0 < lengths[-1] <= max_size
+    assert len(data) // (4 * AVG) < len(lengths) < len(data) // min_size
+
+def test_chunks_dont_depend_on_buffer_size(tmp_path, write):
+    path = write(tmp_path / "f.bin", _random(50_000, 3))
+    assert list(iter_chunks(path, avg_size=AVG, buffer_size=1)) == list(iter_chunks(path, avg_size=AVG))
+
+def test_constant_data_gives_one_repeated_chunk(tmp_path, write):
+    path = write(tmp_path / "zeros.bin", bytes(10_000))
+    chunks = list(iter_chunks(path, avg_size=AVG))
+    assert sum(length for _, length in chunks) == 10_000
+    assert len(set(chunks[:-1])) == 1
+
+def test_insertion_only_changes_nearby_chunks(tmp_path, write):
+    data = _random(50_000, 4)
+    before = list(iter_chunks(write(tmp_path / "a.bin", data), avg_size=AVG))
+    after = list(iter_chunks(write(tmp_path / "b.bin", data[:25_000] + b"inserted" + data[25_000:]), avg_size=AVG))
+    changed = set(after) - set(before)
+    assert len(changed) <= 3
+    assert sum(length for _, length in changed) < 3 * chunk_params(AVG)[2]
+
+def test_empty_file_has_no_chunks(tmp_path, write):
+    assert list(iter_chunks(write(tmp_path / "empty.bin", b""), avg_size=AVG)) == []
+
+@pytest.mark.parametrize("max_bucket_bytes", [16 * 1024 * 1024, 64])
+def test_index_reports_shared_bytes(tmp_path, write, max_bucket_bytes):
+    shared = _random(20_000, 5)
+    paths = [write(tmp_path / "a.bin", shared + _random(10_000, 6)),
+             write(tmp_path / "b.bin", _random(10_000, 7) + shared),
+             write(tmp_path / "c.bin", _random(10_000, 8))]
+    with ChunkIndex(tmp_path / "index", buckets=4, max_bucket_bytes=max_bucket_bytes, avg_size=AVG) as index:
+        chunked = [chunk_into(*index.job(index.add_file(p, p.stat().st_size))) for p in paths]
+        report = index.report(min_shared=1000)
+    assert [nbytes for _, nbytes in chunked] == [30_000, 30_000, 10_000]
+    assert report.files == 3
+    assert report.chunks == sum(chunks for chunks, _ in chunked)
+    assert report.total_bytes == 70_000
+    assert [(a.name, b.name) for a, b, _ in report.pairs] == [("a.bin", "b.bin")]
+    nbytes = report.pairs[0][2]
+    # Only the chunks touching either end of the shared run can differ
+    assert 20_000 - 4 * chunk_params(AVG)[2] < nbytes <= 20_000
+    assert report.savings == nbytes
+    assert not (tmp_path / "index").exists()
+
+def test_common_chunks_dont_make_pairs(tmp_path, write):
+    paths = [write(tmp_path / f"{i}.bin", bytes(4096) + _random(2000, i)) for i in range(4)]
+    with ChunkIndex(tmp_path / "index", buckets=1, avg_size=AVG) as index:
+        for p in paths:
+            chunk_into(*index.job(index.add_file(p, p.stat().st_size)))
+        report = index.report(max_fanout=2)
+    assert report.pairs == []
+    assert report.common_chunks == 1
+    # The zeros are one chunk of min_size repeated in every file
+    min_size = chunk_params(AVG)[0]
+    assert report.savings == 4 * 4096 - min_size
+
+def test_find_shared_chunks(tmp_path, write):
+    shared = _random(20_000, 9)
+    write(tmp_path / "a.bin", shared + b"a" * 100)
+    write(tmp_path / "b.bin", b"b" * 100 + shared)
+    write(tmp_path / "small.bin", shared[:100])
+    finder = DuplicateFinder(tmp_path, quiet=True)
+    report = finder.find_shared_chunks(min_file_size=1000, min_shared=1000, avg_chunk=AVG)
+    assert report.files == 2
+    assert [(a.name, b.name) for a, b, _ in report.pairs] == [("a.bin", "b.bin")]
+    assert finder.stats['files'] == 2
@@ -0,0 +1,62 @@
+import os
+
+import pytest
+
+from files.bulk_copy import BulkCopier, copy_file_fast
+from files.copy_files import CopyManager
+
+@pytest.fixture
+def src(tmp_path, write):
+    write(tmp_path / "src" / "a.txt", "a")
+    write(tmp_path / "src" / "sub" / "b.txt", "b")
+    return tmp_path / "src"
+
+def _tree(root):
+    return sorted(str(p.relative_to(root)) for p in root.rglob("*"))
+
+def test_copy_file_fast_keeps_data_and_mtime(tmp_path, write):
+    src = write(tmp_path / "a.bin", os.urandom(100_000))
+    os.utime(src, (1_000_000, 1_000_000))
+    assert copy_file_fast(str(src), str(tmp_path / "b.bin")) == 100_000
+    assert (tmp_path / "b.bin").read_bytes() == src.read_bytes()
+    assert (tmp_path / "b.bin").stat().st_mtime == 1_000_000
+
+def test_copy_bulk(tmp_path, src, write):
+    single = write(tmp_path / "single.txt", "s")
+    (tmp_path / "out").mkdir()
+    assert CopyManager().copy_bulk([src, single], tmp_path / "out") == [True, True]
+    assert _tree(tmp_path / "out") == ["single.txt", "src", "src/a.txt", "src/sub", "src/sub/b.txt"]
+    assert _tree(src) == ["a.txt", "sub", "sub/b.txt"]
+
+def test_copy_bulk_skips_existing_without_overwrite(tmp_path, src, write):
+    write(tmp_path / "out" / "src" / "old.txt", "old")
+    assert CopyManager().copy_bulk([src], tmp_path / "out") == [False]
+    assert _tree(tmp_path / "out" / "src") == ["old.txt"]
+
+@pytest.mark.parametrize("method", ["copy_bulk", "copy_multiple"])
+def test_overwrite_replaces_a_folder(tmp_path, src, write, method):
+    write(tmp_path / "out" / "src" / "stale.txt", "stale")
+    write(tmp_path / "out" / "src" / "a.txt", "old")
+    assert getattr(CopyManager(), method)([src], tmp_path / "out", overwrite=True) == [True]
+    assert _tree(tmp_path / "out" / "src") == ["a.txt", "sub", "sub/b.txt"]
+    assert (tmp_path / "out" / "src" / "a.txt").read_text() == "a"
+
+@pytest.mark.parametrize("method", ["copy_bulk", "copy_multiple"])
+def test_overwrite_replaces_a_file_with_a_folder(tmp_path, src, write, method):
+    write(tmp_path / "out" / "src", "a file")
+    assert getattr(CopyManager(), method)([src], tmp_path / "out", overwrite=True) == [True]
+    assert _tree(tmp_path / "out" / "src") == ["a.txt", "sub", "sub/b.txt"]
+
+@pytest.mark.parametrize("method", ["copy_bulk", "copy_multiple"])
+def test_copy_onto_itself_is_refused(tmp_path, src, method):
+    assert getattr(CopyManager(), method)([src], tmp_path, overwrite=True) == [False]
+    assert _tree(src) == ["a.txt", "sub", "sub/b.txt"]
+
+def test_folder_that_cannot_be_created_is_reported(tmp_path, write):
+    blocker = write(tmp_path / "out" / "blocked", "a file")
+    jobs = [(str(write(tmp_path / "x.txt")), str(blocker / "sub" / "x.txt")),
+            (str(tmp_path / "x.txt"), str(tmp_path / "out" / "ok.txt"))]
+    report = BulkCopier().copy(jobs, [str(blocker / "sub"), str(blocker / "sub" / "deeper")])
+    assert [d for d, _ in report.dir_errors] == [str(blocker / "sub")]
+    assert [r.ok for r in report.results] == [False, True]
+    assert report.failed == 2
@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+import files.daemon
+from files.async_api import shutdown_executor
+from files.daemon import FolderlyDaemon
+
+@pytest.fixture
+def daemon(tmp_path):
+    d = FolderlyDaemon(socket_path=tmp_path / "daemon.sock", roots=[])
+    yield d
+    d.cache.close()
+    d.engine.close()
+    shutdown_executor()
+
+def call(daemon, method, params=None):
+    return asyncio.run(daemon._dispatch({'jsonrpc': '2.0', 'id': 1, 'method': method, 'params': params}))
+
+def test_list_files(daemon, tmp_path, write):
+    write(tmp_path / "tree" / "a.txt")
+    assert call(daemon, 'list_files', {'folder': str(tmp_path / "tree")})['result'] == [str(tmp_path / "tree" / "a.txt")]
+    assert call(daemon, 'list_files', [str(tmp_path / "tree"), True])['result'] == [str(tmp_path / "tree" / "a.txt")]
+
+@pytest.mark.parametrize("params", [{'folder': "/", 'bogus': 1}, ["/", False, None, "extra"], {}, "/"])
+def test_invalid_params(daemon, params):
+    assert call(daemon, 'list_files', params)['error']['code'] == -32602
+
+def test_type_error_inside_a_handler_is_not_invalid_params(daemon):
+    daemon.methods['broken'] = lambda: 1 + "1"
+    assert call(daemon, 'broken')['error']['code'] == -32000
+
+def test_unknown_method(daemon):
+    assert call(daemon, 'nope')['error']['code'] == -32601
+
+def test_bad_hash_backend_falls_back(tmp_path, monkeypatch, capsys):
+    monkeypatch.setenv("FOLDERLY_HASH_BACKEND", "gpu")
+    d = FolderlyDaemon(socket_path=tmp_path / "daemon.sock", roots=[])
+    assert d.engine.backend == 'threads'
+    assert "Using the default" in capsys.readouterr().out
+    d.cache.close()
+
+class _Tree:
+    version = 1
+
+def test_memo_is_bounded(daemon, monkeypatch):
+    monkeypatch.setattr(files.daemon, "MAX_MEMO", 3)
+    monkeypatch.setattr(daemon, "_index_for", lambda folder: _Tree)
+    calls = []
+    for i in range(5):
+        daemon._memoized(str(i), "/", lambda index: calls.append(i))
+    daemon._memoized("3", "/", lambda index: calls.append("again"))
+    assert list(daemon._memo) == ["2", "4", "3"]
+    assert calls == [0, 1, 2, 3, 4]
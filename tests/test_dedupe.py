@@ -0,0 +1,54 @@
+import os
+
+import pytest
+
+from files.dedupe import Deduplicator
+from files.duplicate_files import DuplicateFinder
+
+@pytest.fixture
+def tree(tmp_path, write):
+    write(tmp_path / "a.txt", "same")
+    write(tmp_path / "sub" / "b.txt", "same")
+    write(tmp_path / "c.txt", "diff")
+    return tmp_path
+
+def _scan(tree):
+    return DuplicateFinder(tree, recursive=True, quiet=True).find_by_hash(hash_algo="sha256")
+
+def test_hardlink_dedupe(tree):
+    report = Deduplicator(mode="hardlink").dedupe(_scan(tree))
+    assert len(report.linked) == 1 and report.bytes_reclaimed == 4
+    a, b = tree / "a.txt", tree / "sub" / "b.txt"
+    assert a.stat().st_ino == b.stat().st_ino
+    assert b.read_text() == "same"
+    assert Deduplicator(mode="hardlink").dedupe(_scan(tree)).skipped == [(b, "already linked")]
+
+def test_auto_mode_falls_back_to_a_working_link(tree):
+    report = Deduplicator().dedupe(_scan(tree))
+    assert [method in ("reflink", "hardlink") for _, _, method in report.linked] == [True]
+    assert (tree / "sub" / "b.txt").read_text() == "same"
+
+def test_linked_files_with_other_names_reclaim_nothing(tree):
+    os.link(tree / "sub" / "b.txt", tree / "elsewhere.txt")
+    groups = {'x': [tree / "a.txt", tree / "sub" / "b.txt"]}
+    report = Deduplicator(mode="hardlink").dedupe(groups)
+    assert len(report.linked) == 1
+    assert report.bytes_reclaimed == 0
+
+def test_dedupe_skips_files_changed_since_the_scan(tree, write):
+    groups = _scan(tree)
+    write(tree / "sub" / "b.txt", "edit")
+    report = Deduplicator(mode="hardlink").dedupe(groups)
+    assert report.linked == []
+    assert report.skipped == [(tree / "sub" / "b.txt", "contents differ")]
+    assert (tree / "sub" / "b.txt").read_text() == "edit"
+
+def test_dedupe_across_devices_is_skipped(tree, other_device, write):
+    other = write(other_device / "a.txt", "same")
+    report = Deduplicator(mode="hardlink").dedupe({'x': [tree / "a.txt", other]})
+    assert report.linked == []
+    assert len(report.skipped) == 2
+
+def test_dedupe_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        Deduplicator(mode="symlink")
@@ -0,0 +1,49 @@
+from files.bulk_delete import BulkDeleter
+from files.delete_files import DeleteManager
+
+def test_delete_single_file(tmp_path, write):
+    target = write(tmp_path / "a.txt")
+    assert DeleteManager().delete_single(target, confirm=False)
+    assert not target.exists()
+
+def test_delete_single_needs_recursive_for_non_empty_folder(tmp_path, write):
+    folder = write(tmp_path / "folder" / "a.txt").parent
+    assert not DeleteManager().delete_single(folder, confirm=False)
+    assert folder.exists()
+    assert DeleteManager().delete_single(folder, recursive=True, confirm=False)
+    assert not folder.exists()
+
+def test_delete_single_declined(tmp_path, write, monkeypatch):
+    target = write(tmp_path / "a.txt")
+    monkeypatch.setattr("builtins.input", lambda prompt: "n")
+    assert not DeleteManager().delete_single(target)
+    assert target.exists()
+
+def test_delete_bulk_removes_trees(tmp_path, write, folderly_home):
+    folder = tmp_path / "folder"
+    for i in range(3):
+        write(folder / f"sub{i}" / "deep" / f"{i}.txt")
+    single = write(tmp_path / "a.txt")
+    assert DeleteManager().delete_bulk([folder, single], recursive=True, confirm=False) == [True, True]
+    assert not folder.exists() and not single.exists()
+    trash = folderly_home / "trash"
+    assert not trash.exists() or not any(trash.iterdir())
+
+def test_delete_bulk_declined(tmp_path, write, monkeypatch):
+    targets = [write(tmp_path / "a.txt"), write(tmp_path / "b.txt")]
+    monkeypatch.setattr("builtins.input", lambda prompt: "n")
+    assert DeleteManager().delete_bulk(targets) == [False, False]
+    assert all(t.exists() for t in targets)
+
+def test_delete_plan_counts_and_missing_targets(tmp_path, write):
+    folder = write(tmp_path / "folder" / "a.txt", "12345").parent
+    write(folder / "sub" / "b.txt", "123")
+    plan = BulkDeleter().plan([folder, tmp_path / "missing"], recursive=True)
+    assert (plan.files, plan.dirs, plan.bytes) == (2, 2, 8)
+    assert plan.missing == {tmp_path / "missing"}
+
+def test_trash_mode_without_journal_purges(tmp_path, write):
+    target = write(tmp_path / "folder" / "a.txt").parent
+    deleter = BulkDeleter(use_trash=True)
+    assert deleter.execute(deleter.plan([target], recursive=True)) == [True]
+    assert not target.exists()
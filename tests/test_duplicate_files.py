@@ -0,0 +1,61 @@
+import pytest
+
+from files.duplicate_files import DuplicateFinder
+
+PARTIAL = 4096
+
+def _groups(groups):
+    return sorted(sorted(p.name for p in group) for group in groups.values())
+
+@pytest.fixture
+def tree(tmp_path, write):
+    write(tmp_path / "a.txt", "same")
+    write(tmp_path / "sub" / "b.txt", "same")
+    write(tmp_path / "c.txt", "diff")  # same size, different content
+    write(tmp_path / "d.txt", "unique file")
+    return tmp_path
+
+@pytest.mark.parametrize("method", ["find_by_hash", "find_by_hash_staged"])
+def test_find_duplicates_by_hash(tree, method):
+    finder = DuplicateFinder(tree, recursive=True, quiet=True)
+    assert _groups(getattr(finder, method)(hash_algo="sha256")) == [["a.txt", "b.txt"]]
+
+def test_find_duplicates_confirmed(tree):
+    finder = DuplicateFinder(tree, recursive=True, quiet=True)
+    assert _groups(finder.find_by_hash_staged(hash_algo="md5", confirm=True)) == [["a.txt", "b.txt"]]
+
+def test_find_by_size_groups_equal_sizes(tree):
+    finder = DuplicateFinder(tree, recursive=True, quiet=True)
+    assert _groups(finder.find_by_size()) == [["a.txt", "b.txt", "c.txt"]]
+
+def test_staged_pipeline_reads_only_what_it_needs(tmp_path, write):
+    big = 10 * PARTIAL
+    body = bytes(range(256)) * (big // 256)
+    write(tmp_path / "dup1.bin", body)
+    write(tmp_path / "dup2.bin", body)
+    write(tmp_path / "head_differs.bin", b"x" + body[1:])  # dropped by the partial hash
+    write(tmp_path / "lonely.bin", body + b"!")  # dropped by size
+    finder = DuplicateFinder(tmp_path, quiet=True)
+    assert _groups(finder.find_by_hash_staged(hash_algo="sha256", partial_size=PARTIAL)) == [["dup1.bin", "dup2.bin"]]
+    stats = finder.stats
+    assert stats['files'] == 4
+    assert stats['size_stage_skipped_bytes'] == big + 1
+    assert stats['partial_stage_skipped_bytes'] == big - 2 * PARTIAL
+    assert stats['bytes_read'] == 3 * 2 * PARTIAL + 2 * big
+
+def test_staged_pipeline_catches_files_differing_only_in_the_middle(tmp_path, write):
+    body = b"\0" * (10 * PARTIAL)
+    write(tmp_path / "a.bin", body)
+    write(tmp_path / "b.bin", body)
+    middle = bytearray(body)
+    middle[5 * PARTIAL] = 1
+    write(tmp_path / "c.bin", bytes(middle))
+    finder = DuplicateFinder(tmp_path, quiet=True)
+    assert _groups(finder.find_by_hash_staged(hash_algo="sha256", partial_size=PARTIAL)) == [["a.bin", "b.bin"]]
+
+def test_staged_pipeline_matches_full_hash(tmp_path, write):
+    for i in range(30):
+        write(tmp_path / f"f{i}.txt", str(i % 7) * (i % 3 + 1) * 3000)
+    staged = DuplicateFinder(tmp_path, quiet=True).find_by_hash_staged(hash_algo="sha256", partial_size=1024)
+    full = DuplicateFinder(tmp_path, quiet=True).find_by_hash(hash_algo="sha256")
+    assert _groups(staged) == _groups(full)
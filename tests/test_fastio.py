@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+import files.fastio
+from files.fastio import MAX_BUFFER, MIN_BUFFER, _LockstepReader, buffer_size_for, identical_groups, iter_blocks
+
+SIZE = 5 * MIN_BUFFER + 123
+
+def _names(groups):
+    return sorted(sorted(p.name for p in group) for group in groups)
+
+@pytest.fixture
+def body():
+    return random.Random(1).randbytes(SIZE)
+
+def test_buffer_size_for():
+    assert buffer_size_for(0) == MIN_BUFFER
+    assert buffer_size_for(16 * MIN_BUFFER) == 2 * MIN_BUFFER
+    assert buffer_size_for(1 << 40) == MAX_BUFFER
+
+@pytest.mark.parametrize("mmap_min_size", [None, 1])
+def test_iter_blocks_yields_the_whole_file(tmp_path, write, body, monkeypatch, mmap_min_size):
+    monkeypatch.setattr(files.fastio, "MMAP_MIN_SIZE", mmap_min_size)
+    path = write(tmp_path / "f.bin", body)
+    blocks = [bytes(block) for block in iter_blocks(path, buffer_size=MIN_BUFFER)]
+    assert b"".join(blocks) == body
+    assert [len(b) for b in blocks] == [MIN_BUFFER] * 5 + [123]
+    assert list(iter_blocks(write(tmp_path / "empty.bin", b""))) == []
+
+@pytest.mark.parametrize("max_open", [64, 1])
+def test_identical_groups(tmp_path, write, body, max_open):
+    late = bytearray(body)
+    late[-1] ^= 1
+    early = bytearray(body)
+    early[0] ^= 1
+    paths = [write(tmp_path / "a.bin", body), write(tmp_path / "b.bin", body), write(tmp_path / "c.bin", body),
+             write(tmp_path / "late1.bin", bytes(late)), write(tmp_path / "late2.bin", bytes(late)),
+             write(tmp_path / "early.bin", bytes(early)), write(tmp_path / "longer.bin", body + b"!"),
+             tmp_path / "missing.bin"]
+    groups = identical_groups(paths, buffer_size=MIN_BUFFER, max_open=max_open)
+    assert _names(groups) == [["a.bin", "b.bin", "c.bin"], ["late1.bin", "late2.bin"]]
+
+def test_lockstep_stops_reading_a_file_once_it_is_unmatched(tmp_path, write, body, monkeypatch):
+    early = bytearray(body)
+    early[0] ^= 1
+    paths = [write(tmp_path / "a.bin", body), write(tmp_path / "b.bin", body),
+             write(tmp_path / "early.bin", bytes(early))]
+    reads = {}
+    read = _LockstepReader.read
+
+    def counting_read(self, offset):
+        reads[self.path.name] = reads.get(self.path.name, 0) + 1
+        return read(self, offset)
+
+    monkeypatch.setattr(_LockstepReader, "read", counting_read)
+    assert _names(identical_groups(paths, buffer_size=MIN_BUFFER)) == [["a.bin", "b.bin"]]
+    # Six blocks and the read that finds EOF
+    assert reads == {"a.bin": 7, "b.bin": 7, "early.bin": 1}
@@ -0,0 +1,59 @@
+import os
+import time
+
+from files.hash_cache import HashCache
+
+def test_hit_and_persistence(tmp_path, write):
+    st = write(tmp_path / "a.txt").stat()
+    cache = HashCache(tmp_path / "cache.db")
+    cache.put(st, "sha256", "abc")
+    assert cache.get(st, "sha256") == "abc"
+    assert cache.get(st, "md5") is None
+    cache.close()
+    cache = HashCache(tmp_path / "cache.db")
+    assert cache.get(st, "sha256") == "abc"
+    assert (cache.hits, cache.misses) == (1, 0)
+    cache.close()
+
+def test_changed_file_is_a_miss(tmp_path, write):
+    path = write(tmp_path / "a.txt", "one")
+    cache = HashCache(tmp_path / "cache.db")
+    cache.put(path.stat(), "sha256", "old")
+    write(path, "longer")
+    assert cache.get(path.stat(), "sha256") is None
+    write(path, "LONGER")
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000))
+    cache.put(st, "sha256", "new")
+    assert cache.get(path.stat(), "sha256") is None
+    cache.close()
+
+def test_hits_do_not_write_until_flush(tmp_path, write):
+    st = write(tmp_path / "a.txt").stat()
+    cache = HashCache(tmp_path / "cache.db")
+    cache.put(st, "sha256", "abc")
+    cache.flush()
+    assert cache.get(st, "sha256") == "abc"
+    assert not cache.conn.in_transaction
+    cache.close()
+
+def test_evicts_least_recently_used(tmp_path, write):
+    stats = [write(tmp_path / f"{i}.txt").stat() for i in range(3)]
+    cache = HashCache(tmp_path / "cache.db", max_entries=2)
+    for i, st in enumerate(stats):
+        cache.put(st, "sha256", str(i))
+        time.sleep(0.01)
+    cache.get(stats[0], "sha256")  # now more recent than 1 and 2
+    cache.flush()
+    assert cache.get(stats[0], "sha256") == "0"
+    assert cache.get(stats[1], "sha256") is None
+    assert cache.get(stats[2], "sha256") == "2"
+    cache.close()
+
+def test_clear(tmp_path, write):
+    st = write(tmp_path / "a.txt").stat()
+    cache = HashCache(tmp_path / "cache.db")
+    cache.put(st, "sha256", "abc")
+    cache.clear()
+    assert cache.get(st, "sha256") is None
+    cache.close()
@@ -0,0 +1,42 @@
+import hashlib
+
+import pytest
+
+from files.duplicate_files import DuplicateFinder
+from files.hash_engine import HashEngine, hash_file, hash_partial
+
+BACKENDS = ["serial", "threads", "processes"]
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_map_keeps_order_and_returns_errors(tmp_path, write, backend):
+    paths = [write(tmp_path / f"{i}.txt", str(i) * 100) for i in range(20)]
+    jobs = [(p, "sha256") for p in paths] + [(tmp_path / "missing", "sha256")]
+    engine = HashEngine(backend=backend, workers=3, max_in_flight=4)
+    try:
+        results = list(engine.map(hash_file, jobs))
+    finally:
+        engine.close()
+    assert [args for args, _ in results] == jobs
+    for (path, _), digest in results[:-1]:
+        assert digest == hashlib.sha256(path.read_bytes()).hexdigest()
+    assert isinstance(results[-1][1], FileNotFoundError)
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        HashEngine(backend="gpu")
+
+def test_hash_partial_reads_head_and_tail(tmp_path, write):
+    data = bytes(range(256)) * 100
+    path = write(tmp_path / "a.bin", data)
+    assert hash_partial(path, len(data), "sha256", 1000) == hashlib.sha256(data[:1000] + data[-1000:]).hexdigest()
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_backends_find_the_same_groups(tmp_path, write, backend):
+    for i in range(40):
+        write(tmp_path / f"f{i}.txt", str(i % 5) * 9000)
+    engine = HashEngine(backend=backend, workers=2)
+    try:
+        groups = DuplicateFinder(tmp_path, engine=engine, quiet=True).find_by_hash_staged(hash_algo="sha256")
+    finally:
+        engine.close()
+    assert sorted(len(group) for group in groups.values()) == [8] * 5
@@ -0,0 +1,52 @@
+import shutil
+
+from files.index import FileIndex
+
+def _names(paths):
+    return sorted(p.name for p in paths)
+
+def test_refresh_and_query(tmp_path, write):
+    write(tmp_path / "tree" / "a.txt", "a")
+    write(tmp_path / "tree" / "sub" / "b.pdf", "bbbb")
+    index = FileIndex(tmp_path / "index.db")
+    index.refresh(tmp_path / "tree")
+    assert _names(index.query(tmp_path / "tree")) == ["a.txt", "b.pdf"]
+    assert _names(index.query(tmp_path / "tree", recursive=False)) == ["a.txt"]
+    assert _names(index.query(tmp_path / "tree", files=False, dirs=True)) == ["sub"]
+    assert _names(index.query(tmp_path / "tree", suffix=".pdf")) == ["b.pdf"]
+    assert _names(index.query(tmp_path / "tree", min_size=2)) == ["b.pdf"]
+    [entry] = index.query(tmp_path / "tree", suffix=".txt", entries=True)
+    assert entry.size == 1
+    index.close()
+
+def test_unchanged_directories_are_skipped(tmp_path, write):
+    write(tmp_path / "tree" / "one" / "a.txt")
+    write(tmp_path / "tree" / "two" / "b.txt")
+    index = FileIndex(tmp_path / "index.db")
+    assert index.refresh(tmp_path / "tree") == {'dirs_scanned': 3, 'dirs_skipped': 0}
+    assert index.refresh(tmp_path / "tree") == {'dirs_scanned': 0, 'dirs_skipped': 3}
+    write(tmp_path / "tree" / "two" / "c.txt")
+    assert index.refresh(tmp_path / "tree") == {'dirs_scanned': 1, 'dirs_skipped': 2}
+    assert _names(index.query(tmp_path / "tree")) == ["a.txt", "b.txt", "c.txt"]
+    assert index.refresh(tmp_path / "tree", full=True)['dirs_scanned'] == 3
+    index.close()
+
+def test_removed_and_renamed_entries_leave_the_index(tmp_path, write):
+    write(tmp_path / "tree" / "gone" / "deep" / "x.txt")
+    old = write(tmp_path / "tree" / "old.txt")
+    index = FileIndex(tmp_path / "index.db")
+    index.refresh(tmp_path / "tree")
+    shutil.rmtree(tmp_path / "tree" / "gone")
+    old.rename(tmp_path / "tree" / "new.txt")
+    index.refresh(tmp_path / "tree")
+    assert _names(index.query(tmp_path / "tree", dirs=True)) == ["new.txt"]
+    index.close()
+
+def test_index_persists(tmp_path, write):
+    write(tmp_path / "tree" / "a.txt")
+    index = FileIndex(tmp_path / "index.db")
+    index.refresh(tmp_path / "tree")
+    index.close()
+    index = FileIndex(tmp_path / "index.db")
+    assert _names(index.query(tmp_path / "tree")) == ["a.txt"]
+    index.close()
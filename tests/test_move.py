@@ -0,0 +1,55 @@
+import os
+
+from files.move_files import MoveManager
+
+def test_move_single_file(tmp_path, write):
+    src = write(tmp_path / "a.txt", "hello")
+    assert MoveManager().move_single(src, tmp_path / "b.txt")
+    assert not src.exists()
+    assert (tmp_path / "b.txt").read_text() == "hello"
+
+def test_move_single_skips_existing_destination(tmp_path, write):
+    src = write(tmp_path / "a.txt", "new")
+    dest = write(tmp_path / "b.txt", "old")
+    assert not MoveManager().move_single(src, dest)
+    assert src.read_text() == "new"
+    assert dest.read_text() == "old"
+
+def test_move_single_overwrites_folder(tmp_path, write):
+    src = write(tmp_path / "src" / "new.txt", "new").parent
+    dest = write(tmp_path / "dest" / "old.txt", "old").parent
+    assert MoveManager().move_single(src, dest, overwrite=True)
+    assert not src.exists()
+    assert sorted(os.listdir(dest)) == ["new.txt"]
+
+def test_move_onto_itself_is_refused(tmp_path, write):
+    src = write(tmp_path / "a.txt")
+    assert not MoveManager().move_single(src, src, overwrite=True)
+    assert src.exists()
+
+def test_move_multiple_reports_each_source(tmp_path, write):
+    a = write(tmp_path / "a.txt")
+    b = write(tmp_path / "b.txt")
+    write(tmp_path / "out" / "b.txt", "taken")
+    results = MoveManager().move_multiple([a, b, tmp_path / "missing.txt"], tmp_path / "out")
+    assert results == [True, False, False]
+    assert (tmp_path / "out" / "a.txt").exists()
+    assert b.exists()
+
+def test_move_multiple_across_devices(tmp_path, other_device, write):
+    folder = write(tmp_path / "folder" / "sub" / "f.txt", "content").parent.parent
+    os.symlink("sub/f.txt", folder / "link")
+    single = write(tmp_path / "single.txt", "single")
+    assert MoveManager().move_multiple([folder, single], other_device) == [True, True]
+    assert not folder.exists() and not single.exists()
+    assert (other_device / "folder" / "sub" / "f.txt").read_text() == "content"
+    assert os.readlink(other_device / "folder" / "link") == "sub/f.txt"
+    assert (other_device / "single.txt").read_text() == "single"
+
+def test_cross_device_overwrite(tmp_path, other_device, write):
+    src = write(tmp_path / "dir" / "new.txt", "new").parent
+    dest = write(other_device / "dir" / "old.txt", "old").parent
+    assert MoveManager().move_single(src, dest, overwrite=True)
+    assert not src.exists()
+    assert sorted(os.listdir(dest)) == ["new.txt"]
+    assert [p for p in os.listdir(other_device) if "partial" in p] == []
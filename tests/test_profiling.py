@@ -0,0 +1,39 @@
+import os
+import shutil
+
+from ai.profiling import CallCounter
+from files.utils import stat_entry
+from files.walker import walk
+
+def test_counts_stats_and_opens_only_while_active(tmp_path, write):
+    for name in ("a.txt", "b.txt", "sub/c.txt"):
+        write(tmp_path / name)
+    counter = CallCounter()
+    counter.start()
+    try:
+        sizes = [stat_entry(entry).st_size for entry in walk(tmp_path)]
+        os.stat(tmp_path / "a.txt")
+        os.lstat(tmp_path / "b.txt")
+        with open(tmp_path / "a.txt") as f:
+            f.read()
+    finally:
+        counter.stop()
+    assert sizes == [4, 4, 4]
+    assert counter.counts['stat'] == 5
+    assert counter.counts['open'] >= 1
+    assert counter.counts['scandir'] >= 2
+    before = dict(counter.counts)
+    os.stat(tmp_path / "a.txt")
+    open(tmp_path / "a.txt").close()
+    assert counter.counts == before
+
+def test_wrapped_stat_keeps_shutil_working(tmp_path, write):
+    counter = CallCounter()
+    counter.start()
+    counter.stop()
+    src = write(tmp_path / "src" / "f.txt")
+    os.symlink(src, tmp_path / "src" / "link")
+    shutil.copytree(tmp_path / "src", tmp_path / "dest", symlinks=True)
+    shutil.copystat(tmp_path / "src" / "link", tmp_path / "dest" / "link", follow_symlinks=False)
+    shutil.rmtree(tmp_path / "dest")
+    assert not (tmp_path / "dest").exists()
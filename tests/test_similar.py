@@ -0,0 +1,50 @@
+from files.duplicate_files import DuplicateFinder
+from files.similar import HammingLSH, block_size_class, hamming
+
+def _groups(index, radius):
+    return sorted(sorted(items) for _, items in index.groups(radius))
+
+def test_hamming():
+    assert hamming(0, 0) == 0
+    assert hamming(0b1011, 0b0001) == 2
+    assert hamming(0, (1 << 64) - 1) == 64
+
+def test_lsh_groups_within_radius():
+    index = HammingLSH()
+    base = 0x0123456789ABCDEF
+    for fp in (base, base ^ 0b101, base, (1 << 64) - 1 - base, base ^ (0xFF << 40)):
+        index.add(fp)
+    assert len(index) == 5
+    assert _groups(index, 2) == [[0, 1, 2]]
+    assert _groups(index, 10) == [[0, 1, 2, 4]]
+
+def test_lsh_groups_are_transitive():
+    index = HammingLSH()
+    for fp in (0, 0b111, 0b111111):
+        index.add(fp)
+    # 0 and 0b111111 differ by 6 bits, but each is within 3 of the middle one
+    assert _groups(index, 3) == [[0, 1, 2]]
+    assert _groups(index, 2) == []
+
+def test_lsh_representative_is_first_item():
+    index = HammingLSH()
+    index.add(0b1)
+    index.add(0b11)
+    assert list(index.groups(1)) == [(0b1, [0, 1])]
+
+def test_block_size_class():
+    assert block_size_class(64, blocks=2, block_size=16) == 6
+    assert block_size_class(1024, blocks=2, block_size=16) == 10
+    assert block_size_class(10, blocks=2, block_size=16) == 4
+
+def test_find_similar_keys_blocks_by_size_class(tmp_path, write):
+    small = bytes(range(64))
+    large = bytes(range(256)) * 4
+    write(tmp_path / "small1.bin", small)
+    write(tmp_path / "small2.bin", small)
+    write(tmp_path / "large1.bin", large)
+    write(tmp_path / "large2.bin", large)
+    finder = DuplicateFinder(tmp_path, quiet=True)
+    groups = finder.find_similar(threshold=0, min_binary_size=1, blocks=2, block_size=16)
+    by_class = {key.rsplit(":", 1)[0]: sorted(p.name for p in paths) for key, paths in groups.items()}
+    assert by_class == {"blocks:6": ["small1.bin", "small2.bin"], "blocks:10": ["large1.bin", "large2.bin"]}
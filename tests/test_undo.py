@@ -0,0 +1,121 @@
+import pytest
+
+from cli import main as cli_main
+from files.copy_files import CopyManager
+from files.delete_files import DeleteManager
+from files.journal import OperationJournal
+from files.move_files import MoveManager
+
+def test_nothing_to_undo():
+    assert OperationJournal().undo() == ["Nothing to undo."]
+
+def test_undo_move_batch(tmp_path, write):
+    journal = OperationJournal()
+    sources = [write(tmp_path / "a.txt", "a"), write(tmp_path / "dir" / "b.txt", "b").parent]
+    (tmp_path / "out").mkdir()
+    MoveManager(journal).move_multiple(sources, tmp_path / "out")
+    assert not any(s.exists() for s in sources)
+    journal.undo()
+    assert (tmp_path / "a.txt").read_text() == "a"
+    assert (tmp_path / "dir" / "b.txt").read_text() == "b"
+    assert not any((tmp_path / "out").iterdir())
+    assert journal.undo() == ["Nothing to undo."]
+
+def test_undo_reverts_only_the_latest_batch(tmp_path, write):
+    journal = OperationJournal()
+    mover = MoveManager(journal)
+    mover.move_single(write(tmp_path / "a.txt"), tmp_path / "b.txt")
+    mover.move_single(tmp_path / "b.txt", tmp_path / "c.txt")
+    journal.undo()
+    assert (tmp_path / "b.txt").exists() and not (tmp_path / "c.txt").exists()
+    journal.undo()
+    assert (tmp_path / "a.txt").exists() and not (tmp_path / "b.txt").exists()
+
+def test_overwritten_move_destination_goes_to_trash(tmp_path, write, folderly_home):
+    src = write(tmp_path / "a.txt", "new")
+    dest = write(tmp_path / "b.txt", "old")
+    journal = OperationJournal()
+    assert MoveManager(journal).move_single(src, dest, overwrite=True)
+    assert dest.read_text() == "new"
+    assert [p.read_text() for p in (folderly_home / "trash").iterdir()] == ["old"]
+    journal.undo()
+    assert src.read_text() == "new"
+    assert dest.read_text() == "old"
+
+def test_undo_cross_device_overwriting_move(tmp_path, other_device, write):
+    src = write(tmp_path / "a.txt", "new")
+    dest = write(other_device / "a.txt", "old")
+    journal = OperationJournal()
+    assert MoveManager(journal).move_single(src, dest, overwrite=True)
+    assert dest.read_text() == "new"
+    journal.undo()
+    assert src.read_text() == "new"
+    assert dest.read_text() == "old"
+
+def test_undo_delete(tmp_path, write, folderly_home):
+    journal = OperationJournal()
+    target = write(tmp_path / "folder" / "a.txt", "a").parent
+    DeleteManager(journal).delete_bulk([target], recursive=True, confirm=False)
+    assert not target.exists()
+    assert len(list((folderly_home / "trash").iterdir())) == 1
+    journal.undo()
+    assert (target / "a.txt").read_text() == "a"
+
+def test_undo_delete_on_other_device(other_device, write):
+    journal = OperationJournal()
+    target = write(other_device / "a.txt", "kept")
+    assert DeleteManager(journal).delete_single(target, confirm=False)
+    assert [p.read_text() for p in (other_device / ".folderly-trash").iterdir()] == ["kept"]
+    journal.undo()
+    assert target.read_text() == "kept"
+
+def test_undo_copy(tmp_path, write):
+    journal = OperationJournal()
+    src = write(tmp_path / "a.txt")
+    CopyManager(journal).copy_single(src, tmp_path / "b.txt")
+    journal.undo()
+    assert src.exists() and not (tmp_path / "b.txt").exists()
+
+@pytest.mark.parametrize("method", ["copy_multiple", "copy_bulk"])
+def test_undo_overwriting_copy_restores_the_destination(tmp_path, write, method):
+    journal = OperationJournal()
+    write(tmp_path / "src" / "a.txt", "new")
+    write(tmp_path / "out" / "src" / "a.txt", "old")
+    write(tmp_path / "out" / "src" / "only_old.txt", "old")
+    assert getattr(CopyManager(journal), method)([tmp_path / "src"], tmp_path / "out", overwrite=True) == [True]
+    assert (tmp_path / "out" / "src" / "a.txt").read_text() == "new"
+    journal.undo()
+    assert (tmp_path / "out" / "src" / "a.txt").read_text() == "old"
+    assert (tmp_path / "out" / "src" / "only_old.txt").exists()
+    assert (tmp_path / "src" / "a.txt").read_text() == "new"
+
+def test_cli_copy_overwrite_can_be_undone(tmp_path, write, capsys):
+    write(tmp_path / "src" / "a.txt", "new")
+    write(tmp_path / "out" / "src" / "a.txt", "old")
+    assert cli_main(["copy", str(tmp_path / "src"), "--to", str(tmp_path / "out"), "--overwrite"]) == 0
+    assert (tmp_path / "out" / "src" / "a.txt").read_text() == "new"
+    assert cli_main(["undo"]) == 0
+    assert (tmp_path / "out" / "src" / "a.txt").read_text() == "old"
+
+def test_partial_undo_can_be_retried(tmp_path, write):
+    journal = OperationJournal()
+    a, b = write(tmp_path / "a.txt", "a"), write(tmp_path / "b.txt", "b")
+    (tmp_path / "out").mkdir()
+    MoveManager(journal).move_multiple([a, b], tmp_path / "out")
+    blocker = write(a, "blocker")
+    messages = journal.undo()
+    assert any(m.startswith("Could not undo") for m in messages)
+    assert b.read_text() == "b"
+    blocker.unlink()
+    journal.undo()
+    assert a.read_text() == "a"
+    assert journal.undo() == ["Nothing to undo."]
+
+def test_empty_trash_clears_every_trash_folder(tmp_path, other_device, write, folderly_home):
+    journal = OperationJournal()
+    deleter = DeleteManager(journal)
+    deleter.delete_single(write(tmp_path / "a.txt"), confirm=False)
+    deleter.delete_single(write(other_device / "b.txt"), confirm=False)
+    assert journal.empty_trash() == 2
+    assert not any((folderly_home / "trash").iterdir())
+    assert not (other_device / ".folderly-trash").exists()